@@ -1,9 +1,13 @@
 """
 Claude連携 - パフォーマンス分析モジュール
 """
+import hashlib
 import json
 import logging
-from typing import Any
+import re
+import threading
+import time
+from typing import Any, Callable, ClassVar, Iterator
 
 from anthropic import Anthropic
 
@@ -12,22 +16,377 @@ import config
 logger = logging.getLogger(__name__)
 
 
+# =============================================================================
+# プロンプト定義
+# 静的部分の末尾に cache_control を付けて送信する（最小キャッシュ長に届くまでは効果なし）
+# =============================================================================
+
+# 出力をJSONのみに限定し、前後の説明文やコードフェンスによるトークン消費を抑える
+JSON_ONLY_INSTRUCTION = "JSONのみを出力し、前後に説明文を含めないこと。"
+
+ANALYSIS_SYSTEM_PROMPT = f"""あなたは広告運用の専門家です。
+Meta広告（Facebook/Instagram広告）のパフォーマンスデータを分析し、
+具体的で実行可能な改善提案を日本語で提供してください。
+回答はJSON形式で返してください。{JSON_ONLY_INSTRUCTION}"""
+
+BID_SYSTEM_PROMPT = f"あなたは広告入札最適化の専門家です。データに基づいた慎重な判断を行ってください。{JSON_ONLY_INSTRUCTION}"
+
+CREATIVE_SYSTEM_PROMPT = f"あなたは広告クリエイティブ分析の専門家です。データに基づいた客観的な分析を行ってください。{JSON_ONLY_INSTRUCTION}"
+
+ANALYSIS_INSTRUCTIONS = """Meta広告パフォーマンスデータを分析し、改善提案を行ってください。
+パフォーマンスデータと目標値はこの後に続きます。
+
+## 分析してほしい観点
+1. 全体的なパフォーマンス評価
+2. 目標値との乖離
+3. トレンド（改善傾向/悪化傾向）
+4. 具体的な改善アクション
+
+以下のJSON形式で回答してください:
+{
+  "overall_score": 1-10の評価,
+  "summary": "全体サマリー",
+  "kpi_status": {
+    "cpa": {"current": 値, "target": 値, "status": "達成/未達"},
+    "roas": {"current": 値, "target": 値, "status": "達成/未達"}
+  },
+  "trend": "improving/stable/declining",
+  "recommendations": [
+    {"priority": "high/medium/low", "action": "アクション内容", "expected_impact": "期待効果"}
+  ],
+  "warnings": ["注意事項があれば"]
+}"""
+
+BID_INSTRUCTIONS = """Meta広告セットのパフォーマンスデータに基づいて、入札調整の提案を行ってください。
+パフォーマンスデータと目標値はこの後に続きます。
+
+## 制約条件
+- 入札額の変更は現在値の±{max_bid_change_percent}%以内
+- 最小データ期間: {min_data_days}日
+- 最小コンバージョン数: {min_conversions}件
+
+以下のJSON形式で回答してください:
+{{
+  "should_adjust": true/false,
+  "current_bid": 現在の入札額,
+  "recommended_bid": 推奨入札額,
+  "change_percent": 変更率(%),
+  "reason": "調整理由",
+  "confidence": "high/medium/low",
+  "warnings": ["注意事項があれば"]
+}}"""
+
+CREATIVE_INSTRUCTIONS = """Meta広告クリエイティブのパフォーマンスデータを分析してください。
+クリエイティブデータはこの後に続きます。
+
+## 分析観点
+1. 最もパフォーマンスの良いクリエイティブ
+2. 停止を検討すべきクリエイティブ
+3. 改善のポイント
+
+以下のJSON形式で回答してください:
+{
+  "top_performers": [
+    {"ad_id": "xxx", "ad_name": "xxx", "reason": "理由"}
+  ],
+  "should_pause": [
+    {"ad_id": "xxx", "ad_name": "xxx", "reason": "理由", "confidence": "high/medium/low"}
+  ],
+  "insights": ["気づき1", "気づき2"],
+  "recommendations": ["改善提案1", "改善提案2"]
+}"""
+
+# プロンプトに埋め込むデータのキー略称（入力トークン削減のため）
+DATA_KEY_ABBREVIATIONS = {
+    "impressions": "imp",
+    "clicks": "clk",
+    "conversions": "cv",
+    "conversion_value": "cv_value",
+    "frequency": "freq",
+    "link_clicks": "link_clk",
+    "page_engagements": "page_eng",
+    "post_engagements": "post_eng",
+    "performance": "perf",
+}
+
+DATA_KEY_LEGEND = "## データ表記\n以下のキーは略称です（null・空の項目は省略）: " + ", ".join(
+    f"{short}={key}" for key, short in DATA_KEY_ABBREVIATIONS.items()
+)
+
+# 毎回変わるデータ部分のテンプレート（format_map で埋める）
+ANALYSIS_DATA_TEMPLATE = """## パフォーマンスデータ
+```json
+{data}
+```
+
+## 目標値
+- 目標CPA: {target_cpa}円
+- 目標ROAS: {target_roas}倍"""
+
+BID_DATA_TEMPLATE = """## 現在のパフォーマンス
+```json
+{data}
+```
+
+## 目標値
+- 目標CPA: {target_cpa}円
+- 目標ROAS: {target_roas}倍"""
+
+CREATIVE_DATA_TEMPLATE = """## クリエイティブデータ
+```json
+{data}
+```"""
+
+# =============================================================================
+# 構造化出力用のツール定義
+# tool_choice でツール呼び出しを強制し、入力（dict）をそのまま結果として使う
+# =============================================================================
+
+_STRING_LIST = {"type": "array", "items": {"type": "string"}}
+_CONFIDENCE = {"type": "string", "enum": ["high", "medium", "low"]}
+_KPI = {
+    "type": "object",
+    "properties": {
+        "current": {"type": ["number", "null"]},
+        "target": {"type": ["number", "null"]},
+        "status": {"type": "string"},
+    },
+}
+
+ANALYSIS_TOOL = {
+    "name": "emit_performance_analysis",
+    "description": "パフォーマンス分析の結果を出力する",
+    "input_schema": {
+        "type": "object",
+        "properties": {
+            "overall_score": {"type": "integer", "minimum": 1, "maximum": 10},
+            "summary": {"type": "string"},
+            "kpi_status": {
+                "type": "object",
+                "properties": {"cpa": _KPI, "roas": _KPI},
+            },
+            "trend": {"type": "string", "enum": ["improving", "stable", "declining"]},
+            "recommendations": {
+                "type": "array",
+                "items": {
+                    "type": "object",
+                    "properties": {
+                        "priority": {"type": "string", "enum": ["high", "medium", "low"]},
+                        "action": {"type": "string"},
+                        "expected_impact": {"type": "string"},
+                    },
+                    "required": ["priority", "action"],
+                },
+            },
+            "warnings": _STRING_LIST,
+        },
+        "required": ["overall_score", "summary", "trend", "recommendations"],
+    },
+}
+
+BID_TOOL = {
+    "name": "emit_bid_decision",
+    "description": "入札調整の判断を出力する",
+    "input_schema": {
+        "type": "object",
+        "properties": {
+            "should_adjust": {"type": "boolean"},
+            "current_bid": {"type": ["number", "null"]},
+            "recommended_bid": {"type": ["number", "null"]},
+            "change_percent": {"type": "number"},
+            "reason": {"type": "string"},
+            "confidence": _CONFIDENCE,
+            "warnings": _STRING_LIST,
+        },
+        "required": ["should_adjust", "recommended_bid", "reason", "confidence"],
+    },
+}
+
+CREATIVE_TOOL = {
+    "name": "emit_creative_analysis",
+    "description": "クリエイティブ分析の結果を出力する",
+    "input_schema": {
+        "type": "object",
+        "properties": {
+            "top_performers": {
+                "type": "array",
+                "items": {
+                    "type": "object",
+                    "properties": {
+                        "ad_id": {"type": "string"},
+                        "ad_name": {"type": "string"},
+                        "reason": {"type": "string"},
+                    },
+                    "required": ["ad_id", "reason"],
+                },
+            },
+            "should_pause": {
+                "type": "array",
+                "items": {
+                    "type": "object",
+                    "properties": {
+                        "ad_id": {"type": "string"},
+                        "ad_name": {"type": "string"},
+                        "reason": {"type": "string"},
+                        "confidence": _CONFIDENCE,
+                    },
+                    "required": ["ad_id", "reason", "confidence"],
+                },
+            },
+            "insights": _STRING_LIST,
+            "recommendations": _STRING_LIST,
+        },
+        "required": ["top_performers", "should_pause", "insights", "recommendations"],
+    },
+}
+
+
+def _tool_params(tool: dict[str, Any]) -> dict[str, Any]:
+    """ツール呼び出しを強制する messages.create パラメータ"""
+    return {
+        "tools": [tool],
+        "tool_choice": {"type": "tool", "name": tool["name"]},
+    }
+
+
+class RateLimiter:
+    """スレッドセーフな簡易レートリミッター（リクエスト間隔を一定以上に保つ）"""
+
+    def __init__(self, requests_per_minute: int):
+        self.interval = 60.0 / requests_per_minute if requests_per_minute > 0 else 0.0
+        self._lock = threading.Lock()
+        self._next_allowed = 0.0
+
+    def acquire(self) -> None:
+        """次のリクエストが許可されるまで待機"""
+        with self._lock:
+            now = time.monotonic()
+            wait = self._next_allowed - now
+            self._next_allowed = max(now, self._next_allowed) + self.interval
+        if wait > 0:
+            time.sleep(wait)
+
+
+# プロセス内のすべての PerformanceAnalyzer で共有する Claude API のレート制限
+_rate_limiter = RateLimiter(config.CLAUDE_REQUESTS_PER_MINUTE)
+
+# 分析結果キャッシュの掃除はディレクトリ全体を走査するため、この間隔（秒）に1回までにする
+_CACHE_SWEEP_INTERVAL_SECONDS = 300
+_cache_sweep_lock = threading.Lock()
+_last_cache_sweep = 0.0
+
+
+# ```json ... ``` で囲まれたJSON、または本文中の最初の { から最後の } まで
+_JSON_BLOCK_RE = re.compile(r"```(?:json)?\s*(\{.*?\})\s*```|(\{.*\})", re.DOTALL)
+
+
+def _extract_json(text: str) -> Any:
+    """
+    ClaudeのレスポンスからJSONを抽出してパース
+
+    Raises:
+        json.JSONDecodeError: JSONとして解釈できない場合
+    """
+    match = _JSON_BLOCK_RE.search(text)
+    if match:
+        text = match.group(1) or match.group(2)
+    return json.loads(text)
+
+
+def _compact_value(value: Any) -> Any:
+    """None・空のコンテナを除去し、キーを略称化、floatを小数2桁に丸める"""
+    if isinstance(value, dict):
+        compacted = {}
+        for key, item in value.items():
+            item = _compact_value(item)
+            if item is None or item == {} or item == []:
+                continue
+            compacted[DATA_KEY_ABBREVIATIONS.get(key, key)] = item
+        return compacted
+    if isinstance(value, (list, tuple)):
+        return [_compact_value(item) for item in value]
+    if isinstance(value, float):
+        return round(value, 2)
+    return value
+
+
+def _compact_json(data: Any) -> str:
+    """
+    プロンプト埋め込み用にデータを最小限のJSON文字列に変換
+
+    0 は「コンバージョン0件」などの意味を持つため除去しない。
+    """
+    return json.dumps(_compact_value(data), ensure_ascii=False, separators=(",", ":"))
+
+
+def _text(text: str) -> dict[str, Any]:
+    """テキストブロックを生成"""
+    return {"type": "text", "text": text}
+
+
+def _cached_text(text: str) -> dict[str, Any]:
+    """プロンプトキャッシュ対象のテキストブロックを生成"""
+    return {**_text(text), "cache_control": {"type": "ephemeral"}}
+
+
+# 静的なブロックはインポート時に1度だけ構築し、リクエスト間で使い回す
+#
+# キャッシュはブロック単位ではなく、ブレークポイントまでの先頭部分
+# （tools → system → 静的な指示ブロック）をまとめて対象にするため、
+# cache_control は静的な指示ブロックにのみ付ける。
+# ただし先頭部分が最小キャッシュ長（Sonnet は1024トークン、Haiku はそれ以上）に
+# 満たない間は、API はエラーにせずキャッシュせずに処理する。現状の指示は
+# いずれもこの長さに届かないため、指示が長くなるまでは効果がない。
+# 実際にキャッシュされたかは _request のデバッグログ（cache_read_input_tokens）で確認する。
+_ANALYSIS_SYSTEM = [_text(ANALYSIS_SYSTEM_PROMPT)]
+_BID_SYSTEM = [_text(BID_SYSTEM_PROMPT)]
+_CREATIVE_SYSTEM = [_text(CREATIVE_SYSTEM_PROMPT)]
+
+_ANALYSIS_STATIC_BLOCK = _cached_text(f"{ANALYSIS_INSTRUCTIONS}\n\n{DATA_KEY_LEGEND}")
+_BID_STATIC_BLOCK = _cached_text(
+    BID_INSTRUCTIONS.format(
+        max_bid_change_percent=config.BID_OPTIMIZATION["max_bid_change_percent"],
+        min_data_days=config.BID_OPTIMIZATION["min_data_days"],
+        min_conversions=config.BID_OPTIMIZATION["min_conversions"],
+    )
+    + f"\n\n{DATA_KEY_LEGEND}"
+)
+_CREATIVE_STATIC_BLOCK = _cached_text(f"{CREATIVE_INSTRUCTIONS}\n\n{DATA_KEY_LEGEND}")
+
+
 class PerformanceAnalyzer:
     """Claudeを使用してパフォーマンス分析を行うクラス"""
 
+    # APIキーごとに共有する Anthropic クライアント（HTTP接続プールを再利用する）
+    _shared_clients: ClassVar[dict[str, Anthropic]] = {}
+    _shared_clients_lock: ClassVar[threading.Lock] = threading.Lock()
+
     def __init__(self, api_key: str = None):
         self.api_key = api_key or config.ANTHROPIC_API_KEY
-        self.model = config.CLAUDE_MODEL
+        self.models = config.CLAUDE_MODELS
         self.client = None
+        self.cache_dir = config.ANALYSIS_CACHE_DIR
+        self.cache_ttl = config.ANALYSIS_CACHE_TTL_SECONDS
 
         if self.api_key:
-            self.client = Anthropic(api_key=self.api_key)
+            self.client = self._get_shared_client(self.api_key)
+
+    @classmethod
+    def _get_shared_client(cls, api_key: str) -> Anthropic:
+        """APIキーに対応する共有クライアントを取得（なければ生成）"""
+        with cls._shared_clients_lock:
+            client = cls._shared_clients.get(api_key)
+            if client is None:
+                client = Anthropic(api_key=api_key)
+                cls._shared_clients[api_key] = client
+            return client
 
     def analyze_performance(
         self,
         performance_data: dict[str, Any],
         target_cpa: float = None,
         target_roas: float = None,
+        bypass_cache: bool = False,
     ) -> dict[str, Any]:
         """
         パフォーマンスデータを分析し、改善提案を生成
@@ -36,6 +395,7 @@ class PerformanceAnalyzer:
             performance_data: パフォーマンスデータ
             target_cpa: 目標CPA
             target_roas: 目標ROAS
+            bypass_cache: True=キャッシュを使わず再分析
 
         Returns:
             dict: 分析結果と提案
@@ -44,48 +404,14 @@ class PerformanceAnalyzer:
             logger.error("Claude APIキーが設定されていません")
             return {"error": "APIキーが設定されていません"}
 
-        target_cpa = target_cpa or config.BID_OPTIMIZATION["default_target_cpa"]
-        target_roas = target_roas or config.BID_OPTIMIZATION["default_target_roas"]
-
-        prompt = self._build_analysis_prompt(performance_data, target_cpa, target_roas)
-
         try:
-            response = self.client.messages.create(
-                model=self.model,
-                max_tokens=2000,
-                messages=[
-                    {
-                        "role": "user",
-                        "content": prompt,
-                    }
-                ],
-                system="""あなたは広告運用の専門家です。
-Meta広告（Facebook/Instagram広告）のパフォーマンスデータを分析し、
-具体的で実行可能な改善提案を日本語で提供してください。
-回答はJSON形式で返してください。""",
+            result = self._request(
+                "analyze_performance",
+                self._build_analysis_request(performance_data, target_cpa, target_roas),
+                self._parse_analysis_response,
+                bypass_cache=bypass_cache,
             )
 
-            # レスポンスをパース
-            content = response.content[0].text
-            
-            # JSONを抽出
-            try:
-                # JSON部分を抽出
-                if "```json" in content:
-                    json_str = content.split("```json")[1].split("```")[0].strip()
-                elif "```" in content:
-                    json_str = content.split("```")[1].split("```")[0].strip()
-                else:
-                    json_str = content.strip()
-                
-                result = json.loads(json_str)
-            except json.JSONDecodeError:
-                # JSONパースに失敗した場合はテキストとして返す
-                result = {
-                    "analysis": content,
-                    "recommendations": [],
-                }
-
             logger.info("パフォーマンス分析が完了しました")
             return result
 
@@ -93,11 +419,67 @@ Meta広告（Facebook/Instagram広告）のパフォーマンスデータを分
             logger.error(f"パフォーマンス分析に失敗しました: {e}")
             return {"error": str(e)}
 
+    def analyze_performance_stream(
+        self,
+        performance_data: dict[str, Any],
+        target_cpa: float = None,
+        target_roas: float = None,
+    ) -> Iterator[str]:
+        """
+        パフォーマンス分析の応答テキストを生成されたそばから返す
+
+        CLIやダッシュボードで逐次表示する用途向け。連結したテキストは
+        analyze_performance がパースするものと同じで、最後まで出力されて
+        パースできた場合のみ結果をキャッシュに保存する。
+        API・ストリームのエラー時はログを出力して打ち切る。
+
+        Args:
+            performance_data: パフォーマンスデータ
+            target_cpa: 目標CPA
+            target_roas: 目標ROAS
+
+        Yields:
+            str: 応答（JSON）の断片
+        """
+        if not self.client:
+            logger.error("Claude APIキーが設定されていません")
+            return
+
+        params = self._build_analysis_request(performance_data, target_cpa, target_roas)
+
+        try:
+            _rate_limiter.acquire()
+            text_parts = []
+            with self.client.messages.stream(**params) as stream:
+                for event in stream:
+                    # ツール入力（JSON）の断片、またはテキストの断片
+                    if event.type == "input_json":
+                        chunk = event.partial_json
+                    elif event.type == "text":
+                        chunk = event.text
+                    else:
+                        continue
+                    text_parts.append(chunk)
+                    yield chunk
+                stop_reason = stream.get_final_message().stop_reason
+        except Exception as e:
+            logger.error(f"パフォーマンス分析（ストリーミング）に失敗しました: {e}")
+            return
+
+        # max_tokens で途中まで出力された応答やパースできない応答はキャッシュしない
+        if stop_reason not in ("tool_use", "end_turn"):
+            logger.warning(f"パフォーマンス分析の応答が途中で終了しました（{stop_reason}）")
+            return
+        result = self._parse_json_response("".join(text_parts))
+        if "error" not in result:
+            self._cache_set(self._cache_key("analyze_performance", params), result)
+
     def suggest_bid_adjustment(
         self,
         adset_data: dict[str, Any],
         target_cpa: float = None,
         target_roas: float = None,
+        bypass_cache: bool = False,
     ) -> dict[str, Any]:
         """
         入札調整の提案を生成
@@ -106,6 +488,7 @@ Meta広告（Facebook/Instagram広告）のパフォーマンスデータを分
             adset_data: 広告セットのパフォーマンスデータ
             target_cpa: 目標CPA
             target_roas: 目標ROAS
+            bypass_cache: True=キャッシュを使わず再生成
 
         Returns:
             dict: 入札調整の提案
@@ -114,73 +497,110 @@ Meta広告（Facebook/Instagram広告）のパフォーマンスデータを分
             logger.error("Claude APIキーが設定されていません")
             return {"error": "APIキーが設定されていません"}
 
-        target_cpa = target_cpa or config.BID_OPTIMIZATION["default_target_cpa"]
-        target_roas = target_roas or config.BID_OPTIMIZATION["default_target_roas"]
+        try:
+            return self._request(
+                "suggest_bid_adjustment",
+                self._build_bid_request(adset_data, target_cpa, target_roas),
+                self._parse_json_response,
+                bypass_cache=bypass_cache,
+            )
 
-        prompt = f"""以下のMeta広告セットのパフォーマンスデータに基づいて、入札調整の提案を行ってください。
+        except Exception as e:
+            logger.error(f"入札調整提案の生成に失敗しました: {e}")
+            return {"error": str(e)}
 
-## 現在のパフォーマンス
-```json
-{json.dumps(adset_data, ensure_ascii=False, indent=2)}
-```
+    def suggest_bid_adjustments_batch(
+        self,
+        adset_data_map: dict[str, dict[str, Any]],
+        target_cpa: float = None,
+        target_roas: float = None,
+        bypass_cache: bool = False,
+    ) -> dict[str, dict[str, Any]]:
+        """
+        Message Batches API で複数広告セットの入札調整提案をまとめて生成
 
-## 目標値
-- 目標CPA: {target_cpa}円
-- 目標ROAS: {target_roas}倍
+        即時性が不要な定期最適化向け。バッチ処理の完了までブロックする。
 
-## 制約条件
-- 入札額の変更は現在値の±{config.BID_OPTIMIZATION['max_bid_change_percent']}%以内
-- 最小データ期間: {config.BID_OPTIMIZATION['min_data_days']}日
-- 最小コンバージョン数: {config.BID_OPTIMIZATION['min_conversions']}件
+        Args:
+            adset_data_map: custom_id（広告セットID）をキーとしたパフォーマンスデータ
+            target_cpa: 目標CPA
+            target_roas: 目標ROAS
+            bypass_cache: True=キャッシュを使わず再生成
 
-以下のJSON形式で回答してください:
-{{
-  "should_adjust": true/false,
-  "current_bid": 現在の入札額,
-  "recommended_bid": 推奨入札額,
-  "change_percent": 変更率(%),
-  "reason": "調整理由",
-  "confidence": "high/medium/low",
-  "warnings": ["注意事項があれば"]
-}}"""
+        Returns:
+            dict: custom_idをキーとした入札調整の提案
+        """
+        if not self.client:
+            logger.error("Claude APIキーが設定されていません")
+            return {
+                custom_id: {"error": "APIキーが設定されていません"}
+                for custom_id in adset_data_map
+            }
+
+        results = {}
+        pending = {}
+        for custom_id, adset_data in adset_data_map.items():
+            params = self._build_bid_request(adset_data, target_cpa, target_roas)
+            key = self._cache_key("suggest_bid_adjustment", params)
+            cached = None if bypass_cache else self._cache_get(key)
+            if cached is not None:
+                results[custom_id] = cached
+            else:
+                pending[custom_id] = (key, params)
+
+        if not pending:
+            return results
 
         try:
-            response = self.client.messages.create(
-                model=self.model,
-                max_tokens=1000,
-                messages=[{"role": "user", "content": prompt}],
-                system="あなたは広告入札最適化の専門家です。データに基づいた慎重な判断を行ってください。",
+            batch = self.client.messages.batches.create(
+                requests=[
+                    {"custom_id": custom_id, "params": params}
+                    for custom_id, (_, params) in pending.items()
+                ],
             )
-
-            content = response.content[0].text
-            
-            try:
-                if "```json" in content:
-                    json_str = content.split("```json")[1].split("```")[0].strip()
-                elif "```" in content:
-                    json_str = content.split("```")[1].split("```")[0].strip()
+            logger.info(f"入札調整バッチを送信しました: {batch.id}（{len(pending)}件）")
+
+            poll_interval = config.BID_OPTIMIZATION["batch_poll_interval_seconds"]
+            deadline = time.monotonic() + config.BID_OPTIMIZATION["batch_timeout_seconds"]
+            while batch.processing_status != "ended":
+                if time.monotonic() > deadline:
+                    self.client.messages.batches.cancel(batch.id)
+                    raise TimeoutError(f"バッチ処理がタイムアウトしました: {batch.id}")
+                time.sleep(poll_interval)
+                batch = self.client.messages.batches.retrieve(batch.id)
+
+            for entry in self.client.messages.batches.results(batch.id):
+                if entry.custom_id not in pending:
+                    continue
+                if entry.result.type == "succeeded":
+                    result = self._extract_result(entry.result.message, self._parse_json_response)
+                    if "error" not in result:
+                        self._cache_set(pending[entry.custom_id][0], result)
                 else:
-                    json_str = content.strip()
-                
-                result = json.loads(json_str)
-            except json.JSONDecodeError:
-                result = {"error": "JSONパースエラー", "raw_response": content}
-
-            return result
+                    result = {"error": f"バッチリクエスト失敗: {entry.result.type}"}
+                results[entry.custom_id] = result
 
         except Exception as e:
-            logger.error(f"入札調整提案の生成に失敗しました: {e}")
-            return {"error": str(e)}
+            logger.error(f"入札調整バッチの処理に失敗しました: {e}")
+            for custom_id in pending:
+                results.setdefault(custom_id, {"error": str(e)})
+
+        for custom_id in pending:
+            results.setdefault(custom_id, {"error": "バッチ結果がありません"})
+
+        return results
 
     def analyze_creative_performance(
         self,
         creative_data: list[dict[str, Any]],
+        bypass_cache: bool = False,
     ) -> dict[str, Any]:
         """
         クリエイティブのパフォーマンスを分析
 
         Args:
             creative_data: クリエイティブごとのパフォーマンスデータ
+            bypass_cache: True=キャッシュを使わず再分析
 
         Returns:
             dict: 分析結果
@@ -189,95 +609,249 @@ Meta広告（Facebook/Instagram広告）のパフォーマンスデータを分
             logger.error("Claude APIキーが設定されていません")
             return {"error": "APIキーが設定されていません"}
 
-        prompt = f"""以下のMeta広告クリエイティブのパフォーマンスデータを分析してください。
+        prompt = [
+            _CREATIVE_STATIC_BLOCK,
+            {
+                "type": "text",
+                "text": CREATIVE_DATA_TEMPLATE.format_map({"data": _compact_json(creative_data)}),
+            },
+        ]
 
-## クリエイティブデータ
-```json
-{json.dumps(creative_data, ensure_ascii=False, indent=2)}
-```
+        try:
+            return self._request(
+                "analyze_creative_performance",
+                {
+                    "model": self.models["creative"],
+                    "max_tokens": 800,
+                    "messages": [{"role": "user", "content": prompt}],
+                    "system": _CREATIVE_SYSTEM,
+                    **_tool_params(CREATIVE_TOOL),
+                },
+                self._parse_json_response,
+                bypass_cache=bypass_cache,
+            )
 
-## 分析観点
-1. 最もパフォーマンスの良いクリエイティブ
-2. 停止を検討すべきクリエイティブ
-3. 改善のポイント
+        except Exception as e:
+            logger.error(f"クリエイティブ分析に失敗しました: {e}")
+            return {"error": str(e)}
 
-以下のJSON形式で回答してください:
-{{
-  "top_performers": [
-    {{"ad_id": "xxx", "ad_name": "xxx", "reason": "理由"}}
-  ],
-  "should_pause": [
-    {{"ad_id": "xxx", "ad_name": "xxx", "reason": "理由", "confidence": "high/medium/low"}}
-  ],
-  "insights": ["気づき1", "気づき2"],
-  "recommendations": ["改善提案1", "改善提案2"]
-}}"""
+    def _request(
+        self,
+        method: str,
+        params: dict[str, Any],
+        parse: Callable[[str], dict[str, Any]],
+        bypass_cache: bool = False,
+    ) -> dict[str, Any]:
+        """
+        Claudeにリクエストを送信し、パース済みの結果を返す
 
-        try:
-            response = self.client.messages.create(
-                model=self.model,
-                max_tokens=1500,
-                messages=[{"role": "user", "content": prompt}],
-                system="あなたは広告クリエイティブ分析の専門家です。データに基づいた客観的な分析を行ってください。",
+        同一のリクエスト（メソッド・モデル・プロンプト）はTTL内であれば
+        キャッシュから返す。エラーを含む結果はキャッシュしない。
+        """
+        key = self._cache_key(method, params)
+        if not bypass_cache:
+            cached = self._cache_get(key)
+            if cached is not None:
+                logger.debug(f"{method}: キャッシュを使用しました")
+                return cached
+
+        _rate_limiter.acquire()
+        with self.client.messages.stream(**params) as stream:
+            message = stream.get_final_message()
+
+        usage = getattr(message, "usage", None)
+        if usage is not None:
+            logger.debug(
+                f"{method}: キャッシュ読込{getattr(usage, 'cache_read_input_tokens', 0)}トークン / "
+                f"キャッシュ書込{getattr(usage, 'cache_creation_input_tokens', 0)}トークン / "
+                f"入力{getattr(usage, 'input_tokens', 0)}トークン"
             )
 
-            content = response.content[0].text
-            
-            try:
-                if "```json" in content:
-                    json_str = content.split("```json")[1].split("```")[0].strip()
-                elif "```" in content:
-                    json_str = content.split("```")[1].split("```")[0].strip()
-                else:
-                    json_str = content.strip()
-                
-                result = json.loads(json_str)
-            except json.JSONDecodeError:
-                result = {"error": "JSONパースエラー", "raw_response": content}
+        result = self._extract_result(message, parse)
 
-            return result
+        if "error" not in result:
+            self._cache_set(key, result)
 
-        except Exception as e:
-            logger.error(f"クリエイティブ分析に失敗しました: {e}")
-            return {"error": str(e)}
+        return result
 
-    def _build_analysis_prompt(
+    def _extract_result(
         self,
-        data: dict[str, Any],
-        target_cpa: float,
-        target_roas: float,
-    ) -> str:
-        """分析用プロンプトを構築"""
-        return f"""以下のMeta広告パフォーマンスデータを分析し、改善提案を行ってください。
+        message: Any,
+        parse: Callable[[str], dict[str, Any]],
+    ) -> dict[str, Any]:
+        """
+        レスポンスメッセージから結果を取り出す
 
-## パフォーマンスデータ
-```json
-{json.dumps(data, ensure_ascii=False, indent=2)}
-```
+        ツール呼び出しがあればその入力（dict）をそのまま返し、
+        なければテキストを parse でパースする。
+        """
+        for block in message.content:
+            if block.type == "tool_use":
+                return dict(block.input)
+
+        text = "".join(block.text for block in message.content if block.type == "text")
+        return parse(text)
+
+    def _cache_key(self, method: str, params: dict[str, Any]) -> str:
+        """キャッシュキーを生成（メソッド名とリクエスト全体のハッシュ）"""
+        payload = json.dumps(
+            {"method": method, "params": params},
+            ensure_ascii=False,
+            sort_keys=True,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _cache_get(self, key: str) -> dict[str, Any] | None:
+        """キャッシュから結果を取得（期限切れ・破損時は None）"""
+        cache_file = self.cache_dir / f"{key}.json"
+        if not cache_file.exists():
+            return None
 
-## 目標値
-- 目標CPA: {target_cpa}円
-- 目標ROAS: {target_roas}倍
+        try:
+            with open(cache_file, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except (json.JSONDecodeError, IOError):
+            cache_file.unlink(missing_ok=True)
+            return None
 
-## 分析してほしい観点
-1. 全体的なパフォーマンス評価
-2. 目標値との乖離
-3. トレンド（改善傾向/悪化傾向）
-4. 具体的な改善アクション
+        if time.time() - entry.get("created_at", 0) > self.cache_ttl:
+            # 期限切れのファイルは残しておいても使わないため削除
+            cache_file.unlink(missing_ok=True)
+            return None
 
-以下のJSON形式で回答してください:
-{{
-  "overall_score": 1-10の評価,
-  "summary": "全体サマリー",
-  "kpi_status": {{
-    "cpa": {{"current": 値, "target": 値, "status": "達成/未達"}},
-    "roas": {{"current": 値, "target": 値, "status": "達成/未達"}}
-  }},
-  "trend": "improving/stable/declining",
-  "recommendations": [
-    {{"priority": "high/medium/low", "action": "アクション内容", "expected_impact": "期待効果"}}
-  ],
-  "warnings": ["注意事項があれば"]
-}}"""
+        return entry.get("result")
+
+    def _cache_set(self, key: str, result: dict[str, Any]) -> None:
+        """結果をキャッシュに保存"""
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            cache_file = self.cache_dir / f"{key}.json"
+            tmp_file = cache_file.with_suffix(f".{threading.get_ident()}.tmp")
+            with open(tmp_file, "w", encoding="utf-8") as f:
+                json.dump({"created_at": time.time(), "result": result}, f, ensure_ascii=False)
+            tmp_file.replace(cache_file)
+        except IOError as e:
+            logger.warning(f"分析結果のキャッシュ保存に失敗しました: {e}")
+            return
+
+        self._sweep_cache()
+
+    def _sweep_cache(self) -> None:
+        """期限切れのキャッシュと、上限件数を超えた古いキャッシュを削除（一定間隔に1回まで）"""
+        global _last_cache_sweep
+        now = time.time()
+        with _cache_sweep_lock:
+            if now - _last_cache_sweep < _CACHE_SWEEP_INTERVAL_SECONDS:
+                return
+            _last_cache_sweep = now
+
+        entries = []
+        for cache_file in self.cache_dir.glob("*.json"):
+            try:
+                mtime = cache_file.stat().st_mtime
+            except OSError:
+                continue  # 他のスレッドが削除済み
+            if now - mtime > self.cache_ttl:
+                cache_file.unlink(missing_ok=True)
+            else:
+                entries.append((mtime, cache_file))
+
+        if len(entries) > config.ANALYSIS_CACHE_MAX_ENTRIES:
+            entries.sort()
+            for _, cache_file in entries[:-config.ANALYSIS_CACHE_MAX_ENTRIES]:
+                cache_file.unlink(missing_ok=True)
+
+    def _build_bid_request(
+        self,
+        adset_data: dict[str, Any],
+        target_cpa: float = None,
+        target_roas: float = None,
+    ) -> dict[str, Any]:
+        """入札調整提案の messages.create パラメータを構築"""
+        target_cpa = target_cpa or config.BID_OPTIMIZATION["default_target_cpa"]
+        target_roas = target_roas or config.BID_OPTIMIZATION["default_target_roas"]
+
+        prompt = [
+            _BID_STATIC_BLOCK,
+            {
+                "type": "text",
+                "text": BID_DATA_TEMPLATE.format_map({
+                    "data": _compact_json(adset_data),
+                    "target_cpa": target_cpa,
+                    "target_roas": target_roas,
+                }),
+            },
+        ]
+
+        return {
+            "model": self.models["bid"],
+            "max_tokens": 400,
+            "messages": [{"role": "user", "content": prompt}],
+            "system": _BID_SYSTEM,
+            **_tool_params(BID_TOOL),
+        }
+
+    def _build_analysis_request(
+        self,
+        performance_data: dict[str, Any],
+        target_cpa: float = None,
+        target_roas: float = None,
+    ) -> dict[str, Any]:
+        """パフォーマンス分析の messages.create パラメータを構築"""
+        target_cpa = target_cpa or config.BID_OPTIMIZATION["default_target_cpa"]
+        target_roas = target_roas or config.BID_OPTIMIZATION["default_target_roas"]
+
+        return {
+            "model": self.models["analysis"],
+            "max_tokens": 1200,
+            "messages": [
+                {
+                    "role": "user",
+                    "content": self._build_analysis_prompt(performance_data, target_cpa, target_roas),
+                }
+            ],
+            "system": _ANALYSIS_SYSTEM,
+            **_tool_params(ANALYSIS_TOOL),
+        }
+
+    def _parse_json_response(self, content: str) -> dict[str, Any]:
+        """レスポンスからJSONを抽出してパース"""
+        try:
+            return _extract_json(content)
+        except json.JSONDecodeError:
+            return {"error": "JSONパースエラー", "raw_response": content}
+
+    def _parse_analysis_response(self, content: str) -> dict[str, Any]:
+        """パフォーマンス分析のレスポンスをパース"""
+        result = self._parse_json_response(content)
+        if "raw_response" in result:
+            # JSONパースに失敗した場合はテキストとして返す
+            return {
+                "analysis": content,
+                "recommendations": [],
+            }
+        return result
 
+    def _build_analysis_prompt(
+        self,
+        data: dict[str, Any],
+        target_cpa: float,
+        target_roas: float,
+    ) -> list[dict[str, Any]]:
+        """
+        分析用プロンプトを構築
 
+        静的な指示・JSONスキーマをキャッシュ対象の先頭ブロックに、
+        毎回変わるデータと目標値を後続ブロックに分けて返す。
+        """
+        return [
+            _ANALYSIS_STATIC_BLOCK,
+            {
+                "type": "text",
+                "text": ANALYSIS_DATA_TEMPLATE.format_map({
+                    "data": _compact_json(data),
+                    "target_cpa": target_cpa,
+                    "target_roas": target_roas,
+                }),
+            },
+        ]
@@ -1,13 +1,15 @@
 """
 入札最適化モジュール
 """
-import json
+import asyncio
 import logging
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
 from typing import Any
 
 from meta_api import AdSetManager, InsightsManager
 from .analyzer import PerformanceAnalyzer
+from .operation_log import append_operation, compact_operation_log
 import config
 
 logger = logging.getLogger(__name__)
@@ -33,6 +35,7 @@ class BidOptimizer:
         target_cpa: float = None,
         target_roas: float = None,
         dry_run: bool = True,
+        insight: dict[str, Any] = None,
     ) -> dict[str, Any]:
         """
         広告セットの入札を最適化
@@ -42,6 +45,7 @@ class BidOptimizer:
             target_cpa: 目標CPA
             target_roas: 目標ROAS
             dry_run: True=実際には変更しない
+            insight: 取得済みのパフォーマンスデータ（省略時はAPIから取得）
 
         Returns:
             dict: 最適化結果
@@ -49,75 +53,154 @@ class BidOptimizer:
         target_cpa = target_cpa or self.config["default_target_cpa"]
         target_roas = target_roas or self.config["default_target_roas"]
 
-        # 広告セット情報を取得
-        adset = self.adset_manager.get_adset(adset_id)
-        if not adset:
-            return {"success": False, "error": "広告セットが見つかりません"}
+        prepared = self._prepare_adset(adset_id, insight)
+        if "error" in prepared:
+            return prepared
 
-        # パフォーマンスデータを取得
-        insights = self.insights_manager.get_adset_insights(
-            date_preset=f"last_{self.config['min_data_days']}d",
-            time_increment=0,  # 合計値
-            adset_ids=[adset_id],
-        )
+        # ルールベースで調整不要と判断できればClaudeに問い合わせない
+        suggestion = self._rule_based_suggestion(prepared, target_cpa)
+        if suggestion is None:
+            # Claudeに入札調整を提案させる
+            suggestion = self.analyzer.suggest_bid_adjustment(
+                adset_data=prepared["analysis_data"],
+                target_cpa=target_cpa,
+                target_roas=target_roas,
+            )
 
-        if not insights:
-            return {
-                "success": False,
-                "error": "パフォーマンスデータが取得できません",
-            }
+        return self._apply_suggestion(prepared, suggestion, dry_run)
 
-        insight = insights[0]
+    def optimize_all_adsets(
+        self,
+        status_filter: list[str] = None,
+        target_cpa: float = None,
+        target_roas: float = None,
+        dry_run: bool = True,
+    ) -> list[dict[str, Any]]:
+        """
+        すべてのアクティブな広告セットの入札を最適化
 
-        # 最小コンバージョン数チェック
-        if insight.get("conversions", 0) < self.config["min_conversions"]:
-            return {
-                "success": False,
-                "error": f"コンバージョン数が不足しています（{insight.get('conversions', 0)}/{self.config['min_conversions']}）",
-                "skip_reason": "insufficient_data",
-            }
+        Args:
+            status_filter: ステータスフィルタ
+            target_cpa: 目標CPA
+            target_roas: 目標ROAS
+            dry_run: True=実際には変更しない
 
-        # 分析データを準備
-        analysis_data = {
-            **adset,
-            "performance": insight,
-        }
+        Returns:
+            list[dict]: 各広告セットの最適化結果
+        """
+        compact_operation_log()
+        status_filter = status_filter or ["ACTIVE"]
+        
+        # 広告セット一覧を取得
+        adsets = self.adset_manager.get_adsets(status_filter=status_filter)
+        
+        # パフォーマンスデータは全広告セット分を1回で取得
+        insights_by_id = self._prefetch_insights(adsets)
+
+        # 各広告セットの最適化はAPI待ちが支配的なためスレッドで並列実行
+        # （Claude APIのレート制限は PerformanceAnalyzer 側で制御）
+        results_by_id = {}
+        with ThreadPoolExecutor(max_workers=config.MAX_PARALLEL_OPTIMIZATIONS) as executor:
+            futures = {}
+            for adset in adsets:
+                insight = insights_by_id.get(adset["id"])
+                if insight is None:
+                    results_by_id[adset["id"]] = self._no_insight_result()
+                    continue
+
+                logger.info(f"広告セット '{adset['name']}' を最適化中...")
+                future = executor.submit(
+                    self.optimize_adset_bid,
+                    adset_id=adset["id"],
+                    target_cpa=target_cpa,
+                    target_roas=target_roas,
+                    dry_run=dry_run,
+                    insight=insight,
+                )
+                futures[future] = adset
+
+            for future in as_completed(futures):
+                adset = futures[future]
+                try:
+                    results_by_id[adset["id"]] = future.result()
+                except Exception as e:
+                    logger.error(f"広告セット '{adset['name']}' の最適化に失敗しました: {e}")
+                    results_by_id[adset["id"]] = {"success": False, "error": str(e)}
+
+        results = [results_by_id[adset["id"]] for adset in adsets]
 
-        # Claudeに入札調整を提案させる
-        suggestion = self.analyzer.suggest_bid_adjustment(
-            adset_data=analysis_data,
-            target_cpa=target_cpa,
-            target_roas=target_roas,
+        # サマリー
+        optimized_count = sum(
+            1 for r in results
+            if r.get("suggestion", {}).get("should_adjust")
         )
+        logger.info(f"最適化完了: {optimized_count}/{len(results)} 件の広告セットで入札調整を提案")
 
-        if suggestion.get("error"):
-            return {"success": False, "error": suggestion["error"]}
+        return results
 
-        result = {
-            "adset_id": adset_id,
-            "adset_name": adset.get("name"),
-            "current_performance": insight,
-            "suggestion": suggestion,
-            "dry_run": dry_run,
-        }
+    async def optimize_all_adsets_async(
+        self,
+        status_filter: list[str] = None,
+        target_cpa: float = None,
+        target_roas: float = None,
+        dry_run: bool = True,
+    ) -> list[dict[str, Any]]:
+        """
+        すべてのアクティブな広告セットの入札を最適化（asyncio版）
 
-        # 実際に入札を変更
-        if suggestion.get("should_adjust") and not dry_run:
-            new_bid = suggestion.get("recommended_bid")
-            if new_bid:
-                success = self.adset_manager.update_adset_bid(adset_id, int(new_bid))
-                result["execution"] = {
-                    "success": success,
-                    "new_bid": new_bid,
-                    "timestamp": datetime.now().isoformat(),
-                }
+        イベントループ上のスケジューラ等から await で呼び出す用途向け。
+        Meta SDK・Claude呼び出しはブロッキングのため広告セット単位でスレッドに逃がし、
+        同時実行数は MAX_PARALLEL_OPTIMIZATIONS で制限する。
 
-                # 操作ログを保存
-                self._log_operation(result)
+        Args:
+            status_filter: ステータスフィルタ
+            target_cpa: 目標CPA
+            target_roas: 目標ROAS
+            dry_run: True=実際には変更しない
 
-        return result
+        Returns:
+            list[dict]: 各広告セットの最適化結果
+        """
+        compact_operation_log()
+        status_filter = status_filter or ["ACTIVE"]
 
-    def optimize_all_adsets(
+        adsets = await asyncio.to_thread(
+            self.adset_manager.get_adsets, status_filter=status_filter
+        )
+        insights_by_id = await asyncio.to_thread(self._prefetch_insights, adsets)
+        semaphore = asyncio.Semaphore(config.MAX_PARALLEL_OPTIMIZATIONS)
+
+        async def optimize(adset: dict[str, Any]) -> dict[str, Any]:
+            insight = insights_by_id.get(adset["id"])
+            if insight is None:
+                return self._no_insight_result()
+
+            async with semaphore:
+                logger.info(f"広告セット '{adset['name']}' を最適化中...")
+                try:
+                    return await asyncio.to_thread(
+                        self.optimize_adset_bid,
+                        adset_id=adset["id"],
+                        target_cpa=target_cpa,
+                        target_roas=target_roas,
+                        dry_run=dry_run,
+                        insight=insight,
+                    )
+                except Exception as e:
+                    logger.error(f"広告セット '{adset['name']}' の最適化に失敗しました: {e}")
+                    return {"success": False, "error": str(e)}
+
+        results = await asyncio.gather(*(optimize(adset) for adset in adsets))
+
+        optimized_count = sum(
+            1 for r in results
+            if r.get("suggestion", {}).get("should_adjust")
+        )
+        logger.info(f"最適化完了: {optimized_count}/{len(results)} 件の広告セットで入札調整を提案")
+
+        return list(results)
+
+    def optimize_all_adsets_batched(
         self,
         status_filter: list[str] = None,
         target_cpa: float = None,
@@ -125,7 +208,11 @@ class BidOptimizer:
         dry_run: bool = True,
     ) -> list[dict[str, Any]]:
         """
-        すべてのアクティブな広告セットの入札を最適化
+        すべてのアクティブな広告セットの入札を Message Batches API で一括最適化
+
+        Claudeへの問い合わせを1つのバッチにまとめて送信する（コスト50%減）。
+        結果が揃うまで待機するため、夜間などの定期実行向け。
+        対話的な用途では optimize_all_adsets / optimize_adset_bid を使用する。
 
         Args:
             status_filter: ステータスフィルタ
@@ -136,31 +223,57 @@ class BidOptimizer:
         Returns:
             list[dict]: 各広告セットの最適化結果
         """
+        compact_operation_log()
         status_filter = status_filter or ["ACTIVE"]
-        
-        # 広告セット一覧を取得
+        target_cpa = target_cpa or self.config["default_target_cpa"]
+        target_roas = target_roas or self.config["default_target_roas"]
+
         adsets = self.adset_manager.get_adsets(status_filter=status_filter)
-        
-        results = []
+
+        insights_by_id = self._prefetch_insights(adsets)
+
+        # 1パス目: データ取得と事前チェック（ルールベースで確定できるものは即適用）
+        results = {}
+        prepared_map = {}
         for adset in adsets:
-            logger.info(f"広告セット '{adset['name']}' を最適化中...")
-            
-            result = self.optimize_adset_bid(
-                adset_id=adset["id"],
-                target_cpa=target_cpa,
-                target_roas=target_roas,
-                dry_run=dry_run,
+            insight = insights_by_id.get(adset["id"])
+            if insight is None:
+                results[adset["id"]] = self._no_insight_result()
+                continue
+
+            prepared = self._prepare_adset(adset["id"], insight)
+            if "error" in prepared:
+                results[adset["id"]] = prepared
+                continue
+
+            suggestion = self._rule_based_suggestion(prepared, target_cpa)
+            if suggestion is not None:
+                results[adset["id"]] = self._apply_suggestion(prepared, suggestion, dry_run)
+            else:
+                prepared_map[adset["id"]] = prepared
+
+        # 2パス目: Claudeへの問い合わせをバッチで実行
+        suggestions = self.analyzer.suggest_bid_adjustments_batch(
+            {adset_id: p["analysis_data"] for adset_id, p in prepared_map.items()},
+            target_cpa=target_cpa,
+            target_roas=target_roas,
+        )
+
+        # 3パス目: 提案を適用
+        for adset_id, prepared in prepared_map.items():
+            results[adset_id] = self._apply_suggestion(
+                prepared, suggestions.get(adset_id, {}), dry_run
             )
-            results.append(result)
 
-        # サマリー
+        ordered = [results[adset["id"]] for adset in adsets]
+
         optimized_count = sum(
-            1 for r in results
+            1 for r in ordered
             if r.get("suggestion", {}).get("should_adjust")
         )
-        logger.info(f"最適化完了: {optimized_count}/{len(results)} 件の広告セットで入札調整を提案")
+        logger.info(f"バッチ最適化完了: {optimized_count}/{len(ordered)} 件の広告セットで入札調整を提案")
 
-        return results
+        return ordered
 
     def calculate_optimal_bid(
         self,
@@ -214,29 +327,159 @@ class BidOptimizer:
             "reason": reason,
         }
 
+    def _prefetch_insights(self, adsets: list[dict[str, Any]]) -> dict[str, dict[str, Any]]:
+        """
+        複数広告セットのパフォーマンスデータを1回のAPI呼び出しで取得
+
+        Returns:
+            dict: 広告セットIDをキーとしたパフォーマンスデータ
+        """
+        if not adsets:
+            return {}
+
+        insights = self.insights_manager.get_adset_insights(
+            date_preset=f"last_{self.config['min_data_days']}d",
+            time_increment=0,  # 合計値
+            adset_ids=[adset["id"] for adset in adsets],
+        )
+        return {i["adset_id"]: i for i in insights if i.get("adset_id")}
+
+    def _prepare_adset(
+        self,
+        adset_id: str,
+        insight: dict[str, Any] = None,
+    ) -> dict[str, Any]:
+        """
+        入札最適化に必要な広告セット情報とパフォーマンスデータを取得
+
+        Args:
+            adset_id: 広告セットID
+            insight: 取得済みのパフォーマンスデータ（省略時はAPIから取得）
+
+        Returns:
+            dict: adset / insight / analysis_data、またはエラー結果
+        """
+        # 広告セット情報を取得
+        adset = self.adset_manager.get_adset(adset_id)
+        if not adset:
+            return {"success": False, "error": "広告セットが見つかりません"}
+
+        # パフォーマンスデータを取得
+        if insight is None:
+            insights = self.insights_manager.get_adset_insights(
+                date_preset=f"last_{self.config['min_data_days']}d",
+                time_increment=0,  # 合計値
+                adset_ids=[adset_id],
+            )
+
+            if not insights:
+                return self._no_insight_result()
+
+            insight = insights[0]
+
+        # 最小コンバージョン数チェック
+        if insight.get("conversions", 0) < self.config["min_conversions"]:
+            return {
+                "success": False,
+                "error": f"コンバージョン数が不足しています（{insight.get('conversions', 0)}/{self.config['min_conversions']}）",
+                "skip_reason": "insufficient_data",
+            }
+
+        return {
+            "adset_id": adset_id,
+            "adset": adset,
+            "insight": insight,
+            # 分析データを準備
+            "analysis_data": {
+                **adset,
+                "performance": insight,
+            },
+        }
+
+    @staticmethod
+    def _no_insight_result() -> dict[str, Any]:
+        """パフォーマンスデータが取得できない場合の結果"""
+        return {
+            "success": False,
+            "error": "パフォーマンスデータが取得できません",
+        }
+
+    def _rule_based_suggestion(
+        self,
+        prepared: dict[str, Any],
+        target_cpa: float,
+    ) -> dict[str, Any] | None:
+        """
+        ルールベースで調整不要と判断できる場合に現状維持の提案を生成
+
+        CPAが目標付近で変更率が閾値未満、かつ十分なコンバージョン数がある場合のみ
+        Claudeへの問い合わせを省略する。
+
+        Returns:
+            dict: 現状維持の提案。Claudeに問い合わせるべき場合は None
+        """
+        current_bid = prepared["adset"].get("bid_amount")
+        insight = prepared["insight"]
+
+        if not current_bid or not insight.get("cpa"):
+            return None
+
+        if insight.get("conversions", 0) < self.config["rule_confidence_conversions"]:
+            return None
+
+        rule = self.calculate_optimal_bid(insight["cpa"], target_cpa, current_bid)
+        if abs(rule["change_percent"]) >= self.config["llm_escalation_threshold"]:
+            return None
+
+        return {
+            "should_adjust": False,
+            "current_bid": current_bid,
+            "recommended_bid": current_bid,
+            "change_percent": 0,
+            "reason": rule["reason"],
+            "confidence": "high",
+            "warnings": [],
+            "source": "rule",
+        }
+
+    def _apply_suggestion(
+        self,
+        prepared: dict[str, Any],
+        suggestion: dict[str, Any],
+        dry_run: bool,
+    ) -> dict[str, Any]:
+        """入札調整の提案を結果にまとめ、必要なら実際に入札を変更"""
+        if suggestion.get("error"):
+            return {"success": False, "error": suggestion["error"]}
+
+        adset_id = prepared["adset_id"]
+        result = {
+            "adset_id": adset_id,
+            "adset_name": prepared["adset"].get("name"),
+            "current_performance": prepared["insight"],
+            "suggestion": suggestion,
+            "dry_run": dry_run,
+        }
+
+        # 実際に入札を変更
+        if suggestion.get("should_adjust") and not dry_run:
+            new_bid = suggestion.get("recommended_bid")
+            if new_bid:
+                success = self.adset_manager.update_adset_bid(adset_id, int(new_bid))
+                result["execution"] = {
+                    "success": success,
+                    "new_bid": new_bid,
+                    "timestamp": datetime.now().isoformat(),
+                }
+
+                # 操作ログを保存
+                self._log_operation(result)
+
+        return result
+
     def _log_operation(self, operation: dict[str, Any]) -> None:
         """操作ログを保存"""
-        log_file = config.OPERATION_LOG_FILE
-        log_file.parent.mkdir(parents=True, exist_ok=True)
-
-        logs = []
-        if log_file.exists():
-            try:
-                with open(log_file, "r", encoding="utf-8") as f:
-                    logs = json.load(f)
-            except (json.JSONDecodeError, IOError):
-                logs = []
-
-        logs.append({
-            "timestamp": datetime.now().isoformat(),
+        append_operation({
             "type": "bid_optimization",
             "data": operation,
         })
-
-        # 最新1000件のみ保持
-        logs = logs[-1000:]
-
-        with open(log_file, "w", encoding="utf-8") as f:
-            json.dump(logs, f, ensure_ascii=False, indent=2)
-
-
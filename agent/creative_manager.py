@@ -1,13 +1,17 @@
 """
 クリエイティブ自動管理モジュール
 """
-import json
+import heapq
 import logging
 from datetime import datetime, timedelta
 from typing import Any
 
+import pandas as pd
+
 from meta_api import AdManager, InsightsManager
+from notifiers import SlackNotifier
 from .analyzer import PerformanceAnalyzer
+from .operation_log import append_operation, compact_operation_log
 import config
 
 logger = logging.getLogger(__name__)
@@ -82,6 +86,7 @@ class CreativeManager:
         Returns:
             dict: 実行結果
         """
+        compact_operation_log()
         low_performers = self.check_low_performers(days)
 
         if not low_performers:
@@ -170,15 +175,13 @@ class CreativeManager:
         min_imp = self.config["min_impressions"]
         filtered = [i for i in insights if i.get("impressions", 0) >= min_imp]
 
-        # 指標でソート
-        reverse = metric not in ["cpa"]  # CPAは小さい方が良い
-        sorted_data = sorted(
-            filtered,
-            key=lambda x: x.get(metric) or 0,
-            reverse=reverse,
-        )
+        # 指標で上位 limit 件のみ部分ソート
+        def sort_key(x):
+            return x.get(metric) or 0
 
-        return sorted_data[:limit]
+        if metric in ["cpa"]:  # CPAは小さい方が良い
+            return heapq.nsmallest(limit, filtered, key=sort_key)
+        return heapq.nlargest(limit, filtered, key=sort_key)
 
     def analyze_with_ai(
         self,
@@ -225,46 +228,81 @@ class CreativeManager:
         Returns:
             dict: 広告IDをキーとした集計データ
         """
-        aggregated = {}
+        # 判定閾値は1回だけ読み出す
+        ctr_threshold = self.config["ctr_threshold"]
+        cvr_threshold = self.config["cvr_threshold"]
+        daily_min_impressions = self.config["daily_min_impressions"]
+        daily_min_clicks = self.config["daily_min_clicks"]
+        min_clicks = self.config["min_clicks"]
+
+        df = pd.DataFrame(insights)
+        if df.empty or "ad_id" not in df.columns:
+            return {}
+
+        df = df[df["ad_id"].notna() & (df["ad_id"] != "")]
+        if df.empty:
+            return {}
+
+        for col in ("impressions", "clicks", "conversions", "spend"):
+            if col not in df.columns:
+                df[col] = 0
+            df[col] = pd.to_numeric(df[col], errors="coerce").fillna(0)
+        if "ad_name" not in df.columns:
+            df["ad_name"] = None
+
+        # 日別の低パフォーマンス判定
+        # 日別の最小インプレッション以上でCTR、最小クリック以上でCVRを判定
+        impressions = df["impressions"].to_numpy()
+        clicks = df["clicks"].to_numpy()
+        conversions = df["conversions"].to_numpy()
+        df["low_ctr"] = (impressions >= daily_min_impressions) & (
+            clicks * 100 < ctr_threshold * impressions
+        )
+        df["low_cvr"] = (clicks >= daily_min_clicks) & (
+            conversions * 100 < cvr_threshold * clicks
+        )
 
-        for insight in insights:
-            ad_id = insight.get("ad_id")
-            if not ad_id:
-                continue
-
-            if ad_id not in aggregated:
-                aggregated[ad_id] = {
-                    "ad_id": ad_id,
-                    "ad_name": insight.get("ad_name"),
-                    "daily_data": [],
-                    "total_impressions": 0,
-                    "total_clicks": 0,
-                    "total_conversions": 0,
-                    "total_spend": 0,
-                    "low_ctr_days": 0,
-                    "low_cvr_days": 0,
-                }
-
-            aggregated[ad_id]["daily_data"].append(insight)
-            aggregated[ad_id]["total_impressions"] += insight.get("impressions", 0)
-            aggregated[ad_id]["total_clicks"] += insight.get("clicks", 0)
-            aggregated[ad_id]["total_conversions"] += insight.get("conversions", 0)
-            aggregated[ad_id]["total_spend"] += insight.get("spend", 0)
-
-            # 日別の低パフォーマンスをカウント
-            daily_imp = insight.get("impressions", 0)
-            daily_clicks = insight.get("clicks", 0)
-            daily_conv = insight.get("conversions", 0)
-
-            if daily_imp >= 100:  # 最小インプレッション
-                daily_ctr = daily_clicks / daily_imp * 100
-                if daily_ctr < self.config["ctr_threshold"]:
-                    aggregated[ad_id]["low_ctr_days"] += 1
-
-            if daily_clicks >= 10:  # 最小クリック
-                daily_cvr = daily_conv / daily_clicks * 100
-                if daily_cvr < self.config["cvr_threshold"]:
-                    aggregated[ad_id]["low_cvr_days"] += 1
+        grouped = df.groupby("ad_id", sort=False)
+        summary = grouped.agg(
+            ad_name=("ad_name", "first"),
+            total_impressions=("impressions", "sum"),
+            total_clicks=("clicks", "sum"),
+            total_conversions=("conversions", "sum"),
+            total_spend=("spend", "sum"),
+            low_ctr_days=("low_ctr", "sum"),
+            low_cvr_days=("low_cvr", "sum"),
+        )
+        row_positions = grouped.indices
+
+        # 期間合計のCTR/CVR（CVRは最小クリック数を満たす広告のみ）
+        impressions_total = summary["total_impressions"]
+        clicks_total = summary["total_clicks"]
+        summary["total_ctr"] = (
+            summary["total_clicks"] / impressions_total.where(impressions_total > 0) * 100
+        ).fillna(0.0)
+        summary["total_cvr"] = (
+            summary["total_conversions"]
+            / clicks_total.where((clicks_total >= min_clicks) & (clicks_total > 0))
+            * 100
+        )
+
+        # 既存の辞書形式に変換
+        aggregated = {}
+        for row in summary.itertuples():
+            ad_id = row.Index
+            aggregated[ad_id] = {
+                "ad_id": ad_id,
+                "ad_name": row.ad_name if pd.notna(row.ad_name) else None,
+                "daily_data": [insights[i] for i in df.index[row_positions[ad_id]]],
+                "total_impressions": int(row.total_impressions),
+                "total_clicks": int(row.total_clicks),
+                "total_conversions": int(row.total_conversions),
+                "total_spend": float(row.total_spend),
+                "low_ctr_days": int(row.low_ctr_days),
+                "low_cvr_days": int(row.low_cvr_days),
+                "total_ctr": float(row.total_ctr),
+                "total_cvr": float(row.total_cvr) if pd.notna(row.total_cvr) else None,
+            }
 
         return aggregated
 
@@ -301,20 +339,12 @@ class CreativeManager:
             result["skip_reason"] = "insufficient_impressions"
             return result
 
-        # CTRチェック
-        total_ctr = (
-            data["total_clicks"] / data["total_impressions"] * 100
-            if data["total_impressions"] > 0 else 0
-        )
+        # CTR/CVRは集計時に計算済み（CVRは最小クリック数未満なら None）
+        total_ctr = data["total_ctr"]
         result["performance"]["ctr"] = round(total_ctr, 2)
 
-        # CVRチェック
-        total_cvr = None
-        if data["total_clicks"] >= self.config["min_clicks"]:
-            total_cvr = (
-                data["total_conversions"] / data["total_clicks"] * 100
-                if data["total_clicks"] > 0 else 0
-            )
+        total_cvr = data["total_cvr"]
+        if total_cvr is not None:
             result["performance"]["cvr"] = round(total_cvr, 2)
 
         # 連続低パフォーマンス判定
@@ -324,7 +354,7 @@ class CreativeManager:
             result["is_low_performer"] = True
             result["reason"] = f"CTRが{consecutive_days}日連続で閾値以下（CTR: {total_ctr:.2f}%）"
 
-        if data["low_cvr_days"] >= consecutive_days:
+        if total_cvr is not None and data["low_cvr_days"] >= consecutive_days:
             result["is_low_performer"] = True
             result["reason"] = f"CVRが{consecutive_days}日連続で閾値以下（CVR: {total_cvr:.2f}%）"
 
@@ -332,26 +362,7 @@ class CreativeManager:
 
     def _log_operation(self, operation: dict[str, Any]) -> None:
         """操作ログを保存"""
-        log_file = config.OPERATION_LOG_FILE
-        log_file.parent.mkdir(parents=True, exist_ok=True)
-
-        logs = []
-        if log_file.exists():
-            try:
-                with open(log_file, "r", encoding="utf-8") as f:
-                    logs = json.load(f)
-            except (json.JSONDecodeError, IOError):
-                logs = []
-
-        logs.append({
-            "timestamp": datetime.now().isoformat(),
-            **operation,
-        })
-
-        logs = logs[-1000:]
-
-        with open(log_file, "w", encoding="utf-8") as f:
-            json.dump(logs, f, ensure_ascii=False, indent=2)
+        append_operation(operation)
 
     def _send_notification(self, result: dict[str, Any]) -> None:
         """Slack通知を送信"""
@@ -359,8 +370,6 @@ class CreativeManager:
             return
 
         try:
-            import requests
-
             paused_ads = result.get("paused_ads", [])
             message = {
                 "blocks": [
@@ -403,11 +412,7 @@ class CreativeManager:
                     ],
                 })
 
-            requests.post(
-                config.SLACK_WEBHOOK_URL,
-                json=message,
-                timeout=30,
-            )
+            SlackNotifier(config.SLACK_WEBHOOK_URL).send_message(message)
         except Exception as e:
             logger.error(f"Slack通知に失敗しました: {e}")
 
@@ -2,16 +2,162 @@
 統合エージェント
 Meta APIからリアルデータを取得し、インテリジェントエージェントで分析
 """
+import asyncio
 import logging
-from datetime import datetime, timedelta
-from typing import Any
+import threading
+import time
+from datetime import date, datetime, timedelta
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Any, Callable, Iterable
+
+import numpy as np
 
 import config
 from meta_api import MetaAuth, CampaignManager, AdSetManager, AdManager, InsightsManager
-from knowledge_engine import IntelligentAgent, PatternLearner
+from meta_api import AsyncInsightsScheduler, GraphBatch
+from meta_api.insights import INSIGHT_FIELDS, SUM_INSIGHT_FIELDS
+from knowledge_engine import IntelligentAgent, PatternLearner, Predictor
 
 logger = logging.getLogger(__name__)
 
+# キャッシュキーごとの取得を直列化するロックの本数（キーはハッシュで振り分ける）
+_KEY_LOCK_STRIPES = 64
+
+# この行数以上のInsightsはNumPyで列ごとにまとめて集計する
+VECTORIZE_MIN_ROWS = 200
+
+
+@lru_cache(maxsize=16)
+def _canonical_account_id(account_id: str) -> str:
+    """アカウントIDを act_ 付きの形式に揃える"""
+    return account_id if account_id.startswith("act_") else f"act_{account_id}"
+
+
+# コンバージョン・売上として扱うアクションタイプ
+_CONVERSION_ACTIONS = frozenset({"purchase", "lead", "complete_registration"})
+_REVENUE_ACTIONS = frozenset({"purchase", "omni_purchase"})
+
+# 合計対象の指標と型
+_SUM_COLUMNS = {
+    "spend": float,
+    "impressions": int,
+    "clicks": int,
+    "conversions": int,
+    "conversion_value": float,
+    "reach": int,
+    "follows": int,
+    "page_engagements": int,
+    "link_clicks": int,
+}
+
+
+# =============================================================================
+# デモモード用データ（Meta API未接続時）
+# 呼び出し側で変更されないよう読み取り専用で保持し、返す際に dict へコピーする
+# =============================================================================
+_DEMO_PROJECT = MappingProxyType({
+    "name": "デモ案件",
+    "industry": "健康食品",
+    "target_cpa": 5000,
+    "target_roas": 3.5,
+    "has_article_lp": True,
+    "offer": "初回980円",
+})
+
+_DEMO_PERFORMANCE = MappingProxyType({
+    "spend": 85000,
+    "impressions": 320000,
+    "clicks": 5760,
+    "conversions": 18,
+    "ctr": 1.8,
+    "cpc": 15,
+    "cvr": 0.31,
+    "cpa": 4722,
+    "roas": 3.8,
+})
+
+_DEMO_CAMPAIGNS = (
+    MappingProxyType({
+        "name": "美容サプリA",
+        "industry": "美容・コスメ",
+        "target_cpa": 5000,
+        "performance": MappingProxyType({"spend": 95000, "impressions": 380000, "clicks": 6840, "conversions": 16, "ctr": 1.8, "cvr": 0.23, "cpa": 5938, "roas": 2.8}),
+    }),
+    MappingProxyType({
+        "name": "健康食品B",
+        "industry": "健康食品",
+        "target_cpa": 6000,
+        "performance": MappingProxyType({"spend": 120000, "impressions": 500000, "clicks": 7500, "conversions": 25, "ctr": 1.5, "cvr": 0.33, "cpa": 4800, "roas": 4.2}),
+    }),
+    MappingProxyType({
+        "name": "オンライン講座C",
+        "industry": "教育",
+        "target_cpa": 10000,
+        "performance": MappingProxyType({"spend": 80000, "impressions": 200000, "clicks": 4000, "conversions": 10, "ctr": 2.0, "cvr": 0.25, "cpa": 8000, "roas": 6.5}),
+    }),
+)
+
+_DEMO_REPORT_PROJECTS = (
+    MappingProxyType({"name": "美容サプリA", "target_cpa": 5000, "target_roas": 3.0, "performance": MappingProxyType({"spend": 95000, "conversions": 16, "cpa": 5938, "roas": 2.8})}),
+    MappingProxyType({"name": "健康食品B", "target_cpa": 6000, "target_roas": 4.0, "performance": MappingProxyType({"spend": 120000, "conversions": 25, "cpa": 4800, "roas": 4.2})}),
+    MappingProxyType({"name": "オンライン講座C", "target_cpa": 10000, "target_roas": 5.0, "performance": MappingProxyType({"spend": 80000, "conversions": 10, "cpa": 8000, "roas": 6.5})}),
+)
+
+_DEMO_REPORT_CURRENT = MappingProxyType({
+    "spend": 295000,
+    "impressions": 1200000,
+    "clicks": 18000,
+    "conversions": 51,
+    "ctr": 1.5,
+    "cvr": 0.28,
+    "cpa": 5784,
+    "roas": 4.1,
+})
+
+_DEMO_REPORT_PREVIOUS = MappingProxyType({
+    "spend": 280000,
+    "impressions": 1150000,
+    "clicks": 17000,
+    "conversions": 48,
+    "ctr": 1.48,
+    "cvr": 0.28,
+    "cpa": 5833,
+    "roas": 3.9,
+})
+
+_DEMO_BUDGET_PERFORMANCE = MappingProxyType({
+    "spend": 100000,
+    "impressions": 400000,
+    "clicks": 6000,
+    "conversions": 20,
+    "ctr": 1.5,
+    "cvr": 0.33,
+    "cpc": 17,
+    "cpa": 5000,
+    "roas": 4.0,
+})
+
+
+class _AccountManagers:
+    """広告アカウントごとのマネージャー一式"""
+
+    __slots__ = ("account_id", "campaign", "adset", "ad", "insights")
+
+    def __init__(self, account_id: str, ad_account):
+        self.account_id = account_id
+        self.campaign = CampaignManager(ad_account)
+        self.adset = AdSetManager(ad_account)
+        self.ad = AdManager(ad_account)
+        self.insights = InsightsManager(ad_account)
+
+    def __getitem__(self, key: str):
+        # 旧来の managers["campaign"] 形式の参照にも対応
+        try:
+            return getattr(self, key)
+        except AttributeError:
+            raise KeyError(key) from None
+
 
 class IntegratedAgent:
     """
@@ -44,39 +190,171 @@ class IntegratedAgent:
         # インテリジェントエージェント初期化
         self.agent = IntelligentAgent()
         self.pattern_learner = PatternLearner()
+        self._predictor = Predictor()
         
         # マネージャー（広告アカウントごとに初期化）
-        self._managers = {}  # account_id -> managers dict
+        self._managers: dict[str, _AccountManagers] = {}
+        self._managers_lock = threading.Lock()
+        
+        # Graph API 取得結果のTTLキャッシュ
+        self._cache: dict[tuple, tuple[float, Any]] = {}  # key -> (有効期限, 値)
+        self._cache_lock = threading.Lock()
+        # キーの種類は無制限に増えるため、ロックは固定本数を使い回す
+        self._key_locks = tuple(threading.Lock() for _ in range(_KEY_LOCK_STRIPES))
         
         logger.info("🤖 IntegratedAgent 初期化完了")
 
+    @staticmethod
+    def _resolve_account_id(account_id: str = None) -> str | None:
+        """アカウントIDを act_ 形式に正規化（省略時は設定ファイルの最初のアカウント）"""
+        if not account_id:
+            if not config.META_AD_ACCOUNT_IDS:
+                return None
+            account_id = config.META_AD_ACCOUNT_IDS[0]
+        return _canonical_account_id(account_id)
+
     def _get_managers(self, account_id: str = None):
         """広告アカウント用のマネージャーを取得（遅延初期化）"""
         if not self.meta_initialized:
             return None
         
+        account_id = self._resolve_account_id(account_id)
         if not account_id:
-            if config.META_AD_ACCOUNT_IDS:
-                account_id = config.META_AD_ACCOUNT_IDS[0]
-            else:
-                return None
+            return None
         
-        if not account_id.startswith("act_"):
-            account_id = f"act_{account_id}"
-        
-        if account_id not in self._managers:
-            ad_account = self.meta_auth.get_ad_account(account_id)
-            if ad_account:
-                self._managers[account_id] = {
-                    "campaign": CampaignManager(ad_account),
-                    "adset": AdSetManager(ad_account),
-                    "ad": AdManager(ad_account),
-                    "insights": InsightsManager(ad_account),
-                }
+        managers = self._managers.get(account_id)
+        if managers:
+            return managers
+        
+        with self._managers_lock:
+            if account_id not in self._managers:
+                ad_account = self.meta_auth.get_ad_account(account_id)
+                if not ad_account:
+                    return None
+                self._managers[account_id] = _AccountManagers(account_id, ad_account)
+            
+            return self._managers[account_id]
+
+    # =========================================================================
+    # Graph API 取得結果のキャッシュ
+    # =========================================================================
+
+    @staticmethod
+    def _insights_ttl(date_preset: str) -> int:
+        """Insightsのキャッシュ有効期間（確定済みの期間は長く保持）"""
+        if date_preset == "yesterday":
+            return config.META_CACHE_TTL["closed_insights"]
+        return config.META_CACHE_TTL["insights"]
+
+    def _key_lock_index(self, key: tuple) -> int:
+        """キャッシュキーに対応するロックの番号"""
+        return hash(key) % _KEY_LOCK_STRIPES
+
+    def _key_lock(self, key: tuple) -> threading.Lock:
+        """キャッシュキーに対応するロックを取得（別のキーと共有する場合がある）"""
+        return self._key_locks[self._key_lock_index(key)]
+
+    def _cache_get(self, key: tuple) -> Any:
+        """有効期限内のキャッシュを取得（なければ None）"""
+        with self._cache_lock:
+            entry = self._cache.get(key)
+            if entry and entry[0] > time.monotonic():
+                return entry[1]
+            return None
+
+    def _cache_set(self, key: tuple, ttl: int, value: Any) -> None:
+        """キャッシュに保存（取得失敗時の空結果は保存しない）"""
+        if not value:
+            return
+        with self._cache_lock:
+            self._cache[key] = (time.monotonic() + ttl, value)
+
+    def _cached_call(self, key: tuple, ttl: int, producer: Callable[[], Any]) -> Any:
+        """
+        キャッシュがあれば返し、なければ producer の結果をキャッシュして返す
+        
+        同じキーの同時呼び出しはロックで待たせ、API呼び出しを1回にまとめる。
+        ロックは別のキーと共有することがあるため、producer の中からキャッシュを使わないこと。
+        """
+        cached = self._cache_get(key)
+        if cached is not None:
+            return cached
+        
+        with self._key_lock(key):
+            cached = self._cache_get(key)
+            if cached is not None:
+                return cached
+            value = producer()
+            self._cache_set(key, ttl, value)
+            return value
+
+    def _cached_batch(self, requests: list[tuple[str, tuple, int, Callable]]) -> dict[str, Any]:
+        """
+        キャッシュにない取得のみをGraph APIバッチにまとめて実行
+        
+        Args:
+            requests: (結果キー, キャッシュキー, TTL, バッチ登録関数) のリスト
+                バッチ登録関数は (graph_batch, 結果キー) を受け取る
+        
+        Returns:
+            dict: 結果キーごとの取得結果
+        """
+        results = {}
+        missing = []
+        for name, key, ttl, add_to_batch in requests:
+            cached = self._cache_get(key)
+            if cached is not None:
+                results[name] = cached
             else:
-                return None
+                missing.append((name, key, ttl, add_to_batch))
+        
+        if not missing:
+            return results
         
-        return self._managers[account_id]
+        # デッドロックを避けるため、ロックの番号順に取得（同じロックは1回だけ）
+        locks = [
+            self._key_locks[index]
+            for index in sorted({self._key_lock_index(m[1]) for m in missing})
+        ]
+        for lock in locks:
+            lock.acquire()
+        try:
+            graph_batch = None
+            pending = []
+            for name, key, ttl, add_to_batch in missing:
+                cached = self._cache_get(key)
+                if cached is not None:
+                    results[name] = cached
+                    continue
+                graph_batch = graph_batch or GraphBatch(self.meta_auth.api)
+                add_to_batch(graph_batch, name)
+                pending.append((name, key, ttl))
+            
+            if graph_batch:
+                fetched = graph_batch.execute()
+                for name, key, ttl in pending:
+                    self._cache_set(key, ttl, fetched[name])
+                    results[name] = fetched[name]
+        finally:
+            for lock in reversed(locks):
+                lock.release()
+        
+        return results
+
+    def invalidate(self, account_id: str = None) -> None:
+        """
+        キャッシュを破棄（予算・ステータス変更後に呼び出す）
+        
+        Args:
+            account_id: 広告アカウントID（省略時は全アカウント）
+        """
+        account_id = self._resolve_account_id(account_id) if account_id else None
+        with self._cache_lock:
+            if account_id is None:
+                self._cache.clear()
+            else:
+                for key in [k for k in self._cache if k[0] == account_id]:
+                    del self._cache[key]
 
     def get_account_overview(self, account_id: str = None) -> dict[str, Any]:
         """
@@ -91,29 +369,45 @@ class IntegratedAgent:
         if not self.meta_initialized:
             return {"error": "Meta APIが初期化されていません", "demo_mode": True}
         
+        account_id = self._resolve_account_id(account_id)
         if not account_id:
-            if config.META_AD_ACCOUNT_IDS:
-                account_id = config.META_AD_ACCOUNT_IDS[0]
-            else:
-                return {"error": "広告アカウントIDが設定されていません"}
-        
-        # アカウントIDの形式を確認
-        if not account_id.startswith("act_"):
-            account_id = f"act_{account_id}"
+            return {"error": "広告アカウントIDが設定されていません"}
         
         try:
             managers = self._get_managers(account_id)
             if not managers:
                 return {"error": "マネージャーの初期化に失敗しました"}
             
-            # キャンペーン一覧
-            campaigns = managers["campaign"].get_campaigns(status_filter=["ACTIVE"])
-            
-            # 広告セット一覧
-            adsets = managers["adset"].get_adsets(status_filter=["ACTIVE"])
-            
-            # 直近7日のパフォーマンス
-            insights = managers["insights"].get_account_insights(date_preset="last_7d")
+            # キャンペーン一覧・広告セット一覧・直近7日のパフォーマンスを1回のバッチで取得
+            fetched = self._cached_batch([
+                (
+                    "campaigns",
+                    (account_id, "campaigns", ("ACTIVE",)),
+                    config.META_CACHE_TTL["lists"],
+                    lambda b, name: managers.campaign.add_campaigns_to_batch(
+                        b, name, status_filter=["ACTIVE"],
+                    ),
+                ),
+                (
+                    "adsets",
+                    (account_id, "adsets", ("ACTIVE",)),
+                    config.META_CACHE_TTL["lists"],
+                    lambda b, name: managers.adset.add_adsets_to_batch(
+                        b, name, status_filter=["ACTIVE"],
+                    ),
+                ),
+                (
+                    "insights",
+                    (account_id, "insights", "account", "last_7d", 1),
+                    self._insights_ttl("last_7d"),
+                    lambda b, name: managers.insights.add_insights_to_batch(
+                        b, name, level="account", date_preset="last_7d",
+                    ),
+                ),
+            ])
+            campaigns = fetched["campaigns"]
+            adsets = fetched["adsets"]
+            insights = fetched["insights"]
             
             return {
                 "account_id": account_id,
@@ -157,37 +451,48 @@ class IntegratedAgent:
                 return {"error": "マネージャーの初期化に失敗しました"}
             
             # パフォーマンスデータ取得
-            insights = managers["insights"].get_campaign_insights(
-                date_preset="last_7d",
-                campaign_ids=[campaign_id],
+            insights = self._cached_call(
+                (managers.account_id, "insights", "campaign", "last_7d", 1, (campaign_id,)),
+                self._insights_ttl("last_7d"),
+                lambda: managers.insights.get_campaign_insights(
+                    date_preset="last_7d",
+                    campaign_ids=[campaign_id],
+                ),
             )
             
-            if not insights:
-                return {"error": "パフォーマンスデータがありません"}
-            
-            # パフォーマンスデータを整形
-            performance = self._format_performance(insights[0] if insights else {})
-            
-            # 案件情報がない場合はデフォルト値
-            project = project_info or {
-                "name": f"Campaign {campaign_id}",
-                "industry": "健康食品",
-                "target_cpa": config.BID_OPTIMIZATION["default_target_cpa"],
-                "target_roas": config.BID_OPTIMIZATION["default_target_roas"],
-            }
-            
-            # AI分析実行
-            result = self.agent.analyze_and_decide(
-                project=project,
-                performance=performance,
-            )
-            
-            return result
+            return self._analyze_campaign_insights(campaign_id, insights, project_info)
             
         except Exception as e:
             logger.error(f"キャンペーン分析エラー: {e}")
             return {"error": str(e)}
 
+    def _analyze_campaign_insights(
+        self,
+        campaign_id: str,
+        insights: list[dict],
+        project_info: dict = None,
+    ) -> dict[str, Any]:
+        """取得済みのキャンペーンInsightsをAI分析"""
+        if not insights:
+            return {"error": "パフォーマンスデータがありません"}
+        
+        # パフォーマンスデータを整形（_parse_insight 済みのためフラット版を使用）
+        performance = self._format_performance_flat(insights[0])
+        
+        # 案件情報がない場合はデフォルト値
+        project = project_info or {
+            "name": f"Campaign {campaign_id}",
+            "industry": "健康食品",
+            "target_cpa": config.BID_OPTIMIZATION["default_target_cpa"],
+            "target_roas": config.BID_OPTIMIZATION["default_target_roas"],
+        }
+        
+        # AI分析実行
+        return self.agent.analyze_and_decide(
+            project=project,
+            performance=performance,
+        )
+
     def analyze_all_campaigns(
         self,
         account_id: str = None,
@@ -206,14 +511,9 @@ class IntegratedAgent:
         if not self.meta_initialized:
             return self._demo_all_campaigns_analysis()
         
+        account_id = self._resolve_account_id(account_id)
         if not account_id:
-            if config.META_AD_ACCOUNT_IDS:
-                account_id = config.META_AD_ACCOUNT_IDS[0]
-            else:
-                return [{"error": "広告アカウントIDが設定されていません"}]
-        
-        if not account_id.startswith("act_"):
-            account_id = f"act_{account_id}"
+            return [{"error": "広告アカウントIDが設定されていません"}]
         
         results = []
         project_mapping = project_mapping or {}
@@ -223,13 +523,51 @@ class IntegratedAgent:
             if not managers:
                 return [{"error": "マネージャーの初期化に失敗しました"}]
             
-            campaigns = managers["campaign"].get_campaigns(status_filter=["ACTIVE"])
+            campaigns = self._cached_call(
+                (account_id, "campaigns", ("ACTIVE",)),
+                config.META_CACHE_TTL["lists"],
+                lambda: managers.campaign.get_campaigns(status_filter=["ACTIVE"]),
+            )
+            if not campaigns:
+                return results
+            
+            # 全キャンペーンのInsightsを1回でまとめて取得
+            # （キャンペーン数が多い場合は非同期ジョブ、少なければ同期呼び出し）
+            campaign_ids = [c.get("id") for c in campaigns]
+            
+            def fetch_campaign_insights():
+                if len(campaign_ids) < config.META_ASYNC_INSIGHTS["min_campaigns"]:
+                    return managers.insights.get_campaign_insights(
+                        date_preset="last_7d",
+                        campaign_ids=campaign_ids,
+                    )
+                scheduler = AsyncInsightsScheduler(self.meta_auth.api)
+                managers.insights.add_insights_to_scheduler(
+                    scheduler, "campaigns", level="campaign", date_preset="last_7d",
+                    filtering=[{"field": "campaign.id", "operator": "IN", "value": campaign_ids}],
+                )
+                return scheduler.run()["campaigns"]
+            
+            campaign_insights = self._cached_call(
+                (account_id, "insights", "campaign", "last_7d", 1, tuple(campaign_ids)),
+                self._insights_ttl("last_7d"),
+                fetch_campaign_insights,
+            )
+            insights_by_campaign: dict[str, list[dict]] = {}
+            for row in campaign_insights:
+                insights_by_campaign.setdefault(row.get("campaign_id"), []).append(row)
             
             for campaign in campaigns:
                 campaign_id = campaign.get("id")
                 project_info = project_mapping.get(campaign_id)
                 
-                analysis = self.analyze_campaign(campaign_id, project_info)
+                try:
+                    analysis = self._analyze_campaign_insights(
+                        campaign_id, insights_by_campaign.get(campaign_id, []), project_info,
+                    )
+                except Exception as e:
+                    logger.error(f"キャンペーン分析エラー: {e}")
+                    analysis = {"error": str(e)}
                 analysis["campaign_id"] = campaign_id
                 analysis["campaign_name"] = campaign.get("name")
                 
@@ -259,46 +597,52 @@ class IntegratedAgent:
         if not self.meta_initialized:
             return self._demo_daily_report(date_preset)
         
+        account_id = self._resolve_account_id(account_id)
         if not account_id:
-            if config.META_AD_ACCOUNT_IDS:
-                account_id = config.META_AD_ACCOUNT_IDS[0]
-            else:
-                return {"error": "広告アカウントIDが設定されていません"}
-        
-        if not account_id.startswith("act_"):
-            account_id = f"act_{account_id}"
+            return {"error": "広告アカウントIDが設定されていません"}
         
         try:
             managers = self._get_managers(account_id)
             if not managers:
                 return {"error": "マネージャーの初期化に失敗しました"}
             
-            # 選択期間のサマリー（日別データを取得して合計）
-            current_insights_raw = managers["insights"].get_account_insights(
-                date_preset=date_preset,
-                time_increment=1,  # 日別
-            )
-            
-            # 合計値を計算
-            current_insights = [self._aggregate_insights(current_insights_raw)] if current_insights_raw else []
-            
+            # 選択期間（日別）・前期間・キャンペーン別のInsightsを1回のバッチで取得
             # 前期間は「昨日」で簡易比較
-            previous_insights_raw = managers["insights"].get_account_insights(
-                date_preset="yesterday",
-                time_increment=1,
-            )
-            previous_insights = previous_insights_raw
+            # 選択期間は日別データを行ごとに合計し、行のリストは保持しない
+            insights_requests = [
+                ("current", "account", date_preset, self._aggregate_insights),
+                ("previous", "account", "yesterday", None),
+                ("campaigns", "campaign", date_preset, None),
+            ]
+            fetched = self._cached_batch([
+                (
+                    name,
+                    (account_id, "insights_total" if reduce else "insights", level, preset, 1),
+                    self._insights_ttl(preset),
+                    lambda b, name, level=level, preset=preset, reduce=reduce: (
+                        managers.insights.add_insights_to_batch(
+                            b, name, level=level, date_preset=preset,
+                            time_increment=1,  # 日別
+                            reduce=reduce,
+                            fields=SUM_INSIGHT_FIELDS if reduce else INSIGHT_FIELDS,
+                        )
+                    ),
+                )
+                for name, level, preset, reduce in insights_requests
+            ])
+            
+            # 選択期間のサマリー（日別データの合計値）
+            current_total = fetched["current"]
+            current_insights = [current_total] if current_total else []
+            previous_insights = fetched["previous"]
             
             # キャンペーン別パフォーマンス
-            campaign_insights = managers["insights"].get_campaign_insights(
-                date_preset=date_preset,
-                time_increment=1,
-            )
+            campaign_insights = fetched["campaigns"]
             
             # AIによるブリーフィング生成
             projects = []
-            for ci in campaign_insights:
-                perf = self._format_performance(ci)
+            performances = self._format_performance_batch(campaign_insights)
+            for ci, perf in zip(campaign_insights, performances):
                 projects.append({
                     "name": ci.get("campaign_name", "Unknown"),
                     "target_cpa": config.BID_OPTIMIZATION["default_target_cpa"],
@@ -311,8 +655,8 @@ class IntegratedAgent:
             return {
                 "date_preset": date_preset,
                 "account_id": account_id,
-                "current": self._format_performance(current_insights[0] if current_insights else {}),
-                "previous": self._format_performance(previous_insights[0] if previous_insights else {}),
+                "current": self._format_performance_flat(current_insights[0] if current_insights else {}),
+                "previous": self._format_performance_flat(previous_insights[0] if previous_insights else {}),
                 "campaigns": campaign_insights,
                 "ai_briefing": briefing,
                 "generated_at": datetime.now().isoformat(),
@@ -322,6 +666,88 @@ class IntegratedAgent:
             logger.error(f"日次レポート生成エラー: {e}")
             return {"error": str(e)}
 
+    # =========================================================================
+    # 複数アカウントの並行処理
+    # =========================================================================
+
+    async def _gather_accounts(
+        self,
+        account_ids: list[str] | None,
+        func: Callable[..., Any],
+        **kwargs,
+    ) -> dict[str, Any]:
+        """
+        アカウントごとの処理を並行実行
+        
+        Meta SDKの呼び出しはブロッキングのためアカウント単位でスレッドに逃がし、
+        同時実行数は META_MAX_CONCURRENT_ACCOUNTS で制限する。
+        """
+        account_ids = account_ids or config.META_AD_ACCOUNT_IDS
+        semaphore = asyncio.Semaphore(config.META_MAX_CONCURRENT_ACCOUNTS)
+        
+        async def run(account_id: str) -> Any:
+            async with semaphore:
+                try:
+                    return await asyncio.to_thread(func, account_id, **kwargs)
+                except Exception as e:
+                    logger.error(f"アカウント {account_id} の処理エラー: {e}")
+                    return {"error": str(e)}
+        
+        results = await asyncio.gather(*(run(account_id) for account_id in account_ids))
+        return dict(zip(account_ids, results))
+
+    async def get_daily_reports_async(
+        self,
+        account_ids: list[str] = None,
+        date_preset: str = "last_7d",
+    ) -> dict[str, dict[str, Any]]:
+        """
+        複数アカウントのレポートを並行生成（asyncio版）
+        
+        Args:
+            account_ids: 広告アカウントIDリスト（省略時は設定ファイルの全アカウント）
+            date_preset: 期間プリセット
+        
+        Returns:
+            dict: アカウントIDをキーとしたレポート
+        """
+        return await self._gather_accounts(account_ids, self.get_daily_report, date_preset=date_preset)
+
+    def get_daily_reports(
+        self,
+        account_ids: list[str] = None,
+        date_preset: str = "last_7d",
+    ) -> dict[str, dict[str, Any]]:
+        """複数アカウントのレポートを並行生成"""
+        return asyncio.run(self.get_daily_reports_async(account_ids, date_preset))
+
+    async def analyze_all_accounts_async(
+        self,
+        account_ids: list[str] = None,
+        project_mapping: dict[str, dict] = None,
+    ) -> dict[str, list[dict]]:
+        """
+        複数アカウントの全アクティブキャンペーンを並行分析（asyncio版）
+        
+        Args:
+            account_ids: 広告アカウントIDリスト（省略時は設定ファイルの全アカウント）
+            project_mapping: キャンペーンIDと案件情報のマッピング
+        
+        Returns:
+            dict: アカウントIDをキーとした各キャンペーンの分析結果
+        """
+        return await self._gather_accounts(
+            account_ids, self.analyze_all_campaigns, project_mapping=project_mapping,
+        )
+
+    def analyze_all_accounts(
+        self,
+        account_ids: list[str] = None,
+        project_mapping: dict[str, dict] = None,
+    ) -> dict[str, list[dict]]:
+        """複数アカウントの全アクティブキャンペーンを並行分析"""
+        return asyncio.run(self.analyze_all_accounts_async(account_ids, project_mapping))
+
     def simulate_budget_change(
         self,
         campaign_id: str,
@@ -358,41 +784,41 @@ class IntegratedAgent:
         if not self.meta_initialized:
             return 0
         
+        account_id = self._resolve_account_id(account_id)
         if not account_id:
-            if config.META_AD_ACCOUNT_IDS:
-                account_id = config.META_AD_ACCOUNT_IDS[0]
-            else:
-                return 0
-        
-        if not account_id.startswith("act_"):
-            account_id = f"act_{account_id}"
+            return 0
         
-        count = 0
-        today = datetime.now().strftime("%Y-%m-%d")
+        today = date.today().isoformat()
         
         try:
             managers = self._get_managers(account_id)
             if not managers:
                 return 0
             
-            campaign_insights = managers["insights"].get_campaign_insights(
-                date_preset="today",
+            campaign_insights = self._cached_call(
+                (account_id, "insights", "campaign", "today", 1),
+                self._insights_ttl("today"),
+                lambda: managers.insights.get_campaign_insights(
+                    date_preset="today",
+                ),
             )
             
-            for ci in campaign_insights:
-                performance = self._format_performance(ci)
-                
-                self.pattern_learner.record_performance(
-                    project_id=ci.get("campaign_id", "unknown"),
-                    project_name=ci.get("campaign_name", "Unknown"),
-                    date=today,
-                    metrics=performance,
-                    context={
+            records = [
+                {
+                    "project_id": ci.get("campaign_id", "unknown"),
+                    "project_name": ci.get("campaign_name", "Unknown"),
+                    "date": today,
+                    "metrics": performance,
+                    "context": {
                         "account_id": account_id,
                         "target_cpa": config.BID_OPTIMIZATION["default_target_cpa"],
                     },
+                }
+                for ci, performance in zip(
+                    campaign_insights, self._format_performance_batch(campaign_insights)
                 )
-                count += 1
+            ]
+            count = self.pattern_learner.record_performance_batch(records)
             
             logger.info(f"📊 {count}件のパフォーマンスを記録")
             return count
@@ -401,24 +827,69 @@ class IntegratedAgent:
             logger.error(f"パフォーマンス記録エラー: {e}")
             return 0
 
-    def _aggregate_insights(self, insights_list: list) -> dict:
-        """複数のInsightsデータを合計"""
-        if not insights_list:
+    def _aggregate_insights(self, insights_list: Iterable[dict]) -> dict:
+        """
+        複数のInsightsデータを合計
+        
+        リストに加え、iter_insights 等のジェネレーターもそのまま受け取れる
+        （行を保持せず1回の走査で合計する）。
+        """
+        if isinstance(insights_list, (list, tuple)) and len(insights_list) >= VECTORIZE_MIN_ROWS:
+            columns = self._to_columnar(insights_list)
+            total = {key: cast(columns[key].sum()) for key, cast in _SUM_COLUMNS.items()}
+            return self._add_derived_metrics(total)
+        
+        # 1回の走査で全指標を合計
+        _float, _int = float, int
+        spend = conversion_value = 0.0
+        impressions = clicks = conversions = reach = 0
+        follows = page_engagements = link_clicks = 0
+        row_count = 0
+        for row_count, row in enumerate(insights_list, 1):
+            get = row.get
+            spend += _float(get("spend") or 0)
+            impressions += _int(get("impressions") or 0)
+            clicks += _int(get("clicks") or 0)
+            conversions += _int(get("conversions") or 0)
+            conversion_value += _float(get("conversion_value") or 0)
+            reach += _int(get("reach") or 0)
+            follows += _int(get("follows") or 0)
+            page_engagements += _int(get("page_engagements") or 0)
+            link_clicks += _int(get("link_clicks") or 0)
+        
+        if not row_count:
             return {}
         
         total = {
-            "spend": sum(float(i.get("spend", 0)) for i in insights_list),
-            "impressions": sum(int(i.get("impressions", 0)) for i in insights_list),
-            "clicks": sum(int(i.get("clicks", 0)) for i in insights_list),
-            "conversions": sum(int(i.get("conversions", 0)) for i in insights_list),
-            "conversion_value": sum(float(i.get("conversion_value", 0)) for i in insights_list),
-            "reach": sum(int(i.get("reach", 0)) for i in insights_list),
+            "spend": spend,
+            "impressions": impressions,
+            "clicks": clicks,
+            "conversions": conversions,
+            "conversion_value": conversion_value,
+            "reach": reach,
             # フォロー関連（トラフィック/エンゲージメント向け）
-            "follows": sum(int(i.get("follows", 0)) for i in insights_list),
-            "page_engagements": sum(int(i.get("page_engagements", 0)) for i in insights_list),
-            "link_clicks": sum(int(i.get("link_clicks", 0)) for i in insights_list),
+            "follows": follows,
+            "page_engagements": page_engagements,
+            "link_clicks": link_clicks,
         }
-        
+        return self._add_derived_metrics(total)
+
+    @staticmethod
+    def _to_columnar(rows: list[dict]) -> dict[str, np.ndarray]:
+        """Insightsの行リストを指標ごとの配列に変換（欠損・Noneは0）"""
+        count = len(rows)
+        return {
+            key: np.fromiter(
+                (row.get(key) or 0 for row in rows),
+                dtype=np.float64 if cast is float else np.int64,
+                count=count,
+            )
+            for key, cast in _SUM_COLUMNS.items()
+        }
+
+    @staticmethod
+    def _add_derived_metrics(total: dict) -> dict:
+        """合計値から派生指標を計算"""
         # 派生指標
         if total["impressions"] > 0:
             total["ctr"] = round(total["clicks"] / total["impressions"] * 100, 2)
@@ -454,33 +925,68 @@ class IntegratedAgent:
 
     def _format_performance(self, raw_data: dict) -> dict:
         """生データをパフォーマンス形式に整形"""
-        spend = float(raw_data.get("spend", 0))
-        impressions = int(raw_data.get("impressions", 0))
-        clicks = int(raw_data.get("clicks", 0))
+        get = raw_data.get
         
         # コンバージョンの取得（複数の可能性があるフィールドをチェック）
         conversions = 0
         if "conversions" in raw_data:
             conversions = int(raw_data["conversions"])
         elif "actions" in raw_data:
-            for action in raw_data.get("actions", []):
-                if action.get("action_type") in ["purchase", "lead", "complete_registration"]:
-                    conversions += int(action.get("value", 0))
-        
-        # 派生指標の計算
-        ctr = (clicks / impressions * 100) if impressions > 0 else 0
-        cpc = (spend / clicks) if clicks > 0 else 0
-        cvr = (conversions / clicks * 100) if clicks > 0 else 0
-        cpa = (spend / conversions) if conversions > 0 else 0
-        
-        # ROASの計算
-        conversion_value = float(raw_data.get("conversion_value", 0))
+            conversions = sum(
+                int(action.get("value", 0))
+                for action in get("actions") or ()
+                if action.get("action_type") in _CONVERSION_ACTIONS
+            )
+        
+        conversion_value = float(get("conversion_value", 0))
         if not conversion_value and "action_values" in raw_data:
-            for av in raw_data.get("action_values", []):
-                if av.get("action_type") in ["purchase", "omni_purchase"]:
-                    conversion_value += float(av.get("value", 0))
+            conversion_value += sum(
+                float(av.get("value", 0))
+                for av in get("action_values") or ()
+                if av.get("action_type") in _REVENUE_ACTIONS
+            )
         
-        roas = (conversion_value / spend) if spend > 0 else 0
+        return self._performance_metrics(
+            float(get("spend", 0)),
+            int(get("impressions", 0)),
+            int(get("clicks", 0)),
+            conversions,
+            conversion_value,
+        )
+
+    def _format_performance_flat(self, raw_data: dict) -> dict:
+        """
+        conversions / conversion_value がトップレベルにあるデータをパフォーマンス形式に整形
+        
+        _parse_insight・_aggregate_insights の結果向け（actions / action_values は参照しない）。
+        """
+        get = raw_data.get
+        return self._performance_metrics(
+            float(get("spend", 0)),
+            int(get("impressions", 0)),
+            int(get("clicks", 0)),
+            int(get("conversions", 0)),
+            float(get("conversion_value", 0)),
+        )
+
+    @staticmethod
+    def _performance_metrics(
+        spend: float,
+        impressions: int,
+        clicks: int,
+        conversions: int,
+        conversion_value: float,
+    ) -> dict:
+        """基本指標から派生指標を計算"""
+        # （件数・金額は負にならないため、0除算の判定は真偽値で行う）
+        if clicks:
+            cpc = spend / clicks
+            cvr = conversions / clicks * 100
+        else:
+            cpc = cvr = 0.0
+        ctr = clicks / impressions * 100 if impressions else 0.0
+        cpa = spend / conversions if conversions else 0.0
+        roas = conversion_value / spend if spend else 0.0
         
         return {
             "spend": spend,
@@ -495,70 +1001,72 @@ class IntegratedAgent:
             "conversion_value": conversion_value,
         }
 
+    def _format_performance_batch(self, rows: list[dict]) -> list[dict]:
+        """
+        複数行をまとめてパフォーマンス形式に整形
+        
+        _parse_insight 済みの行が多い場合はNumPyで派生指標を一括計算し、
+        それ以外は _format_performance を行ごとに適用する。
+        """
+        if any("conversions" not in row for row in rows):
+            return [self._format_performance(row) for row in rows]
+        if len(rows) < VECTORIZE_MIN_ROWS:
+            return [self._format_performance_flat(row) for row in rows]
+        
+        columns = self._to_columnar(rows)
+        spend = columns["spend"]
+        impressions = columns["impressions"]
+        clicks = columns["clicks"]
+        conversions = columns["conversions"]
+        conversion_value = columns["conversion_value"]
+        
+        def ratio(num, denom, scale=1):
+            return np.divide(num * scale, denom, out=np.zeros(len(rows)), where=denom > 0)
+        
+        ctr = np.round(ratio(clicks, impressions, 100), 2)
+        cpc = np.round(ratio(spend, clicks), 0)
+        cvr = np.round(ratio(conversions, clicks, 100), 2)
+        cpa = np.round(ratio(spend, conversions), 0)
+        roas = np.round(ratio(conversion_value, spend), 2)
+        
+        return [
+            {
+                "spend": float(spend[i]),
+                "impressions": int(impressions[i]),
+                "clicks": int(clicks[i]),
+                "conversions": int(conversions[i]),
+                "ctr": float(ctr[i]),
+                "cpc": float(cpc[i]),
+                "cvr": float(cvr[i]),
+                "cpa": float(cpa[i]),
+                "roas": float(roas[i]),
+                "conversion_value": float(conversion_value[i]),
+            }
+            for i in range(len(rows))
+        ]
+
     # =========================================================================
     # デモモード（Meta API未接続時）
     # =========================================================================
 
     def _demo_campaign_analysis(self, project_info: dict = None) -> dict:
         """デモ用キャンペーン分析"""
-        project = project_info or {
-            "name": "デモ案件",
-            "industry": "健康食品",
-            "target_cpa": 5000,
-            "target_roas": 3.5,
-            "has_article_lp": True,
-            "offer": "初回980円",
-        }
-        
-        performance = {
-            "spend": 85000,
-            "impressions": 320000,
-            "clicks": 5760,
-            "conversions": 18,
-            "ctr": 1.8,
-            "cpc": 15,
-            "cvr": 0.31,
-            "cpa": 4722,
-            "roas": 3.8,
-        }
-        
         return self.agent.analyze_and_decide(
-            project=project,
-            performance=performance,
+            project=project_info or dict(_DEMO_PROJECT),
+            performance=dict(_DEMO_PERFORMANCE),
         )
 
     def _demo_all_campaigns_analysis(self) -> list[dict]:
         """デモ用全キャンペーン分析"""
-        demo_campaigns = [
-            {
-                "name": "美容サプリA",
-                "industry": "美容・コスメ",
-                "target_cpa": 5000,
-                "performance": {"spend": 95000, "impressions": 380000, "clicks": 6840, "conversions": 16, "ctr": 1.8, "cvr": 0.23, "cpa": 5938, "roas": 2.8},
-            },
-            {
-                "name": "健康食品B",
-                "industry": "健康食品",
-                "target_cpa": 6000,
-                "performance": {"spend": 120000, "impressions": 500000, "clicks": 7500, "conversions": 25, "ctr": 1.5, "cvr": 0.33, "cpa": 4800, "roas": 4.2},
-            },
-            {
-                "name": "オンライン講座C",
-                "industry": "教育",
-                "target_cpa": 10000,
-                "performance": {"spend": 80000, "impressions": 200000, "clicks": 4000, "conversions": 10, "ctr": 2.0, "cvr": 0.25, "cpa": 8000, "roas": 6.5},
-            },
-        ]
-        
         results = []
-        for campaign in demo_campaigns:
+        for campaign in _DEMO_CAMPAIGNS:
             analysis = self.agent.analyze_and_decide(
                 project={
                     "name": campaign["name"],
                     "industry": campaign["industry"],
                     "target_cpa": campaign["target_cpa"],
                 },
-                performance=campaign["performance"],
+                performance=dict(campaign["performance"]),
             )
             analysis["campaign_name"] = campaign["name"]
             analysis["demo_mode"] = True
@@ -569,9 +1077,8 @@ class IntegratedAgent:
     def _demo_daily_report(self, date_preset: str = "last_7d") -> dict:
         """デモ用レポート"""
         projects = [
-            {"name": "美容サプリA", "target_cpa": 5000, "target_roas": 3.0, "performance": {"spend": 95000, "conversions": 16, "cpa": 5938, "roas": 2.8}},
-            {"name": "健康食品B", "target_cpa": 6000, "target_roas": 4.0, "performance": {"spend": 120000, "conversions": 25, "cpa": 4800, "roas": 4.2}},
-            {"name": "オンライン講座C", "target_cpa": 10000, "target_roas": 5.0, "performance": {"spend": 80000, "conversions": 10, "cpa": 8000, "roas": 6.5}},
+            {**project, "performance": dict(project["performance"])}
+            for project in _DEMO_REPORT_PROJECTS
         ]
         
         briefing = self.agent.get_daily_briefing(projects)
@@ -579,49 +1086,16 @@ class IntegratedAgent:
         return {
             "date_preset": date_preset,
             "demo_mode": True,
-            "current": {
-                "spend": 295000,
-                "impressions": 1200000,
-                "clicks": 18000,
-                "conversions": 51,
-                "ctr": 1.5,
-                "cvr": 0.28,
-                "cpa": 5784,
-                "roas": 4.1,
-            },
-            "previous": {
-                "spend": 280000,
-                "impressions": 1150000,
-                "clicks": 17000,
-                "conversions": 48,
-                "ctr": 1.48,
-                "cvr": 0.28,
-                "cpa": 5833,
-                "roas": 3.9,
-            },
+            "current": dict(_DEMO_REPORT_CURRENT),
+            "previous": dict(_DEMO_REPORT_PREVIOUS),
             "ai_briefing": briefing,
             "generated_at": datetime.now().isoformat(),
         }
 
     def _demo_budget_simulation(self, new_budget: float, project_info: dict = None) -> dict:
         """デモ用予算シミュレーション"""
-        from knowledge_engine import Predictor
-        predictor = Predictor()
-        
-        current_performance = {
-            "spend": 100000,
-            "impressions": 400000,
-            "clicks": 6000,
-            "conversions": 20,
-            "ctr": 1.5,
-            "cvr": 0.33,
-            "cpc": 17,
-            "cpa": 5000,
-            "roas": 4.0,
-        }
-        
-        return predictor.simulate_budget_change(
-            current_performance=current_performance,
+        return self._predictor.simulate_budget_change(
+            current_performance=dict(_DEMO_BUDGET_PERFORMANCE),
             current_budget=100000,
             new_budget=new_budget,
             context=project_info or {"target_cpa": 6000},
@@ -0,0 +1,105 @@
+"""
+操作ログ（JSON Lines形式）
+
+1行1レコードの追記のみで書き込むため、件数によらず書き込みコストは一定。
+保持件数の制限は compact_operation_log でまとめて行う。
+"""
+import json
+import logging
+import threading
+from collections import deque
+from datetime import datetime
+from typing import Any
+
+import config
+
+logger = logging.getLogger(__name__)
+
+# 並列実行時に操作ログファイルへの書き込みを直列化する
+_log_lock = threading.Lock()
+
+# 旧形式（JSON配列）の操作ログ
+_LEGACY_LOG_FILE = config.STORAGE_DIR / "operation_log.json"
+
+# 旧形式の移行を確認済みか（プロセスごとに1回だけ確認する）
+_legacy_checked = False
+
+
+def _migrate_legacy_log() -> None:
+    """旧形式の操作ログを JSON Lines へ移行（_log_lock を保持して呼び出す）"""
+    global _legacy_checked
+    if _legacy_checked:
+        return
+    _legacy_checked = True
+
+    if not _LEGACY_LOG_FILE.exists():
+        return
+
+    log_file = config.OPERATION_LOG_FILE
+    try:
+        with open(_LEGACY_LOG_FILE, "r", encoding="utf-8") as f:
+            legacy = json.load(f)
+
+        # 旧形式の方が古いため、既存の行より前に並べる
+        lines = [json.dumps(entry, ensure_ascii=False) + "\n" for entry in legacy]
+        if log_file.exists():
+            with open(log_file, "r", encoding="utf-8") as f:
+                lines.extend(line if line.endswith("\n") else line + "\n" for line in f)
+
+        tmp_file = log_file.with_suffix(".tmp")
+        with open(tmp_file, "w", encoding="utf-8") as f:
+            f.writelines(lines)
+        tmp_file.replace(log_file)
+        _LEGACY_LOG_FILE.rename(_LEGACY_LOG_FILE.with_name(_LEGACY_LOG_FILE.name + ".migrated"))
+        logger.info(f"操作ログを JSON Lines に移行しました（{len(legacy)}件）")
+    except (IOError, json.JSONDecodeError) as e:
+        logger.warning(f"操作ログの移行に失敗しました: {e}")
+
+
+def append_operation(entry: dict[str, Any]) -> None:
+    """
+    操作ログを1件追記
+
+    Args:
+        entry: ログレコード（timestamp は自動付与）
+    """
+    log_file = config.OPERATION_LOG_FILE
+    log_file.parent.mkdir(parents=True, exist_ok=True)
+
+    line = json.dumps(
+        {"timestamp": datetime.now().isoformat(), **entry},
+        ensure_ascii=False,
+    )
+
+    with _log_lock:
+        _migrate_legacy_log()
+        with open(log_file, "a", encoding="utf-8") as f:
+            f.write(line + "\n")
+
+
+def compact_operation_log() -> None:
+    """
+    ファイルサイズが閾値を超えていれば最新 OPERATION_LOG_MAX_ENTRIES 件のみ残す
+
+    実行単位（一括最適化・自動停止など）の開始時に1回呼び出す。
+    """
+    log_file = config.OPERATION_LOG_FILE
+
+    with _log_lock:
+        _migrate_legacy_log()
+        if not log_file.exists():
+            return
+
+        try:
+            if log_file.stat().st_size <= config.OPERATION_LOG_COMPACT_BYTES:
+                return
+
+            with open(log_file, "r", encoding="utf-8") as f:
+                recent = deque(f, maxlen=config.OPERATION_LOG_MAX_ENTRIES)
+
+            tmp_file = log_file.with_suffix(".tmp")
+            with open(tmp_file, "w", encoding="utf-8") as f:
+                f.writelines(recent)
+            tmp_file.replace(log_file)
+        except IOError as e:
+            logger.warning(f"操作ログの整理に失敗しました: {e}")
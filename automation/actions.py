@@ -4,17 +4,163 @@
 """
 import json
 import logging
+import os
+import queue
+import sqlite3
+import sys
+import threading
 import uuid
+from contextlib import contextmanager
 from datetime import datetime
 from pathlib import Path
-from typing import Any
+from types import MappingProxyType
+from typing import Any, Callable
+
+try:
+    import orjson
+except ImportError:  # orjson が無い環境では標準の json を使う
+    orjson = None
 
 logger = logging.getLogger(__name__)
 
 
+def _dumps(data: Any) -> bytes:
+    """JSONをUTF-8のバイト列にシリアライズ（インデントなし）"""
+    if orjson is not None:
+        return orjson.dumps(data)
+    # json.dump(data, f) はチャンクごとに write するため、文字列にしてから1回で書く
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def _loads(raw: bytes | str) -> Any:
+    """JSONをデシリアライズ"""
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+
+# intern するアクションのフィールド
+_INTERNED_FIELDS = ("account_id", "campaign_id", "campaign_name", "type")
+
+
+def _intern_fields(action: dict) -> dict:
+    """種類の限られる文字列フィールドを intern して、同じ値の文字列を共有する"""
+    for key in _INTERNED_FIELDS:
+        value = action.get(key)
+        if isinstance(value, str):
+            action[key] = sys.intern(value)
+    
+    params = action.get("params")
+    if isinstance(params, dict) and isinstance(params.get("new_status"), str):
+        params["new_status"] = sys.intern(params["new_status"])
+    return action
+
+
+# 安全チェック通過時の結果（共有するため読み取り専用）
+_SAFETY_PASSED = MappingProxyType({"passed": True})
+
+# 実行前のベースラインを取得する予算変更系のアクションタイプ
+BUDGET_ACTION_TYPES = frozenset({"budget_change", "budget_increase", "budget_decrease"})
+
+
+def _pct_change(old: float, new: float) -> float:
+    """変化率（%）。変更前が0以下なら0.0"""
+    if old <= 0:
+        return 0.0
+    return (new - old) * 100.0 / old
+
+
+def _replace_file(path: Path, raw: bytes):
+    """一時ファイルに書いてから置き換え、書き込み途中の状態を残さない"""
+    tmp_path = path.with_suffix(".tmp")
+    tmp_path.write_bytes(raw)
+    os.replace(tmp_path, path)
+
+
+class _BackgroundWriter:
+    """
+    ファイル書き込みをバックグラウンドスレッドで順に実行するクラス
+    
+    同じキーの書き込みが溜まっている場合は最後のものだけ実行する（スナップショットの上書き）。
+    キーが None の書き込み（履歴の追加など）は省略しない。
+    スレッドは書き込みがあるときだけ起動し、一定時間空けば終了する。
+    終了時に書き込みを取りこぼさないよう、デーモンスレッドにはしない。
+    """
+    
+    IDLE_SECONDS = 1.0
+    
+    def __init__(self):
+        self._queue: queue.Queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+    
+    def submit(self, key: Any, write: Callable[[], None]):
+        """書き込みを登録"""
+        self._queue.put((key, write))
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="action-queue-writer")
+                self._thread.start()
+    
+    def flush(self):
+        """登録済みの書き込みがすべて終わるまで待つ"""
+        self._queue.join()
+    
+    def _run(self):
+        while True:
+            try:
+                jobs = [self._queue.get(timeout=self.IDLE_SECONDS)]
+            except queue.Empty:
+                with self._lock:
+                    if self._queue.empty():
+                        self._thread = None
+                        return
+                continue
+            
+            while True:
+                try:
+                    jobs.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            
+            latest = {key: i for i, (key, _) in enumerate(jobs) if key is not None}
+            for i, (key, write) in enumerate(jobs):
+                if key is None or latest[key] == i:
+                    try:
+                        write()
+                    except Exception as e:
+                        logger.error(f"アクションキューの書き込みに失敗しました: {e}")
+            
+            for _ in jobs:
+                self._queue.task_done()
+
+
+# ActionQueue の書き込みを担当する（インスタンス間で共有し、書き込み順を保つ）
+_writer = _BackgroundWriter()
+
+
 class ActionQueue:
     """
     承認待ちアクションのキュー
+    
+    承認待ちは小さなスナップショット（JSON）として変更時のみ書き換え、
+    履歴は SQLite（history.db）に1件1行で保存し、ID・キャンペーン・タイプ・日時で検索できるようにする。
+    変更はメソッド終了時（batched 中はブロック終了時）にまとめ、書き込み自体はバックグラウンドで行う。
+    """
+    
+    _HISTORY_SCHEMA = """
+        CREATE TABLE IF NOT EXISTS action_history (
+            id TEXT PRIMARY KEY,
+            created_at TEXT,
+            status TEXT,
+            campaign_id TEXT,
+            account_id TEXT,
+            action_type TEXT,
+            payload TEXT
+        );
+        CREATE INDEX IF NOT EXISTS idx_action_history_created_at ON action_history (created_at);
+        CREATE INDEX IF NOT EXISTS idx_action_history_campaign_id ON action_history (campaign_id, created_at);
+        CREATE INDEX IF NOT EXISTS idx_action_history_action_type ON action_history (action_type, created_at);
     """
     
     def __init__(self, storage_dir: str = None):
@@ -25,22 +171,154 @@ class ActionQueue:
         self.storage_dir.mkdir(parents=True, exist_ok=True)
         
         self.queue_file = self.storage_dir / "pending_actions.json"
-        self.history_file = self.storage_dir / "action_history.json"
+        self.history_db = self.storage_dir / "history.db"
+        # 読み込み用と書き込み用（バックグラウンドスレッド）で接続を分ける
+        _writer.flush()
+        self._conn = self._connect(self.history_db)
+        self._writer_conn = self._connect(self.history_db)
+        
+        # 書き込みはメソッド終了時（batched 中はブロック終了時）にまとめて行う
+        self._pending_dirty = False
+        self._history_rows: list[tuple] = []
+        self._batch_depth = 0
+        self._batch_now: str | None = None
+        
+        self._migrate_legacy_history(self.storage_dir / "action_history.json")
+        self._migrate_legacy_history(self.storage_dir / "action_history.jsonl")
         
-        self.pending = self._load_json(self.queue_file, [])
-        self.history = self._load_json(self.history_file, [])
+        # 承認待ちはIDをキーにした辞書（挿入順を保持）で持ち、検索・削除をO(1)にする
+        self.pending: dict[str, dict] = {}
+        for queued_action in self._load_json(self.queue_file, []):
+            _intern_fields(queued_action.get("action") or {})
+            self.pending[queued_action["id"]] = queued_action
+        # 履歴は起動時に読み込まず、必要な分だけ検索する。
+        # このセッションで追加・更新したレコードだけIDで引けるよう保持する
+        self._history_index: dict[str, dict] = {}
         
         logger.info(f"ActionQueue初期化: 待機中{len(self.pending)}件")
     
+    def _connect(self, path: Path) -> sqlite3.Connection:
+        """履歴DBに接続（WALモード）"""
+        conn = sqlite3.connect(str(path), check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.executescript(self._HISTORY_SCHEMA)
+        return conn
+    
     def _load_json(self, path: Path, default: Any) -> Any:
         if path.exists():
-            with open(path, "r", encoding="utf-8") as f:
-                return json.load(f)
+            return _loads(path.read_bytes())
         return default
     
     def _save_json(self, path: Path, data: Any):
-        with open(path, "w", encoding="utf-8") as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
+        # シリアライズは呼び出し元で行い（以降の変更の影響を受けないように）、書き込みはバックグラウンドで
+        raw = _dumps(data)
+        _writer.submit(path, lambda: _replace_file(path, raw))
+    
+    @staticmethod
+    def _history_row(entry: dict) -> tuple:
+        """履歴レコードをテーブルの1行に変換"""
+        action = entry.get("action") or {}
+        return (
+            entry["id"],
+            entry.get("created_at") or entry.get("executed_at"),
+            entry.get("status"),
+            action.get("campaign_id"),
+            action.get("account_id"),
+            action.get("type"),
+            _dumps(entry).decode("utf-8"),
+        )
+    
+    def _write_history(self, entries: list[dict]):
+        """履歴レコードの書き込みを積む（書き込みは _flush）"""
+        self._history_rows.extend(self._history_row(entry) for entry in entries)
+    
+    def _commit_history(self, conn: sqlite3.Connection, rows: list[tuple]):
+        """履歴レコードを1トランザクションで書き込み（同じIDは置き換え）"""
+        with conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO action_history VALUES (?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+    
+    def _flush(self):
+        """未保存の変更を書き込み（batched 中は何もしない）"""
+        if self._batch_depth:
+            return
+        
+        if self._pending_dirty:
+            self._save_json(self.queue_file, list(self.pending.values()))
+            self._pending_dirty = False
+        
+        if self._history_rows:
+            rows, self._history_rows = self._history_rows, []
+            _writer.submit(None, lambda: self._commit_history(self._writer_conn, rows))
+    
+    def flush(self):
+        """未保存の変更を書き込み、書き込みが終わるまで待つ"""
+        self._flush()
+        _writer.flush()
+    
+    def close(self):
+        """書き込みを終えて履歴DBの接続を閉じる"""
+        self.flush()
+        self._conn.close()
+        self._writer_conn.close()
+    
+    @contextmanager
+    def batched(self):
+        """
+        ブロック内の変更の書き込みをブロック終了時の1回にまとめる
+        
+        Example:
+            with queue.batched():
+                for action in actions:
+                    queue.add_action(action)
+        """
+        if not self._batch_depth:
+            # ブロック内の変更は同じ時刻として記録する
+            self._batch_now = datetime.now().isoformat(timespec="seconds")
+        self._batch_depth += 1
+        try:
+            yield self
+        finally:
+            self._batch_depth -= 1
+            if not self._batch_depth:
+                self._batch_now = None
+            self._flush()
+    
+    def _now_iso(self) -> str:
+        """現在時刻（秒単位のISO形式）。batched 中はブロック開始時刻を返す"""
+        if self._batch_now is not None:
+            return self._batch_now
+        return datetime.now().isoformat(timespec="seconds")
+    
+    def _migrate_legacy_history(self, legacy_file: Path):
+        """旧形式（JSON配列 / JSON Lines）の履歴を履歴DBへ移行"""
+        if not legacy_file.exists():
+            return
+        
+        try:
+            if legacy_file.suffix == ".jsonl":
+                # 同じIDの行は後の行が優先
+                entries = {}
+                with open(legacy_file, "rb") as f:
+                    for line in f:
+                        if line.strip():
+                            entry = _loads(line)
+                            entries[entry.get("id") or str(uuid.uuid4())[:8]] = entry
+                entries = [{**entry, "id": entry_id} for entry_id, entry in entries.items()]
+            else:
+                entries = [
+                    {**entry, "id": entry.get("id") or str(uuid.uuid4())[:8]}
+                    for entry in self._load_json(legacy_file, [])
+                ]
+            
+            self._commit_history(self._conn, [self._history_row(entry) for entry in entries])
+            legacy_file.rename(legacy_file.with_name(legacy_file.name + ".migrated"))
+            logger.info(f"アクション履歴を履歴DBに移行しました: {legacy_file.name}（{len(entries)}件）")
+        except (IOError, sqlite3.Error, json.JSONDecodeError) as e:
+            logger.warning(f"アクション履歴の移行に失敗しました: {e}")
     
     def add_action(self, action: dict) -> str:
         """アクションを承認キューに追加"""
@@ -48,84 +326,141 @@ class ActionQueue:
         
         queued_action = {
             "id": action_id,
-            "created_at": datetime.now().isoformat(),
+            "created_at": self._now_iso(),
             "status": "pending",
-            "action": action,
+            "action": _intern_fields(action),
         }
         
-        self.pending.append(queued_action)
-        self._save_json(self.queue_file, self.pending)
+        self.pending[action_id] = queued_action
+        self._pending_dirty = True
+        self._flush()
         
         logger.info(f"アクション追加: {action_id}")
         return action_id
     
     def get_pending(self) -> list[dict]:
         """承認待ちアクションを取得"""
-        return self.pending
+        return list(self.pending.values())
     
     def approve(self, action_id: str) -> dict | None:
         """アクションを承認"""
-        for i, action in enumerate(self.pending):
-            if action["id"] == action_id:
-                action["status"] = "approved"
-                action["approved_at"] = datetime.now().isoformat()
-                
-                # 履歴に移動
-                self.history.append(action)
-                self.pending.pop(i)
-                
-                self._save_json(self.queue_file, self.pending)
-                self._save_json(self.history_file, self.history)
-                
-                logger.info(f"アクション承認: {action_id}")
-                return action
+        action = self.pending.pop(action_id, None)
+        if action is None:
+            return None
+        
+        action["status"] = "approved"
+        action["approved_at"] = self._now_iso()
         
-        return None
+        # 履歴に移動
+        self._add_history_entry(action)
+        self._pending_dirty = True
+        self._flush()
+        
+        logger.info(f"アクション承認: {action_id}")
+        return action
     
     def reject(self, action_id: str, reason: str = "") -> dict | None:
         """アクションを却下"""
-        for i, action in enumerate(self.pending):
-            if action["id"] == action_id:
-                action["status"] = "rejected"
-                action["rejected_at"] = datetime.now().isoformat()
-                action["reject_reason"] = reason
-                
-                # 履歴に移動
-                self.history.append(action)
-                self.pending.pop(i)
-                
-                self._save_json(self.queue_file, self.pending)
-                self._save_json(self.history_file, self.history)
-                
-                logger.info(f"アクション却下: {action_id}")
-                return action
+        action = self.pending.pop(action_id, None)
+        if action is None:
+            return None
+        
+        action["status"] = "rejected"
+        action["rejected_at"] = self._now_iso()
+        action["reject_reason"] = reason
         
-        return None
+        # 履歴に移動
+        self._add_history_entry(action)
+        self._pending_dirty = True
+        self._flush()
+        
+        logger.info(f"アクション却下: {action_id}")
+        return action
 
     def add_to_history(self, item: dict):
         """履歴に直接追加（直接実行用）"""
-        self.history.append(item)
-        self._save_json(self.history_file, self.history)
+        item.setdefault("id", str(uuid.uuid4())[:8])
+        if isinstance(item.get("action"), dict):
+            _intern_fields(item["action"])
+        self._add_history_entry(item)
+        self._flush()
+    
+    def _add_history_entry(self, entry: dict):
+        """IDインデックスに追加し、履歴DBに書き込み"""
+        self._history_index[entry["id"]] = entry
+        self._write_history([entry])
+    
+    def _find_history(self, action_id: str) -> dict | None:
+        """IDに一致する履歴レコードを取得"""
+        entry = self._history_index.get(action_id)
+        if entry is not None:
+            return entry
+        
+        self.flush()
+        row = self._conn.execute(
+            "SELECT payload FROM action_history WHERE id = ?", (action_id,)
+        ).fetchone()
+        if row is None:
+            return None
+        
+        entry = _loads(row[0])
+        self._history_index[action_id] = entry
+        return entry
     
     def mark_executed(self, action_id: str, result: dict):
         """実行完了をマーク"""
-        for action in self.history:
-            if action["id"] == action_id:
-                action["status"] = "executed"
-                action["executed_at"] = datetime.now().isoformat()
-                action["result"] = result
-                self._save_json(self.history_file, self.history)
-                logger.info(f"アクション実行完了: {action_id}")
-                return
-    
-    def get_history(self, limit: int = 50) -> list[dict]:
-        """実行履歴を取得"""
-        return self.history[-limit:]
+        action = self._find_history(action_id)
+        if action is None:
+            return
+        
+        action["status"] = "executed"
+        action["executed_at"] = self._now_iso()
+        action["result"] = result
+        self._write_history([action])
+        self._flush()
+        logger.info(f"アクション実行完了: {action_id}")
+    
+    def get_history(
+        self,
+        limit: int = 50,
+        campaign_id: str = None,
+        action_type: str = None,
+        since: str = None,
+    ) -> list[dict]:
+        """
+        実行履歴を取得（古い順）
+        
+        Args:
+            limit: 取得件数（新しいものから）
+            campaign_id: キャンペーンIDで絞り込み
+            action_type: アクションタイプで絞り込み
+            since: この日時（ISO形式）以降に作成されたものに絞り込み
+        """
+        conditions = []
+        params = []
+        if campaign_id:
+            conditions.append("campaign_id = ?")
+            params.append(campaign_id)
+        if action_type:
+            conditions.append("action_type = ?")
+            params.append(action_type)
+        if since:
+            conditions.append("created_at >= ?")
+            params.append(since)
+        
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        self.flush()
+        rows = self._conn.execute(
+            f"SELECT payload FROM action_history {where} ORDER BY created_at DESC, rowid DESC LIMIT ?",
+            (*params, limit),
+        ).fetchall()
+        return [_loads(payload) for (payload,) in reversed(rows)]
     
     def clear_pending(self):
         """承認待ちをクリア"""
-        self.pending = []
-        self._save_json(self.queue_file, self.pending)
+        self.pending = {}
+        self._pending_dirty = True
+        self._flush()
 
 
 class ActionExecutor:
@@ -159,11 +494,24 @@ class ActionExecutor:
         self.learner = ActionLearner(integrated_agent=integrated_agent)
         
         # 安全装置の設定
-        self.safety_limits = {
+        self.set_safety_limits({
             "max_budget_increase_percent": 20,  # 最大20%増
             "max_daily_budget": 500000,  # 最大日予算50万円
             "min_learning_days": 3,  # 学習期間最低3日
             "require_cv_for_increase": True,  # 増額にはCV必須
+        })
+        
+        # アクションタイプ → 実行関数
+        # （予算変更は取得済みのベースラインを受け取る）
+        self._dispatch = {
+            "budget_change": lambda a, baseline: self._execute_budget_change(a, True, baseline),
+            "budget_increase": lambda a, baseline: self._execute_budget_change(a, True, baseline),
+            "budget_decrease": lambda a, baseline: self._execute_budget_change(a, False, baseline),
+            "status_change": lambda a, baseline: self._execute_status_change(
+                a, status=a.get("params", {}).get("new_status", "PAUSED")
+            ),
+            "pause": lambda a, baseline: self._execute_status_change(a, status="PAUSED"),
+            "resume": lambda a, baseline: self._execute_status_change(a, status="ACTIVE"),
         }
         
         logger.info(f"ActionExecutor初期化: mode={mode}")
@@ -173,7 +521,7 @@ class ActionExecutor:
         self.mode = mode
         logger.info(f"実行モード変更: {mode}")
 
-    def execute(self, action: dict) -> dict:
+    def execute(self, action: dict, baseline: dict = None) -> dict:
         """
         アクションを実行
         
@@ -184,12 +532,11 @@ class ActionExecutor:
                     "campaign_id": "...",
                     "params": {...}
                 }
+            baseline: 取得済みの実行前パフォーマンス（予算変更のみ。省略時は個別に取得）
         
         Returns:
             dict: 実行結果
         """
-        action_type = action.get("type")
-        
         if self.mode == "notify_only":
             return {
                 "success": True,
@@ -210,52 +557,123 @@ class ActionExecutor:
             }
         
         # アクション実行
-        if action_type == "budget_change":
-            return self._execute_budget_change(action, increase=True)
-        elif action_type == "budget_increase":
-            return self._execute_budget_change(action, increase=True)
-        elif action_type == "budget_decrease":
-            return self._execute_budget_change(action, increase=False)
-        elif action_type == "status_change":
-            new_status = action.get("params", {}).get("new_status", "PAUSED")
-            return self._execute_status_change(action, status=new_status)
-        elif action_type == "pause":
-            return self._execute_status_change(action, status="PAUSED")
-        elif action_type == "resume":
-            return self._execute_status_change(action, status="ACTIVE")
-        else:
+        return self._run_action(action, baseline)
+
+    def _run_action(self, action: dict, baseline: dict = None) -> dict:
+        """アクションタイプに応じた実行関数を呼び出す（モード・安全チェックは呼び出し側で行う）"""
+        action_type = action.get("type")
+        handler = self._dispatch.get(action_type)
+        if handler is None:
             return {
                 "success": False,
                 "executed": False,
                 "message": f"未対応のアクションタイプ: {action_type}",
             }
+        return handler(action, baseline)
+
+    def execute_batch(self, actions: list[dict]) -> list[dict]:
+        """
+        複数のアクションを実行（予算変更のベースラインはアカウントごとに1回で取得）
+        
+        Args:
+            actions: 実行するアクションのリスト
+        
+        Returns:
+            list[dict]: アクションごとの実行結果（入力と同じ順）
+        """
+        campaign_ids_by_account: dict[str, list[str]] = {}
+        if self.mode != "notify_only" and self.agent and self.agent.meta_initialized:
+            for action in actions:
+                if action.get("type") in BUDGET_ACTION_TYPES and action.get("campaign_id"):
+                    campaign_ids_by_account.setdefault(action.get("account_id"), []).append(
+                        action["campaign_id"]
+                    )
+        
+        baselines = {}
+        for account_id, campaign_ids in campaign_ids_by_account.items():
+            baselines[account_id] = self._fetch_baselines(account_id, campaign_ids)
+        
+        results = []
+        for action in actions:
+            baseline = None
+            if action.get("account_id") in baselines:
+                baseline = baselines[action.get("account_id")].get(action.get("campaign_id"), {})
+            results.append(self.execute(action, baseline=baseline))
+        return results
+
+    def _fetch_baselines(self, account_id: str, campaign_ids: list[str]) -> dict[str, dict]:
+        """
+        実行前のパフォーマンス（過去7日の合計）をまとめて取得（学習用）
+        
+        Returns:
+            dict: campaign_id → ベースライン
+        """
+        try:
+            managers = self.agent._get_managers(account_id)
+            if not managers:
+                return {}
+            
+            insights = managers.insights.get_campaign_insights(
+                date_preset="last_7d",
+                time_increment=0,  # 合計値
+                campaign_ids=list(dict.fromkeys(campaign_ids)),
+            )
+        except Exception as e:
+            logger.warning(f"ベースライン取得失敗: {e}")
+            return {}
+        
+        return {
+            row["campaign_id"]: {
+                "spend": row.get("spend", 0),
+                "cpa": row.get("cpa", 0),
+                "roas": row.get("roas", 0),
+                "ctr": row.get("ctr", 0),
+                "cpf": row.get("cpf", 0),
+            }
+            for row in insights
+            if row.get("campaign_id")
+        }
+
+    def set_safety_limits(self, limits: dict):
+        """
+        安全装置の設定を更新
+        
+        Args:
+            limits: 更新する設定（指定したキーのみ上書き）
+        """
+        self.safety_limits = {**getattr(self, "safety_limits", {}), **limits}
+        # チェックのたびに辞書を引かないよう、よく使う上限は属性に展開しておく
+        self._max_increase_percent = self.safety_limits["max_budget_increase_percent"]
+        self._max_daily_budget = self.safety_limits["max_daily_budget"]
 
     def _safety_check(self, action: dict) -> dict:
         """安全チェック"""
-        action_type = action.get("type")
+        # チェック対象は増額のみ
+        if action.get("type") != "budget_increase":
+            return _SAFETY_PASSED
+        
         params = action.get("params", {})
         
-        if action_type == "budget_increase":
-            # 増額率チェック
-            increase_percent = params.get("increase_percent", 0)
-            if increase_percent > self.safety_limits["max_budget_increase_percent"]:
-                return {
-                    "passed": False,
-                    "reason": f"増額率{increase_percent}%は上限{self.safety_limits['max_budget_increase_percent']}%を超えています",
-                }
-            
-            # 最大日予算チェック
-            new_budget = params.get("new_budget", 0)
-            if new_budget > self.safety_limits["max_daily_budget"]:
-                return {
-                    "passed": False,
-                    "reason": f"新予算¥{new_budget:,}は上限¥{self.safety_limits['max_daily_budget']:,}を超えています",
-                }
+        # 増額率チェック
+        increase_percent = params.get("increase_percent", 0)
+        if increase_percent > self._max_increase_percent:
+            return {
+                "passed": False,
+                "reason": f"増額率{increase_percent}%は上限{self._max_increase_percent}%を超えています",
+            }
         
-        return {"passed": True}
+        # 最大日予算チェック
+        new_budget = params.get("new_budget", 0)
+        if new_budget > self._max_daily_budget:
+            return {
+                "passed": False,
+                "reason": f"新予算¥{new_budget:,}は上限¥{self._max_daily_budget:,}を超えています",
+            }
+        
+        return _SAFETY_PASSED
 
-    def _execute_budget_change(self, action: dict, increase: bool) -> dict:
-        """予算変更を実行"""
+    def _execute_budget_change(self, action: dict, increase: bool, baseline: dict = None) -> dict:
+        """予算変更を実行（baseline 省略時は実行前のパフォーマンスをここで取得）"""
         if not self.agent or not self.agent.meta_initialized:
             return {
                 "success": False,
@@ -286,27 +704,17 @@ class ActionExecutor:
                 }
             
             # 実行前のパフォーマンスを取得（学習用）
-            baseline = {}
-            try:
-                insights = managers["insights"].get_campaign_insights(campaign_id, date_preset="last_7d")
-                if insights:
-                    baseline = {
-                        "spend": insights.get("spend", 0),
-                        "cpa": insights.get("cpa", 0),
-                        "roas": insights.get("roas", 0),
-                        "ctr": insights.get("ctr", 0),
-                        "cpf": insights.get("cpf", 0),
-                    }
-            except Exception as e:
-                logger.warning(f"ベースライン取得失敗: {e}")
+            if baseline is None:
+                baseline = self._fetch_baselines(account_id, [campaign_id]).get(campaign_id, {})
             
-            success = managers["campaign"].update_campaign_budget(
+            success = managers.campaign.update_campaign_budget(
                 campaign_id=campaign_id,
                 daily_budget=int(new_budget),
             )
             
             if success:
                 logger.info(f"✅ 予算変更実行: {campaign_id} -> ¥{new_budget:,.0f}")
+                self.agent.invalidate(account_id)
                 
                 # 学習レコード作成（24時間後に効果分析）
                 if baseline and self.learner:
@@ -369,13 +777,14 @@ class ActionExecutor:
                     "message": "マネージャー取得失敗",
                 }
             
-            success = managers["campaign"].update_campaign_status(
+            success = managers.campaign.update_campaign_status(
                 campaign_id=campaign_id,
                 status=new_status,
             )
             
             if success:
                 logger.info(f"✅ ステータス変更実行: {campaign_id} -> {new_status}")
+                self.agent.invalidate(account_id)
                 return {
                     "success": True,
                     "executed": True,
@@ -409,6 +818,19 @@ class ActionExecutor:
         """
         return self.queue.add_action(action)
 
+    def add_to_queue(self, action: dict, priority: str = "medium") -> str:
+        """
+        優先度付きでアクションを承認キューに追加
+        
+        Args:
+            action: 提案するアクション
+            priority: 優先度 (high, medium, low)
+        
+        Returns:
+            str: アクションID
+        """
+        return self.propose_action({**action, "priority": priority})
+
     def get_pending_actions(self) -> list:
         """承認待ちアクションを取得"""
         return self.queue.get_pending()
@@ -423,18 +845,51 @@ class ActionExecutor:
         Returns:
             dict: 実行結果
         """
-        # 承認
-        approved = self.queue.approve(action_id)
-        if not approved:
-            return {"success": False, "message": f"アクション {action_id} が見つかりません"}
+        # 承認・実行・結果記録の書き込みは最後に1回
+        with self.queue.batched():
+            approved = self.queue.approve(action_id)
+            if not approved:
+                return {"success": False, "message": f"アクション {action_id} が見つかりません"}
+            
+            # 実行
+            result = self.execute(approved["action"])
+            
+            # 結果を記録
+            self.queue.mark_executed(action_id, result)
         
-        # 実行
-        result = self.execute(approved["action"])
+        return result
+
+    def approve_actions(self, action_ids: list[str]) -> list[dict]:
+        """
+        複数のアクションを承認してまとめて実行
         
-        # 結果を記録
-        self.queue.mark_executed(action_id, result)
+        Args:
+            action_ids: アクションIDのリスト
         
-        return result
+        Returns:
+            list[dict]: アクションIDごとの実行結果（入力と同じ順）
+        """
+        with self.queue.batched():
+            approved = {}
+            for action_id in action_ids:
+                action = self.queue.approve(action_id)
+                if action:
+                    approved[action_id] = action
+            
+            executed = dict(zip(
+                approved,
+                self.execute_batch([a["action"] for a in approved.values()]),
+            ))
+            
+            results = []
+            for action_id in action_ids:
+                if action_id not in executed:
+                    results.append({"success": False, "message": f"アクション {action_id} が見つかりません"})
+                    continue
+                self.queue.mark_executed(action_id, executed[action_id])
+                results.append(executed[action_id])
+        
+        return results
 
     def reject_action(self, action_id: str, reason: str = "") -> dict:
         """
@@ -480,7 +935,7 @@ class ActionExecutor:
             "params": {
                 "current_budget": current_budget,
                 "new_budget": new_budget,
-                "change_percent": ((new_budget - current_budget) / current_budget * 100) if current_budget > 0 else 0,
+                "change_percent": _pct_change(current_budget, new_budget),
             },
             "reason": reason,
         }
@@ -544,26 +999,7 @@ class ActionExecutor:
             },
         }
         
-        # 安全チェック
-        safety = self._safety_check(action)
-        if not safety.get("passed"):
-            return {
-                "success": False,
-                "error": safety.get("reason", "安全チェック失敗"),
-            }
-        
-        # 実行
-        result = self._execute_budget_change(action, increase=True)
-        
-        # 履歴に記録
-        self.queue.add_to_history({
-            "action": action,
-            "result": result,
-            "executed_at": __import__("datetime").datetime.now().isoformat(),
-            "type": "direct_execution",
-        })
-        
-        return result
+        return self._execute_direct(action)
 
     def execute_status_change_direct(
         self,
@@ -591,14 +1027,30 @@ class ActionExecutor:
             },
         }
         
+        return self._execute_direct(action)
+
+    def _execute_direct(self, action: dict) -> dict:
+        """
+        承認キューを通さずにアクションを実行して履歴に記録
+        
+        モードに関わらず実行する（ダッシュボードからの手動操作用）。
+        安全チェックはキュー経由の実行と同じ _safety_check を1回だけ通す。
+        """
+        safety = self._safety_check(action)
+        if not safety.get("passed"):
+            return {
+                "success": False,
+                "error": safety.get("reason", "安全チェック失敗"),
+            }
+        
         # 実行
-        result = self._execute_status_change(action, status=new_status)
+        result = self._run_action(action)
         
         # 履歴に記録
         self.queue.add_to_history({
             "action": action,
             "result": result,
-            "executed_at": __import__("datetime").datetime.now().isoformat(),
+            "executed_at": self.queue._now_iso(),
             "type": "direct_execution",
         })
         
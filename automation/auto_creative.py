@@ -4,10 +4,28 @@ AIがパフォーマンスを分析し、クリエイティブ追加・広告セ
 """
 import logging
 from datetime import datetime
+from types import MappingProxyType
 from typing import Any
 
+import numpy as np
+
 logger = logging.getLogger(__name__)
 
+# キーが無い場合の既定値（キャンペーンごとに空の dict を作らない）
+_EMPTY = MappingProxyType({})
+
+
+def _last_7d(campaign: dict) -> dict:
+    """キャンペーンの直近7日間のパフォーマンス（無ければ空）"""
+    periods = campaign.get("periods")
+    return periods.get("last_7d") or _EMPTY if periods else _EMPTY
+
+
+def _has_positives(campaign: dict) -> bool:
+    """判定結果に好調シグナルがあるか"""
+    judgment = campaign.get("judgment")
+    return bool(judgment and judgment.get("positives"))
+
 
 class AutoCreativeProposer:
     """
@@ -51,14 +69,18 @@ class AutoCreativeProposer:
         campaigns = monitor_results.get("campaigns", [])
         opportunities = monitor_results.get("opportunities", [])
         
+        # 各判定で使う値を一度だけ列ごとの配列に展開
+        opportunity_ids = frozenset(o.get("campaign_id") for o in opportunities)
+        columns = self._to_columns(campaigns, opportunity_ids)
+        
         # 1. 好調キャンペーンへのクリエイティブ追加提案
-        proposals.extend(self._propose_creative_additions(campaigns, opportunities))
+        proposals.extend(self._propose_creative_additions(campaigns, columns))
         
         # 2. 好調広告セットの複製提案
-        proposals.extend(self._propose_adset_duplications(campaigns, opportunities))
+        proposals.extend(self._propose_adset_duplications(campaigns, columns))
         
         # 3. ASCキャンペーンのクリエイティブ追加提案
-        proposals.extend(self._propose_asc_creative_additions(campaigns))
+        proposals.extend(self._propose_asc_creative_additions(campaigns, columns))
         
         # 各提案にメタ情報を追加
         for proposal in proposals:
@@ -69,36 +91,50 @@ class AutoCreativeProposer:
         logger.info(f"{len(proposals)}件の入稿提案を生成しました")
         return proposals
 
+    @staticmethod
+    def _to_columns(campaigns: list[dict], opportunity_ids: frozenset) -> dict[str, np.ndarray]:
+        """キャンペーンのリストを判定用の列（NumPy配列）に変換"""
+        last_7d = [_last_7d(c) for c in campaigns]
+        count = len(campaigns)
+        
+        return {
+            "is_opportunity": np.fromiter(
+                (c.get("id") in opportunity_ids for c in campaigns), dtype=bool, count=count,
+            ),
+            "has_positives": np.fromiter(
+                (_has_positives(c) for c in campaigns), dtype=bool, count=count,
+            ),
+            "is_asc": np.fromiter(
+                (bool(c.get("is_asc", False)) for c in campaigns), dtype=bool, count=count,
+            ),
+            "roas_7d": np.fromiter(
+                (p.get("roas") or 0.0 for p in last_7d), dtype=np.float64, count=count,
+            ),
+            "conversions_7d": np.fromiter(
+                (p.get("conversions") or 0 for p in last_7d), dtype=np.float64, count=count,
+            ),
+        }
+
     def _propose_creative_additions(
         self,
         campaigns: list[dict],
-        opportunities: list[dict],
+        columns: dict[str, np.ndarray],
     ) -> list[dict]:
         """好調キャンペーンへのクリエイティブ追加を提案"""
         proposals = []
         
-        # 拡大チャンスのあるキャンペーンを対象に
-        opportunity_campaign_ids = {o.get("campaign_id") for o in opportunities}
+        # 拡大チャンスのある（opportunity）キャンペーンのうち、ROASまたはCPFが目標達成しているもの
+        candidates = np.flatnonzero(columns["is_opportunity"] & columns["has_positives"])
         
-        for campaign in campaigns:
-            campaign_id = campaign.get("id")
-            campaign_name = campaign.get("name", "Unknown")
-            judgment = campaign.get("judgment", {})
-            
-            # 好調（opportunity）なキャンペーンのみ
-            if campaign_id not in opportunity_campaign_ids:
-                continue
-            
-            # ROASまたはCPFが目標達成している場合
-            positives = judgment.get("positives", [])
-            if not positives:
-                continue
+        for i in candidates:
+            campaign = campaigns[i]
+            positives = campaign["judgment"]["positives"]
             
             proposals.append({
                 "type": "creative_addition",
                 "action": "add_creative",
-                "campaign_id": campaign_id,
-                "campaign_name": campaign_name,
+                "campaign_id": campaign.get("id"),
+                "campaign_name": campaign.get("name", "Unknown"),
                 "reason": f"好調なキャンペーンにクリエイティブを追加して配信拡大",
                 "details": {
                     "positive_signals": [p.get("message") for p in positives[:3]],
@@ -117,83 +153,76 @@ class AutoCreativeProposer:
     def _propose_adset_duplications(
         self,
         campaigns: list[dict],
-        opportunities: list[dict],
+        columns: dict[str, np.ndarray],
     ) -> list[dict]:
         """好調広告セットの複製を提案"""
         proposals = []
         
-        opportunity_campaign_ids = {o.get("campaign_id") for o in opportunities}
+        roas_7d = columns["roas_7d"]
+        conversions_7d = columns["conversions_7d"]
         
-        for campaign in campaigns:
-            campaign_id = campaign.get("id")
-            campaign_name = campaign.get("name", "Unknown")
-            judgment = campaign.get("judgment", {})
-            periods = campaign.get("periods", {})
-            
-            # 好調なキャンペーンのみ
-            if campaign_id not in opportunity_campaign_ids:
-                continue
-            
-            # 7日間で安定して好調な場合
-            last_7d = periods.get("last_7d", {})
-            roas = last_7d.get("roas", 0)
-            conversions = last_7d.get("conversions", 0)
+        # 好調なキャンペーンのうち、7日間で安定して好調なもの
+        candidates = np.flatnonzero(
+            columns["is_opportunity"] & (roas_7d >= 3.0) & (conversions_7d >= 10)
+        )
+        
+        for i in candidates:
+            campaign = campaigns[i]
+            roas = float(roas_7d[i])
+            # 7日間の値は日平均のため小数のまま表示する（元の値を使う）
+            conversions = _last_7d(campaign).get("conversions", 0)
             
-            if roas >= 3.0 and conversions >= 10:
-                proposals.append({
-                    "type": "adset_duplication",
-                    "action": "duplicate_adset",
-                    "campaign_id": campaign_id,
-                    "campaign_name": campaign_name,
-                    "reason": f"ROAS {roas:.1f}、CV {conversions}件で安定好調のため広告セット複製",
-                    "details": {
-                        "last_7d_roas": roas,
-                        "last_7d_conversions": conversions,
-                    },
-                    "priority": "low",
-                    "expected_impact": "同一ターゲティングでの配信拡大",
-                    "required_inputs": [],
-                })
+            proposals.append({
+                "type": "adset_duplication",
+                "action": "duplicate_adset",
+                "campaign_id": campaign.get("id"),
+                "campaign_name": campaign.get("name", "Unknown"),
+                "reason": f"ROAS {roas:.1f}、CV {conversions}件で安定好調のため広告セット複製",
+                "details": {
+                    "last_7d_roas": roas,
+                    "last_7d_conversions": conversions,
+                },
+                "priority": "low",
+                "expected_impact": "同一ターゲティングでの配信拡大",
+                "required_inputs": [],
+            })
         
         return proposals
 
-    def _propose_asc_creative_additions(self, campaigns: list[dict]) -> list[dict]:
+    def _propose_asc_creative_additions(
+        self,
+        campaigns: list[dict],
+        columns: dict[str, np.ndarray],
+    ) -> list[dict]:
         """ASCキャンペーンへのクリエイティブ追加提案"""
         proposals = []
         
-        for campaign in campaigns:
-            is_asc = campaign.get("is_asc", False)
-            
-            if not is_asc:
-                continue
-            
-            campaign_id = campaign.get("id")
-            campaign_name = campaign.get("name", "Unknown")
-            judgment = campaign.get("judgment", {})
-            periods = campaign.get("periods", {})
-            
-            # ASCは常にクリエイティブ追加が効果的
-            last_7d = periods.get("last_7d", {})
-            roas = last_7d.get("roas", 0)
+        roas_7d = columns["roas_7d"]
+        
+        # ASCは常にクリエイティブ追加が効果的（ROASが2以上なら追加提案）
+        candidates = np.flatnonzero(columns["is_asc"] & (roas_7d >= 2.0))
+        
+        for i in candidates:
+            campaign = campaigns[i]
+            roas = float(roas_7d[i])
             
-            if roas >= 2.0:  # ROASが2以上なら追加提案
-                proposals.append({
-                    "type": "asc_creative_addition",
-                    "action": "add_creative_to_asc",
-                    "campaign_id": campaign_id,
-                    "campaign_name": campaign_name,
-                    "reason": f"ASCキャンペーン（ROAS {roas:.1f}）にクリエイティブ追加で機械学習を強化",
-                    "details": {
-                        "current_roas": roas,
-                        "note": "ASCは多様なクリエイティブで学習効率が向上",
-                    },
-                    "priority": "high" if roas >= 3.0 else "medium",
-                    "expected_impact": "機械学習の精度向上＆配信拡大",
-                    "required_inputs": [
-                        "商品画像（複数推奨）",
-                        "動画素材（あれば）",
-                    ],
-                })
+            proposals.append({
+                "type": "asc_creative_addition",
+                "action": "add_creative_to_asc",
+                "campaign_id": campaign.get("id"),
+                "campaign_name": campaign.get("name", "Unknown"),
+                "reason": f"ASCキャンペーン（ROAS {roas:.1f}）にクリエイティブ追加で機械学習を強化",
+                "details": {
+                    "current_roas": roas,
+                    "note": "ASCは多様なクリエイティブで学習効率が向上",
+                },
+                "priority": "high" if roas >= 3.0 else "medium",
+                "expected_impact": "機械学習の精度向上＆配信拡大",
+                "required_inputs": [
+                    "商品画像（複数推奨）",
+                    "動画素材（あれば）",
+                ],
+            })
         
         return proposals
 
@@ -259,9 +288,10 @@ def analyze_and_propose_creatives(
     
     proposals = proposer.analyze_and_propose(account_id, monitor_results)
     
-    # 各提案をアクションキューに追加
-    for proposal in proposals:
-        proposer.create_proposal_action(proposal)
+    # 各提案をアクションキューに追加（キューの書き込みは最後に1回）
+    with action_executor.queue.batched():
+        for proposal in proposals:
+            proposer.create_proposal_action(proposal)
     
     return proposals
 
@@ -2,14 +2,145 @@
 キャンペーンテンプレート
 ワンクリックでキャンペーンを作成するためのプリセット
 """
+import copy
+import json
 import logging
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import Any
+from pathlib import Path
+from types import MappingProxyType
+from typing import Any, Callable
 
 from anthropic import Anthropic
+from facebook_business.exceptions import FacebookRequestError
+
+import config
+from meta_api.ads import AdManager
+from meta_api.adsets import AdSetManager
+from meta_api.batch import execute_dependent_batch
+from meta_api.campaigns import CampaignManager
+from meta_api.creative import CreativeManager
 
 logger = logging.getLogger(__name__)
 
+# 生成した広告テキストのキャッシュ（入力 → テキスト）
+AD_TEXT_CACHE_FILE = Path(__file__).parent.parent / "storage" / "ad_text_cache.json"
+AD_TEXT_CACHE_TTL_SECONDS = 24 * 60 * 60
+AD_TEXT_CACHE_MAX_ENTRIES = 256
+
+_ad_text_cache: dict[str, dict] | None = None
+
+# 広告テキスト生成はワーカースレッドや複数セッションから同時に呼ばれるため、
+# キャッシュの読み書き・保存はこのロックで直列化する
+_ad_text_cache_lock = threading.Lock()
+
+
+def _load_ad_text_cache() -> dict[str, dict]:
+    """広告テキストのキャッシュを取得（初回のみファイルから読み込み。_ad_text_cache_lock を保持して呼び出す）"""
+    global _ad_text_cache
+    if _ad_text_cache is None:
+        _ad_text_cache = {}
+        if AD_TEXT_CACHE_FILE.exists():
+            try:
+                with open(AD_TEXT_CACHE_FILE, "r", encoding="utf-8") as f:
+                    _ad_text_cache = json.load(f)
+            except Exception as e:
+                logger.warning(f"広告テキストキャッシュ読み込みエラー: {e}")
+    return _ad_text_cache
+
+
+def _ad_text_cache_key(
+    product_name: str,
+    product_description: str,
+    target_audience: str,
+    campaign_type: str,
+    num_variations: int,
+) -> str:
+    """広告テキストのキャッシュキー"""
+    return json.dumps(
+        [product_name, product_description, target_audience, campaign_type, num_variations],
+        ensure_ascii=False,
+    )
+
+
+def _get_cached_ad_texts(key: str) -> list[dict] | None:
+    """有効期限内のキャッシュがあればそのコピーを返す"""
+    with _ad_text_cache_lock:
+        cached = _load_ad_text_cache().get(key)
+        if cached and time.time() - cached["created_at"] < AD_TEXT_CACHE_TTL_SECONDS:
+            return copy.deepcopy(cached["texts"])
+    return None
+
+
+def _store_ad_texts(entries: dict[str, list[dict]]):
+    """生成した広告テキストをキャッシュに追加して保存"""
+    now = time.time()
+    with _ad_text_cache_lock:
+        cache = _load_ad_text_cache()
+        for key, texts in entries.items():
+            cache[key] = {"texts": copy.deepcopy(texts), "created_at": now}
+        _save_ad_text_cache()
+
+
+def _save_ad_text_cache():
+    """期限切れ・古いエントリを除いてキャッシュを保存（_ad_text_cache_lock を保持して呼び出す）"""
+    global _ad_text_cache
+    now = time.time()
+    entries = sorted(
+        (
+            (key, entry) for key, entry in _load_ad_text_cache().items()
+            if now - entry["created_at"] < AD_TEXT_CACHE_TTL_SECONDS
+        ),
+        key=lambda item: item[1]["created_at"],
+    )
+    _ad_text_cache = dict(entries[-AD_TEXT_CACHE_MAX_ENTRIES:])
+    
+    try:
+        AD_TEXT_CACHE_FILE.parent.mkdir(parents=True, exist_ok=True)
+        with open(AD_TEXT_CACHE_FILE, "w", encoding="utf-8") as f:
+            json.dump(_ad_text_cache, f, ensure_ascii=False)
+    except Exception as e:
+        logger.warning(f"広告テキストキャッシュ保存エラー: {e}")
+
+
+# 画像・クリエイティブ一覧のキャッシュ（(種類, アカウントID, 件数) → (有効期限, 一覧)）
+# 画像ピッカーを開くたびに同じ一覧を Graph API から取り直さないようにする
+_LIBRARY_CACHE_MAX_ENTRIES = 32
+_library_cache: OrderedDict[tuple[str, str, int], tuple[float, list[dict]]] = OrderedDict()
+_library_cache_lock = threading.Lock()
+
+
+def _get_cached_library(key: tuple[str, str, int]) -> list[dict] | None:
+    """有効なキャッシュがあれば一覧のコピーを返す"""
+    with _library_cache_lock:
+        entry = _library_cache.get(key)
+        if entry is None:
+            return None
+        if entry[0] <= time.monotonic():
+            del _library_cache[key]
+            return None
+        _library_cache.move_to_end(key)
+        return list(entry[1])
+
+
+def _set_cached_library(key: tuple[str, str, int], items: list[dict]):
+    """一覧をキャッシュ（上限を超えたら最も古く使われたものから削除）"""
+    with _library_cache_lock:
+        _library_cache[key] = (time.monotonic() + config.META_CACHE_TTL["lists"], list(items))
+        _library_cache.move_to_end(key)
+        while len(_library_cache) > _LIBRARY_CACHE_MAX_ENTRIES:
+            _library_cache.popitem(last=False)
+
+
+def _invalidate_library_cache(account_id: str):
+    """アカウントの一覧キャッシュを破棄"""
+    with _library_cache_lock:
+        for key in [k for k in _library_cache if k[1] == account_id]:
+            del _library_cache[key]
+
 
 # =============================================================================
 # キャンペーンテンプレート定義
@@ -104,16 +235,155 @@ CAMPAIGN_TEMPLATES = {
 }
 
 
+def _freeze(value: Any) -> Any:
+    """dict/list を読み取り専用の MappingProxyType/tuple に再帰的に変換"""
+    if isinstance(value, dict):
+        return MappingProxyType({k: _freeze(v) for k, v in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(v) for v in value)
+    return value
+
+
+def _thaw(value: Any) -> Any:
+    """_freeze した値を API に渡せる dict/list に戻す"""
+    if isinstance(value, MappingProxyType):
+        return {k: _thaw(v) for k, v in value.items()}
+    if isinstance(value, tuple):
+        return [_thaw(v) for v in value]
+    return value
+
+
+# テンプレートは実行中に変更しないため読み取り専用にして共有する
+CAMPAIGN_TEMPLATES = _freeze(CAMPAIGN_TEMPLATES)
+
+# キーが無い場合の既定値（呼び出しごとに空の dict を作らない）
+_EMPTY = MappingProxyType({})
+
+# テンプレート一覧の表示用データ（読み込み時に1度だけ作成し、テンプレートと中身を共有）
+_AVAILABLE_TEMPLATES = tuple(
+    MappingProxyType({
+        "id": key,
+        "name": template["name"],
+        "description": template["description"],
+        "icon": template["icon"],
+        "defaults": template["defaults"],
+        "requires": template.get("requires", ()),
+    })
+    for key, template in CAMPAIGN_TEMPLATES.items()
+)
+
+
 # =============================================================================
 # テキスト自動生成
 # =============================================================================
 
+# 静的な指示部分は system に置き、末尾に cache_control を付けて送信する
+# （商品ごとに変わる部分は user メッセージで送る）
+# ただし system が最小キャッシュ長（Sonnet は1024トークン）に満たない間は、
+# API はエラーにせずキャッシュせずに処理する。現状の指示はこの長さに届かないため、
+# 指示が長くなるまでは効果がない（実際の読込量は _request_ad_texts のデバッグログで確認する）。
+AD_TEXT_SYSTEM_PROMPT = """あなたはMeta広告（Instagram/Facebook）の広告コピーライターです。
+指定された商品/サービスの広告テキストを、指定されたパターン数だけ生成してください。
+
+【生成するテキスト】
+各パターンについて以下を生成:
+1. headline（見出し）: 25文字以内、インパクトのある一言
+2. primary_text（メインテキスト）: 125文字以内、商品の魅力を伝える本文
+3. description（説明）: 30文字以内、CTAを促す短い説明
+
+【ルール】
+- 日本語で生成
+- 絵文字は適度に使用OK
+- 誇大広告にならないよう注意
+- キャンペーンタイプに適したトーンで
+
+JSON形式で出力してください:
+[
+  {"headline": "...", "primary_text": "...", "description": "..."},
+  ...
+]"""
+
+_AD_TEXT_SYSTEM = [
+    {"type": "text", "text": AD_TEXT_SYSTEM_PROMPT, "cache_control": {"type": "ephemeral"}},
+]
+
+# user メッセージのテンプレート（呼び出しごとに埋めるのは商品情報とパターン数のみ）
+_AD_TEXT_PRODUCT = """名前: {name}
+説明: {description}
+ターゲット: {audience}
+キャンペーンタイプ: {campaign_type}"""
+
+_AD_TEXT_PROMPT = """以下の商品/サービスの広告テキストを{num_variations}パターン生成してください。
+
+【商品/サービス】
+{product}
+"""
+
+_AD_TEXT_BULK_PROMPT_HEAD = """以下の{count}件の商品/サービスそれぞれについて、指定のパターン数の広告テキストを生成してください。
+
+"""
+
+_AD_TEXT_BULK_PROMPT_TAIL = """
+
+商品ごとの配列を商品の順に並べた、配列の配列（JSON）で出力してください:
+[
+  [{"headline": "...", "primary_text": "...", "description": "..."}, ...],
+  ...
+]
+"""
+
+
+def _format_product(name: str, description: str, audience: str, campaign_type: str) -> str:
+    """プロンプトに埋め込む商品情報"""
+    return _AD_TEXT_PRODUCT.format(
+        name=name,
+        description=description or "（なし）",
+        audience=audience or "一般",
+        campaign_type=campaign_type,
+    )
+
+
+_JSON_DECODER = json.JSONDecoder()
+
+# Graph APIのレート制限エラーコード
+_RATE_LIMIT_ERROR_CODES = frozenset({4, 17, 32, 613, 80004})
+
+
+def _is_ad_text_list(data: Any) -> bool:
+    """広告テキストのリスト（見出しと本文を持つ dict が1件以上）か"""
+    return (
+        isinstance(data, list)
+        and bool(data)
+        and all(isinstance(text, dict) and text.get("headline") and text.get("primary_text") for text in data)
+    )
+
+
+def _extract_json_array(content: str, accept: Callable[[list], bool] = _is_ad_text_list) -> list | None:
+    """
+    Claudeの応答から accept を満たす最初のJSON配列を取り出す（見つからなければ None）
+
+    "[" の位置からそのままデコードし、配列の終わりで止める（部分文字列は作らない）。
+    説明文中の "[1]" のような配列は読み飛ばし、その後ろから次の候補を探す。
+    """
+    start = content.find("[")
+    while start >= 0:
+        try:
+            data, end = _JSON_DECODER.raw_decode(content, start)
+        except json.JSONDecodeError:
+            # 説明文中の "[" などはスキップして次の候補から読む
+            start = content.find("[", start + 1)
+            continue
+        if isinstance(data, list) and accept(data):
+            return data
+        start = content.find("[", end)
+    return None
+
+
 class AdTextGenerator:
     """AIで広告テキストを自動生成"""
 
     def __init__(self):
         try:
-            import config
             self.client = Anthropic(api_key=config.ANTHROPIC_API_KEY)
         except Exception as e:
             logger.warning(f"Anthropic初期化エラー: {e}")
@@ -143,55 +413,137 @@ class AdTextGenerator:
         if not self.client:
             return self._get_default_texts(product_name, campaign_type)
 
-        prompt = f"""あなたはMeta広告（Instagram/Facebook）の広告コピーライターです。
-以下の商品/サービスの広告テキストを{num_variations}パターン生成してください。
+        # 同じ入力の生成結果はキャッシュから返す（Claude呼び出しを省く）
+        cache_key = _ad_text_cache_key(
+            product_name, product_description, target_audience, campaign_type, num_variations,
+        )
+        cached = _get_cached_ad_texts(cache_key)
+        if cached is not None:
+            return cached
 
-【商品/サービス】
-名前: {product_name}
-説明: {product_description or "（なし）"}
-ターゲット: {target_audience or "一般"}
-キャンペーンタイプ: {campaign_type}
+        texts = self._request_ad_texts(
+            product_name, product_description, target_audience, campaign_type, num_variations,
+        )
+        if texts is None:
+            return self._get_default_texts(product_name, campaign_type)
 
-【生成するテキスト】
-各パターンについて以下を生成:
-1. headline（見出し）: 25文字以内、インパクトのある一言
-2. primary_text（メインテキスト）: 125文字以内、商品の魅力を伝える本文
-3. description（説明）: 30文字以内、CTAを促す短い説明
+        _store_ad_texts({cache_key: texts})
+        return copy.deepcopy(texts)
 
-【ルール】
-- 日本語で生成
-- 絵文字は適度に使用OK
-- 誇大広告にならないよう注意
-- {campaign_type}に適したトーンで
+    def generate_ad_texts_bulk(self, items: list[dict]) -> list[list[dict]]:
+        """
+        複数の商品/キャンペーンの広告テキストを1回のリクエストでまとめて生成
+        
+        Args:
+            items: generate_ad_texts の引数の辞書のリスト
+                [{"product_name": "...", "campaign_type": "sales", "num_variations": 1}, ...]
+        
+        Returns:
+            list[list[dict]]: items と同じ順の広告テキストのリスト
+        """
+        if not self.client:
+            return [self.generate_ad_texts(**item) for item in items]
 
-JSON形式で出力してください:
-[
-  {{"headline": "...", "primary_text": "...", "description": "..."}},
-  ...
-]
-"""
+        results: list[list[dict] | None] = [None] * len(items)
+        uncached = []
+        for i, item in enumerate(items):
+            args = (
+                item["product_name"],
+                item.get("product_description", ""),
+                item.get("target_audience", ""),
+                item.get("campaign_type", "sales"),
+                item.get("num_variations", 3),
+            )
+            key = _ad_text_cache_key(*args)
+            results[i] = _get_cached_ad_texts(key)
+            if results[i] is None:
+                uncached.append((i, key, args))
+
+        if len(uncached) == 1:
+            i, _, args = uncached[0]
+            results[i] = self.generate_ad_texts(*args)
+        elif uncached:
+            generated = self._request_ad_texts_bulk([args for _, _, args in uncached])
+            if generated is None:
+                # まとめて生成できなかった場合は1件ずつ生成
+                for i, _, args in uncached:
+                    results[i] = self.generate_ad_texts(*args)
+            else:
+                _store_ad_texts({key: generated[n] for n, (_, key, _) in enumerate(uncached)})
+                for n, (i, _, _) in enumerate(uncached):
+                    results[i] = copy.deepcopy(generated[n])
+
+        return results
+
+    def _request_ad_texts_bulk(self, items: list[tuple]) -> list[list[dict]] | None:
+        """Claudeで複数の商品の広告テキストを1回で生成（失敗時は None）"""
+        sections = "\n".join(
+            f"【商品/サービス {n}】（{num_variations}パターン）\n"
+            + _format_product(name, description, audience, campaign_type)
+            for n, (name, description, audience, campaign_type, num_variations) in enumerate(items, 1)
+        )
+        prompt = _AD_TEXT_BULK_PROMPT_HEAD.format(count=len(items)) + sections + _AD_TEXT_BULK_PROMPT_TAIL
+
+        try:
+            response = self.client.messages.create(
+                model="claude-sonnet-4-20250514",
+                max_tokens=1000 * len(items),
+                system=_AD_TEXT_SYSTEM,
+                messages=[{"role": "user", "content": prompt}],
+            )
+            
+            generated = _extract_json_array(
+                response.content[0].text,
+                accept=lambda data: len(data) == len(items) and all(map(_is_ad_text_list, data)),
+            )
+            if generated is not None:
+                return generated
+            logger.warning("広告テキストの一括生成結果を解析できませんでした")
+            
+        except Exception as e:
+            logger.error(f"テキスト一括生成エラー: {e}")
+        
+        return None
+
+    def _request_ad_texts(
+        self,
+        product_name: str,
+        product_description: str,
+        target_audience: str,
+        campaign_type: str,
+        num_variations: int,
+    ) -> list[dict] | None:
+        """Claudeで広告テキストを生成（失敗時は None）"""
+        prompt = _AD_TEXT_PROMPT.format(
+            num_variations=num_variations,
+            product=_format_product(product_name, product_description, target_audience, campaign_type),
+        )
 
         try:
             response = self.client.messages.create(
                 model="claude-sonnet-4-20250514",
                 max_tokens=1000,
+                system=_AD_TEXT_SYSTEM,
                 messages=[{"role": "user", "content": prompt}],
             )
             
-            # JSONをパース
-            import json
-            content = response.content[0].text
+            usage = getattr(response, "usage", None)
+            if usage is not None:
+                logger.debug(
+                    f"広告テキスト生成: キャッシュ読込{getattr(usage, 'cache_read_input_tokens', 0)}トークン / "
+                    f"入力{getattr(usage, 'input_tokens', 0)}トークン"
+                )
             
-            # JSON部分を抽出
-            start = content.find("[")
-            end = content.rfind("]") + 1
-            if start >= 0 and end > start:
-                return json.loads(content[start:end])
+            # JSON部分を抽出してパース（広告テキストとして使えない結果はキャッシュさせない）
+            texts = _extract_json_array(response.content[0].text)
+            if texts is not None:
+                return texts
+            logger.warning("広告テキストの生成結果を解析できませんでした")
             
         except Exception as e:
             logger.error(f"テキスト生成エラー: {e}")
         
-        return self._get_default_texts(product_name, campaign_type)
+        return None
 
     def _get_default_texts(self, product_name: str, campaign_type: str) -> list[dict]:
         """デフォルトのテキストテンプレート"""
@@ -238,17 +590,7 @@ class QuickLaunchEngine:
 
     def get_available_templates(self) -> list[dict]:
         """利用可能なテンプレート一覧を取得"""
-        templates = []
-        for key, template in CAMPAIGN_TEMPLATES.items():
-            templates.append({
-                "id": key,
-                "name": template["name"],
-                "description": template["description"],
-                "icon": template["icon"],
-                "defaults": template["defaults"],
-                "requires": template.get("requires", []),
-            })
-        return templates
+        return list(_AVAILABLE_TEMPLATES)
 
     def get_creative_library(self, account_id: str, limit: int = 20) -> list[dict]:
         """
@@ -261,8 +603,12 @@ class QuickLaunchEngine:
         Returns:
             list[dict]: [{"id": "...", "url": "...", "type": "image/video"}, ...]
         """
+        cache_key = ("creatives", account_id, limit)
+        cached = _get_cached_library(cache_key)
+        if cached is not None:
+            return cached
+        
         try:
-            from meta_api.creative import CreativeManager
             ad_account = self.meta_auth.get_ad_account(account_id)
             creative_manager = CreativeManager(ad_account)
             
@@ -278,6 +624,7 @@ class QuickLaunchEngine:
                     "type": "creative",
                 })
             
+            _set_cached_library(cache_key, result)
             return result
             
         except Exception as e:
@@ -295,6 +642,11 @@ class QuickLaunchEngine:
         Returns:
             list[dict]: [{"hash": "...", "url": "...", "name": "..."}, ...]
         """
+        cache_key = ("images", account_id, limit)
+        cached = _get_cached_library(cache_key)
+        if cached is not None:
+            return cached
+        
         try:
             ad_account = self.meta_auth.get_ad_account(account_id)
             
@@ -312,12 +664,136 @@ class QuickLaunchEngine:
                     "created_time": img.get("created_time"),
                 })
             
+            _set_cached_library(cache_key, result)
             return result
             
         except Exception as e:
             logger.error(f"画像一覧取得エラー: {e}")
             return []
 
+    @staticmethod
+    def _campaign_type(template_id: str) -> str:
+        """テキスト生成に使うキャンペーンタイプ"""
+        return "traffic" if "traffic" in template_id.lower() else "sales"
+
+    def quick_launch_many(self, launches: list[dict]) -> list[dict]:
+        """
+        複数のキャンペーンを作成（自動生成するテキストは1回のリクエストでまとめて生成）
+        
+        Args:
+            launches: quick_launch の引数の辞書のリスト
+        
+        Returns:
+            list[dict]: launches と同じ順の作成結果
+        """
+        launches = [dict(launch) for launch in launches]
+        to_generate = [
+            launch for launch in launches
+            if not launch.get("custom_texts")
+            and launch.get("auto_generate_texts", True)
+            and launch.get("template_id") in CAMPAIGN_TEMPLATES
+        ]
+        if to_generate:
+            generated = self.text_generator.generate_ad_texts_bulk([
+                {
+                    "product_name": launch["product_name"],
+                    "campaign_type": self._campaign_type(launch["template_id"]),
+                    "num_variations": 1,
+                }
+                for launch in to_generate
+            ])
+            for launch, texts in zip(to_generate, generated):
+                launch["custom_texts"] = texts
+
+        return [self.quick_launch(**launch) for launch in launches]
+
+    @staticmethod
+    def _create_with_retry(create, params: dict, name: str) -> dict | None:
+        """1件作成（レート制限エラーは指数バックオフでリトライ、失敗時は None）"""
+        retry = config.META_RATE_LIMIT_RETRY
+        for attempt in range(retry["max_retries"] + 1):
+            try:
+                created = create(params=params)
+                return {"id": created.get("id")}
+            except FacebookRequestError as e:
+                rate_limited = (
+                    e.http_status() == 429 or e.api_error_code() in _RATE_LIMIT_ERROR_CODES
+                )
+                if not rate_limited or attempt == retry["max_retries"]:
+                    logger.error(f"作成エラー（{name}）: {e}")
+                    return None
+                delay = retry["base_delay_seconds"] * 2 ** attempt
+                logger.warning(f"レート制限のため{delay}秒後にリトライします（{name}）")
+                time.sleep(delay)
+            except Exception as e:
+                logger.error(f"作成エラー（{name}）: {e}")
+                return None
+        return None
+
+    def _create_without_batch(
+        self,
+        ad_account,
+        requests: list[dict],
+        parallel: bool = True,
+    ) -> list[dict | None]:
+        """
+        バッチを使わずに作成リクエストを実行
+        
+        キャンペーン・広告セットは順に作成し、"{result=<name>:$.id}" の参照を
+        作成済みのIDに置き換える。互いに依存しない広告は並列に作成する。
+        
+        Args:
+            ad_account: 広告アカウント
+            requests: execute_dependent_batch と同じ形式の作成リクエスト
+            parallel: False の場合は広告も1件ずつ作成（デバッグ用）
+        
+        Returns:
+            list: リクエストごとの {"id": ...}（失敗したものは None）
+        """
+        create = {
+            "campaigns": ad_account.create_campaign,
+            "adsets": ad_account.create_ad_set,
+            "ads": ad_account.create_ad,
+        }
+        created_ids = {}
+        
+        def run(request: dict) -> dict | None:
+            params = {
+                key: created_ids.get(value, value) if isinstance(value, str) else value
+                for key, value in request["params"].items()
+            }
+            edge = request["relative_url"].rsplit("/", 1)[-1]
+            return self._create_with_retry(create[edge], params, request["name"])
+        
+        results = []
+        ad_requests = []
+        for request in requests:
+            if request["relative_url"].endswith("/ads"):
+                ad_requests.append(request)
+                continue
+            result = run(request)
+            if result:
+                created_ids[f"{{result={request['name']}:$.id}}"] = result["id"]
+            results.append(result)
+        
+        if parallel and len(ad_requests) > 1:
+            # 広告作成はAPI待ちが支配的なためスレッドで並列実行（結果はリクエスト順）
+            max_workers = min(config.META_MAX_PARALLEL_AD_CREATIONS, len(ad_requests))
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                results.extend(executor.map(run, ad_requests))
+        else:
+            results.extend(run(request) for request in ad_requests)
+        
+        return results
+
+    def _execute_requests(self, ad_account, requests: list[dict]) -> list[dict | None]:
+        """作成リクエストを1回のバッチで実行（バッチ自体が失敗した場合は個別に作成）"""
+        try:
+            return execute_dependent_batch(requests, api=ad_account.get_api_assured())
+        except Exception as e:
+            logger.warning(f"バッチでの作成に失敗したため個別に作成します: {e}")
+            return self._create_without_batch(ad_account, requests)
+
     def quick_launch(
         self,
         account_id: str,
@@ -356,18 +832,10 @@ class QuickLaunchEngine:
             return {"success": False, "error": f"テンプレート {template_id} が見つかりません"}
 
         try:
-            # マネージャー取得
-            from meta_api.campaigns import CampaignManager
-            from meta_api.adsets import AdSetManager
-            from meta_api.ads import AdManager
-            
             ad_account = self.meta_auth.get_ad_account(account_id)
-            campaign_manager = CampaignManager(ad_account)
-            adset_manager = AdSetManager(ad_account)
-            ad_manager = AdManager(ad_account)
             
             defaults = template["defaults"]
-            ad_defaults = template.get("ad_defaults", {})
+            ad_defaults = template.get("ad_defaults", _EMPTY)
             
             # 予算
             daily_budget = custom_budget or defaults["daily_budget"]
@@ -376,76 +844,116 @@ class QuickLaunchEngine:
             date_str = datetime.now().strftime("%Y%m%d")
             campaign_name = f"{campaign_name_prefix}{template['name']}_{product_name}_{date_str}"
             
-            # 1. キャンペーン作成
-            campaign_result = campaign_manager.create_campaign(
-                name=campaign_name,
-                objective=template["objective"],
-                status="PAUSED",  # 最初は停止状態
-                daily_budget=daily_budget if template.get("is_asc") else None,
-            )
+            # 1. テキスト生成
+            #    Claudeでの生成はキャンペーン・広告セットの作成と依存しないため並行して実行する
+            #    （Meta APIの呼び出しは呼び出し元のスレッドで行う）
+            text_future = None
+            if custom_texts:
+                ad_texts = custom_texts
+            elif auto_generate_texts:
+                text_executor = ThreadPoolExecutor(max_workers=1)
+                text_future = text_executor.submit(
+                    self.text_generator.generate_ad_texts,
+                    product_name=product_name,
+                    campaign_type=self._campaign_type(template_id),
+                    num_variations=1,
+                )
+                text_executor.shutdown(wait=False)
+            else:
+                ad_texts = [{"headline": product_name, "primary_text": "", "description": ""}]
+            
+            # 2. キャンペーン・広告セット（ASC以外）の作成リクエストを組み立て
+            #    後続のリクエストは先に作成したIDを "{result=<name>:$.id}" で参照する
+            account_path = ad_account.get_id()
+            requests = [{
+                "name": "campaign",
+                "relative_url": f"{account_path}/campaigns",
+                "params": CampaignManager.create_campaign_params(
+                    name=campaign_name,
+                    objective=template["objective"],
+                    status="PAUSED",  # 最初は停止状態
+                    daily_budget=daily_budget if template.get("is_asc") else None,
+                ),
+            }]
+            
+            parent_ref = "{result=campaign:$.id}"  # ASCの場合はキャンペーンID
+            if not template.get("is_asc"):
+                requests.append({
+                    "name": "adset",
+                    "relative_url": f"{account_path}/adsets",
+                    "params": AdSetManager.create_adset_params(
+                        campaign_id="{result=campaign:$.id}",
+                        name=f"{campaign_name}_adset",
+                        daily_budget=daily_budget,
+                        optimization_goal=defaults.get("optimization_goal", "LINK_CLICKS"),
+                        billing_event=defaults.get("billing_event", "IMPRESSIONS"),
+                        bid_strategy=defaults.get("bid_strategy", "LOWEST_COST_WITHOUT_CAP"),
+                        targeting=_thaw(defaults.get("targeting", _EMPTY)),
+                        status="PAUSED",
+                    ),
+                })
+                parent_ref = "{result=adset:$.id}"
             
+            def ad_requests(adset_id: str, ad_text: dict) -> list[dict]:
+                """画像ハッシュごとの広告作成リクエスト（最大5つ）"""
+                return [
+                    {
+                        "name": f"ad_{i+1}",
+                        "relative_url": f"{account_path}/ads",
+                        "params": AdManager.create_ad_with_creative_params(
+                            adset_id=adset_id,
+                            name=f"{campaign_name}_ad_{i+1}",
+                            page_id=page_id,
+                            image_hash=image_hash,
+                            message=ad_text.get("primary_text", ""),
+                            link_url=link_url,
+                            headline=ad_text.get("headline", ""),
+                            description=ad_text.get("description", ""),
+                            call_to_action=ad_defaults.get("call_to_action", "LEARN_MORE"),
+                            status="PAUSED",
+                        ),
+                    }
+                    for i, image_hash in enumerate((image_hashes or [])[:5])
+                ]
+            
+            # 3. 作成
+            parent_count = len(requests)
+            if text_future is None:
+                # テキストが揃っているので、広告まで1回のバッチで作成
+                requests.extend(ad_requests(parent_ref, ad_texts[0] if ad_texts else {}))
+                results = self._execute_requests(ad_account, requests)
+            else:
+                # テキスト生成中にキャンペーン・広告セットを作成し、生成後に広告を作成
+                results = self._execute_requests(ad_account, requests)
+                if all(results):
+                    ad_texts = text_future.result()
+                    parent_id = results[-1]["id"]
+                    ads = ad_requests(parent_id, ad_texts[0] if ad_texts else {})
+                    if ads:
+                        results.extend(self._execute_requests(ad_account, ads))
+            
+            campaign_result = results[0]
             if not campaign_result:
                 return {"success": False, "error": "キャンペーン作成に失敗"}
-            
             campaign_id = campaign_result["id"]
             
-            # 2. 広告セット作成（ASC以外）
             adset_id = None
             if not template.get("is_asc"):
-                adset_result = adset_manager.create_adset(
-                    campaign_id=campaign_id,
-                    name=f"{campaign_name}_adset",
-                    daily_budget=daily_budget,
-                    optimization_goal=defaults.get("optimization_goal", "LINK_CLICKS"),
-                    billing_event=defaults.get("billing_event", "IMPRESSIONS"),
-                    bid_strategy=defaults.get("bid_strategy", "LOWEST_COST_WITHOUT_CAP"),
-                    targeting=defaults.get("targeting", {}),
-                    status="PAUSED",
-                )
-                
+                adset_result = results[1]
                 if not adset_result:
                     return {
                         "success": False,
                         "error": "広告セット作成に失敗",
                         "campaign_id": campaign_id,
                     }
-                
                 adset_id = adset_result["id"]
             
-            # 3. テキスト生成
-            if custom_texts:
-                ad_texts = custom_texts
-            elif auto_generate_texts:
-                campaign_type = "traffic" if "traffic" in template_id.lower() else "sales"
-                ad_texts = self.text_generator.generate_ad_texts(
-                    product_name=product_name,
-                    campaign_type=campaign_type,
-                    num_variations=1,
-                )
-            else:
-                ad_texts = [{"headline": product_name, "primary_text": "", "description": ""}]
+            created_ads = [result for result in results[parent_count:] if result]
+            logger.info(f"キャンペーンを一括作成しました: {campaign_name}（広告{len(created_ads)}件）")
             
-            # 4. 広告作成
-            created_ads = []
-            ad_text = ad_texts[0] if ad_texts else {}
-            
-            # 画像ハッシュから広告を作成
-            if image_hashes:
-                for i, image_hash in enumerate(image_hashes[:5]):  # 最大5つ
-                    ad_result = ad_manager.create_ad_with_creative(
-                        adset_id=adset_id or campaign_id,  # ASCの場合はキャンペーンID
-                        name=f"{campaign_name}_ad_{i+1}",
-                        page_id=page_id,
-                        image_hash=image_hash,
-                        message=ad_text.get("primary_text", ""),
-                        link_url=link_url,
-                        headline=ad_text.get("headline", ""),
-                        description=ad_text.get("description", ""),
-                        call_to_action=ad_defaults.get("call_to_action", "LEARN_MORE"),
-                        status="PAUSED",
-                    )
-                    if ad_result:
-                        created_ads.append(ad_result)
+            # 広告とともにクリエイティブが増えるため一覧のキャッシュを破棄
+            if created_ads:
+                _invalidate_library_cache(account_id)
             
             return {
                 "success": True,
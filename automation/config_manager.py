@@ -2,15 +2,58 @@
 監視設定管理モジュール
 監視対象アカウント、スケジュール等を管理
 """
+import copy
 import json
 import logging
+import mmap
+import os
+import threading
+from contextlib import contextmanager
 from pathlib import Path
 from typing import Any
 
+try:
+    import orjson
+except ImportError:  # orjson が無い環境では標準の json を使う
+    orjson = None
+
 logger = logging.getLogger(__name__)
 
 CONFIG_FILE = Path(__file__).parent.parent / "storage" / "monitor_config.json"
 
+# 読み込み済みの設定（パス → (更新時刻ns, 設定)）。ファイルが変わっていなければ再読み込みしない
+_CONFIG_CACHE: dict[Path, tuple[int, dict]] = {}
+
+
+def _dumps(data: Any) -> bytes:
+    """設定をUTF-8のバイト列にシリアライズ（手で編集できるようにインデント付き）"""
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2)
+    return json.dumps(data, ensure_ascii=False, indent=2).encode("utf-8")
+
+
+def _loads(raw: bytes) -> Any:
+    """設定をデシリアライズ"""
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+
+# これ以上のサイズの設定ファイルは mmap してバッファを作らずに読む
+_MMAP_THRESHOLD_BYTES = 1024 * 1024
+
+
+def _read_config_file(path: Path) -> Any:
+    """設定ファイルを読み込んでデシリアライズ"""
+    with open(path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        if orjson is None or size < _MMAP_THRESHOLD_BYTES:
+            return _loads(f.read())
+        # orjson はバッファを直接受け取れるため、ファイル全体のコピーを作らない
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            with memoryview(mapped) as view:
+                return orjson.loads(view)
+
 
 class MonitorConfigManager:
     """
@@ -25,14 +68,28 @@ class MonitorConfigManager:
     def __init__(self):
         self.config_file = CONFIG_FILE
         self.config = self._load_config()
+        self._rebuild_account_index()
+        
+        # batched 中は保存を遅らせ、ブロック終了時に1回だけ書き込む
+        self._dirty = False
+        self._batch_depth = 0
+        # 設定の変更と保存を直列化（batched 中に同じスレッドから setter を呼べるよう RLock）
+        self._lock = threading.RLock()
         logger.info("MonitorConfigManager初期化完了")
 
     def _load_config(self) -> dict:
         """設定をファイルから読み込み"""
         if self.config_file.exists():
             try:
-                with open(self.config_file, "r", encoding="utf-8") as f:
-                    return json.load(f)
+                mtime_ns = self.config_file.stat().st_mtime_ns
+                cached = _CONFIG_CACHE.get(self.config_file)
+                if cached and cached[0] == mtime_ns:
+                    # 呼び出し側で変更されるためコピーを返す
+                    return copy.deepcopy(cached[1])
+                
+                config = _read_config_file(self.config_file)
+                _CONFIG_CACHE[self.config_file] = (mtime_ns, copy.deepcopy(config))
+                return config
             except Exception as e:
                 logger.error(f"設定読み込みエラー: {e}")
         
@@ -52,15 +109,67 @@ class MonitorConfigManager:
         }
 
     def _save_config(self):
-        """設定をファイルに保存"""
+        """設定をファイルに保存（batched 中はブロック終了時にまとめて保存）"""
+        self._dirty = True
+        if self._batch_depth:
+            return
+        
         try:
             self.config_file.parent.mkdir(parents=True, exist_ok=True)
-            with open(self.config_file, "w", encoding="utf-8") as f:
-                json.dump(self.config, f, ensure_ascii=False, indent=2)
+            # 一時ファイルに書いてから置き換え、書き込み途中の状態を残さない
+            tmp_file = self.config_file.with_suffix(".tmp")
+            tmp_file.write_bytes(_dumps(self.config))
+            os.replace(tmp_file, self.config_file)
+            self._dirty = False
+            # 保存した内容をキャッシュに反映し、次回の読み込みを省く
+            _CONFIG_CACHE[self.config_file] = (
+                self.config_file.stat().st_mtime_ns,
+                copy.deepcopy(self.config),
+            )
             logger.info("監視設定を保存しました")
         except Exception as e:
             logger.error(f"設定保存エラー: {e}")
 
+    def _rebuild_account_index(self):
+        """
+        アカウント設定を正規化し、アカウントIDから設定を引くためのインデックスを作り直す
+        
+        各アカウントは {"id": str, "name": str, "enabled": bool} の形に揃える
+        （以降の参照では既定値の補完を行わない）。IDの無いものは除外し、
+        IDが重複する場合は後のものを残す。
+        """
+        self._account_index: dict[str, dict] = {}
+        for account in self.config.get("enabled_accounts") or []:
+            account_id = account.get("id") if isinstance(account, dict) else None
+            if not account_id:
+                logger.warning(f"IDの無いアカウント設定を無視します: {account}")
+                continue
+            account_id = str(account_id)
+            account["id"] = account_id
+            account["name"] = str(account.get("name") or account_id)
+            account["enabled"] = bool(account.get("enabled", True))
+            self._account_index[account_id] = account
+        self.config["enabled_accounts"] = list(self._account_index.values())
+
+    @contextmanager
+    def batched(self):
+        """
+        ブロック内の設定変更の保存をブロック終了時の1回にまとめる
+        
+        Example:
+            with config_manager.batched():
+                for account_id in account_ids:
+                    config_manager.toggle_account(account_id, False)
+        """
+        with self._lock:
+            self._batch_depth += 1
+            try:
+                yield self
+            finally:
+                self._batch_depth -= 1
+                if not self._batch_depth and self._dirty:
+                    self._save_config()
+
     # =========================================================================
     # アカウント管理
     # =========================================================================
@@ -81,8 +190,11 @@ class MonitorConfigManager:
         Returns:
             list[str]: ["act_xxx", "act_yyy", ...]
         """
-        accounts = self.get_enabled_accounts()
-        return [a["id"] for a in accounts if a.get("enabled", True)]
+        return [
+            account_id
+            for account_id, account in self._account_index.items()
+            if account["enabled"]
+        ]
 
     def set_enabled_accounts(self, accounts: list[dict]):
         """
@@ -91,45 +203,48 @@ class MonitorConfigManager:
         Args:
             accounts: [{"id": "act_xxx", "name": "アカウント名", "enabled": True}, ...]
         """
-        self.config["enabled_accounts"] = accounts
-        self._save_config()
-        logger.info(f"監視対象アカウントを更新: {len(accounts)}件")
+        with self._lock:
+            self.config["enabled_accounts"] = accounts
+            self._rebuild_account_index()
+            self._save_config()
+            logger.info(f"監視対象アカウントを更新: {len(accounts)}件")
 
     def add_account(self, account_id: str, account_name: str, enabled: bool = True):
         """アカウントを追加"""
-        accounts = self.get_enabled_accounts()
-        
-        # 既存チェック
-        for acc in accounts:
-            if acc["id"] == account_id:
-                acc["name"] = account_name
-                acc["enabled"] = enabled
+        with self._lock:
+            # 既存チェック
+            account = self._account_index.get(account_id)
+            if account is not None:
+                account["name"] = account_name
+                account["enabled"] = enabled
                 self._save_config()
                 return
-        
-        # 新規追加
-        accounts.append({
-            "id": account_id,
-            "name": account_name,
-            "enabled": enabled,
-        })
-        self.config["enabled_accounts"] = accounts
-        self._save_config()
+            
+            # 新規追加
+            account = {
+                "id": account_id,
+                "name": account_name,
+                "enabled": enabled,
+            }
+            self.config["enabled_accounts"].append(account)
+            self._account_index[account_id] = account
+            self._save_config()
 
     def remove_account(self, account_id: str):
         """アカウントを削除"""
-        accounts = self.get_enabled_accounts()
-        self.config["enabled_accounts"] = [a for a in accounts if a["id"] != account_id]
-        self._save_config()
+        with self._lock:
+            if self._account_index.pop(account_id, None) is None:
+                return
+            self.config["enabled_accounts"] = list(self._account_index.values())
+            self._save_config()
 
     def toggle_account(self, account_id: str, enabled: bool):
         """アカウントの有効/無効を切り替え"""
-        accounts = self.get_enabled_accounts()
-        for acc in accounts:
-            if acc["id"] == account_id:
-                acc["enabled"] = enabled
-                break
-        self._save_config()
+        with self._lock:
+            account = self._account_index.get(account_id)
+            if account is not None:
+                account["enabled"] = enabled
+            self._save_config()
 
     # =========================================================================
     # スケジュール設定
@@ -150,17 +265,18 @@ class MonitorConfigManager:
         daily_report_minute: int = None,
     ):
         """スケジュール設定を更新"""
-        schedule = self.get_schedule()
-        
-        if check_interval_minutes is not None:
-            schedule["check_interval_minutes"] = check_interval_minutes
-        if daily_report_hour is not None:
-            schedule["daily_report_hour"] = daily_report_hour
-        if daily_report_minute is not None:
-            schedule["daily_report_minute"] = daily_report_minute
-        
-        self.config["schedule"] = schedule
-        self._save_config()
+        with self._lock:
+            schedule = self.get_schedule()
+            
+            if check_interval_minutes is not None:
+                schedule["check_interval_minutes"] = check_interval_minutes
+            if daily_report_hour is not None:
+                schedule["daily_report_hour"] = daily_report_hour
+            if daily_report_minute is not None:
+                schedule["daily_report_minute"] = daily_report_minute
+            
+            self.config["schedule"] = schedule
+            self._save_config()
 
     # =========================================================================
     # 通知設定
@@ -181,27 +297,32 @@ class MonitorConfigManager:
         alert_severity_threshold: str = None,
     ):
         """通知設定を更新"""
-        notifications = self.get_notifications()
-        
-        if send_hourly_alerts is not None:
-            notifications["send_hourly_alerts"] = send_hourly_alerts
-        if send_daily_report is not None:
-            notifications["send_daily_report"] = send_daily_report
-        if alert_severity_threshold is not None:
-            notifications["alert_severity_threshold"] = alert_severity_threshold
-        
-        self.config["notifications"] = notifications
-        self._save_config()
+        with self._lock:
+            notifications = self.get_notifications()
+            
+            if send_hourly_alerts is not None:
+                notifications["send_hourly_alerts"] = send_hourly_alerts
+            if send_daily_report is not None:
+                notifications["send_daily_report"] = send_daily_report
+            if alert_severity_threshold is not None:
+                notifications["alert_severity_threshold"] = alert_severity_threshold
+            
+            self.config["notifications"] = notifications
+            self._save_config()
 
 
 # シングルトンインスタンス
 _config_manager = None
+_config_manager_lock = threading.Lock()
 
 
 def get_config_manager() -> MonitorConfigManager:
     """MonitorConfigManagerのシングルトンインスタンスを取得"""
     global _config_manager
     if _config_manager is None:
-        _config_manager = MonitorConfigManager()
+        # 初回の同時呼び出しで複数のインスタンスが作られないようにする
+        with _config_manager_lock:
+            if _config_manager is None:
+                _config_manager = MonitorConfigManager()
     return _config_manager
 
@@ -2,15 +2,127 @@
 実行履歴学習モジュール
 何をやったら改善/悪化したかを自動分析し、提案に活かす
 """
+import heapq
 import json
 import logging
+import os
+import re
+import uuid
+from collections import deque
 from datetime import datetime, timedelta
+from itertools import islice
 from pathlib import Path
 from typing import Any, Optional
 
+import numpy as np
+
+try:
+    import orjson
+except ImportError:  # orjson が無い環境では標準の json を使う
+    orjson = None
+
 logger = logging.getLogger(__name__)
 
 
+def _dumps(data: Any, indent: bool = False) -> bytes:
+    """JSONをUTF-8のバイト列にシリアライズ"""
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2 if indent else None)
+    if indent:
+        return json.dumps(data, ensure_ascii=False, indent=2).encode("utf-8")
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def _loads(raw: bytes | str) -> Any:
+    """JSONをデシリアライズ"""
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+
+_JSON_DECODER = json.JSONDecoder()
+
+# JSONの空白以外の文字（文字列をコピーせずに次の要素の位置を探す）
+_JSON_NON_WS = re.compile(r"[^ \t\r\n]")
+
+# 旧形式の学習データを移行するときに一度に書き出す件数
+_MIGRATE_CHUNK_SIZE = 500
+
+
+def _next_token(text: str, pos: int) -> int:
+    """pos 以降で最初の空白以外の文字の位置（無ければ文字列の長さ）"""
+    match = _JSON_NON_WS.search(text, pos)
+    return match.start() if match else len(text)
+
+
+def _iter_json_array(text: str):
+    """JSON配列の要素を1件ずつデコードして返す（デコード済みの配列全体は作らない）"""
+    pos = _next_token(text, 0)
+    if text[pos:pos + 1] != "[":
+        raise json.JSONDecodeError("JSON配列ではありません", text, pos)
+    while True:
+        pos = _next_token(text, pos + 1)
+        if text[pos:pos + 1] == "]":
+            return
+        item, pos = _JSON_DECODER.raw_decode(text, pos)
+        yield item
+        pos = _next_token(text, pos)
+        if text[pos:pos + 1] == "]":
+            return
+        if text[pos:pos + 1] != ",":
+            raise json.JSONDecodeError("配列の区切りが不正です", text, pos)
+
+
+# 効果判定に使う指標
+_EFFECT_METRICS = ("cpa", "roas", "spend", "cpf")
+
+# 学習結果に「実行後」として残す指標（ベースラインと同じ項目）
+_SNAPSHOT_METRICS = ("spend", "cpa", "roas", "ctr", "cpf")
+
+# アクション実行から効果分析までの待ち時間
+_ANALYZE_DELAY = timedelta(hours=24)
+
+# メモリに保持するアクションタイプごとの学習結果の件数（全件はファイルに残る）
+_MAX_LEARNINGS_PER_TYPE = 200
+
+# プロンプトに表示する判定結果のアイコン
+_EFFECT_ICONS = {"improved": "✅", "worsened": "❌", "neutral": "➖"}
+
+_BUDGET_INCREASE_TYPES = ("budget_increase", "budget_change")
+
+# 効果判定ルール（上から順に評価し、最初に当てはまったものを採用）
+# (アクションタイプ, 指標, 比較, 変化率の閾値%, verdict, detail のテンプレート, confidence)
+# 指標が None のルールはアクションタイプだけで判定する。指標のあるルールは
+# 実行前・実行後の両方に値がある場合のみ評価する。
+# detail は b_<指標>（実行前）/ c_<指標>（実行後）/ <指標>（変化率%）で埋める
+_EFFECT_RULES = (
+    # 予算増加: CPA → ROAS → CPF の順に判定
+    (_BUDGET_INCREASE_TYPES, "cpa", "<", -10, "improved", "CPA改善: ¥{b_cpa:,.0f}→¥{c_cpa:,.0f} ({cpa:+.0f}%)", 0.8),
+    (_BUDGET_INCREASE_TYPES, "cpa", ">", 20, "worsened", "CPA悪化: ¥{b_cpa:,.0f}→¥{c_cpa:,.0f} ({cpa:+.0f}%)", 0.8),
+    (_BUDGET_INCREASE_TYPES, "roas", ">", 10, "improved", "ROAS改善: {b_roas:.2f}→{c_roas:.2f} ({roas:+.0f}%)", 0.8),
+    (_BUDGET_INCREASE_TYPES, "roas", "<", -20, "worsened", "ROAS悪化: {b_roas:.2f}→{c_roas:.2f} ({roas:+.0f}%)", 0.8),
+    (_BUDGET_INCREASE_TYPES, "cpf", "<", -10, "improved", "CPF改善: ¥{b_cpf:,.0f}→¥{c_cpf:,.0f} ({cpf:+.0f}%)", 0.8),
+    (_BUDGET_INCREASE_TYPES, "cpf", ">", 20, "worsened", "CPF悪化: ¥{b_cpf:,.0f}→¥{c_cpf:,.0f} ({cpf:+.0f}%)", 0.8),
+    # 予算減少: 効率が維持されていれば成功
+    (("budget_decrease",), "cpa", "<", 10, "improved", "予算削減しつつCPA維持: ¥{b_cpa:,.0f}→¥{c_cpa:,.0f}", 0.7),
+    # 停止: 無駄な消化を止めた
+    (("pause",), None, None, None, "improved", "消化停止: ¥{b_spend:,.0f}/日の消化を停止", 0.9),
+)
+
+# どのルールにも当てはまらない場合
+_NEUTRAL_EFFECT = {"verdict": "neutral", "detail": "明確な効果は確認できず", "confidence": 0.5}
+
+
+def _metric_column(rows: list[dict], metric: str) -> np.ndarray:
+    """各レコードの指標を配列に展開（値が無いものは0）"""
+    return np.array([row.get(metric) or 0 for row in rows], dtype=np.float64)
+
+
+def _pct_change(before: np.ndarray, after: np.ndarray) -> np.ndarray:
+    """変化率（%）。実行前が0以下の場合は0"""
+    return np.divide(after - before, before, out=np.zeros_like(before), where=before > 0) * 100
+
+
 class ActionLearner:
     """
     実行履歴から学習するクラス
@@ -29,25 +141,176 @@ class ActionLearner:
         self.storage_dir = Path(storage_dir)
         self.storage_dir.mkdir(parents=True, exist_ok=True)
         
-        self.learnings_file = self.storage_dir / "action_learnings.json"
-        self.pending_file = self.storage_dir / "pending_analysis.json"
-        
-        self.learnings = self._load_json(self.learnings_file, [])
-        self.pending = self._load_json(self.pending_file, [])
+        # 学習結果は追記のみの JSON Lines（1行1レコード）で保存する
+        self.learnings_file = self.storage_dir / "action_learnings.jsonl"
+        # 分析待ちはアカウントごとのファイルに分け、変更のあったアカウントの分だけ書き直す
+        self.pending_dir = self.storage_dir / "pending"
+        self.pending_dir.mkdir(exist_ok=True)
+        
+        # アクションタイプごとの直近の学習結果と件数（学習結果の追加時に更新し、参照時に全件を走査しない）
+        # 全件はファイルに残し、メモリにはアクションタイプごとに直近の分だけを保持する
+        self._by_action_type: dict[str, deque[dict]] = {}
+        self._stats: dict[str, dict[str, int]] = {}
+        self._recent: deque[dict] = deque(maxlen=5)
+        self._learning_count = 0
+        
+        # 最終行が改行で終わっていない（追記の途中で中断した）場合、次の追記の前に改行を補う
+        self._learnings_needs_newline = False
+        self._migrate_legacy_learnings(self.storage_dir / "action_learnings.json")
+        self._load_learnings()
+        
+        # 分析待ち（ID → レコード）と、分析予定時刻順のヒープ（(予定時刻, ID)）
+        self.pending: dict[str, dict] = {}
+        self._pending_by_account: dict[str, dict[str, dict]] = {}
+        self._migrate_legacy_pending(self.storage_dir / "pending_analysis.json")
+        for pending_file in self.pending_dir.glob("*.json"):
+            for record in self._load_json(pending_file, []):
+                self._add_pending(record)
+        self._pending_heap = [
+            (self._analyze_after_ts(record), record_id)
+            for record_id, record in self.pending.items()
+        ]
+        heapq.heapify(self._pending_heap)
         
         self.agent = integrated_agent
         
-        logger.info(f"ActionLearner初期化: 学習済み{len(self.learnings)}件, 分析待ち{len(self.pending)}件")
+        logger.info(f"ActionLearner初期化: 学習済み{self._learning_count}件, 分析待ち{len(self.pending)}件")
+
+    @property
+    def learnings(self) -> list[dict]:
+        """メモリに保持している学習結果（アクションタイプごとの直近分、分析日時順）"""
+        return sorted(
+            (learning for learnings in self._by_action_type.values() for learning in learnings),
+            key=lambda learning: learning.get("analyzed_at", ""),
+        )
 
     def _load_json(self, path: Path, default: Any) -> Any:
         if path.exists():
-            with open(path, "r", encoding="utf-8") as f:
-                return json.load(f)
+            return _loads(path.read_bytes())
         return default
 
     def _save_json(self, path: Path, data: Any):
-        with open(path, "w", encoding="utf-8") as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
+        # 一時ファイルに書いてから置き換え、書き込み途中の状態を残さない
+        tmp_path = path.with_name(path.name + ".tmp")
+        tmp_path.write_bytes(_dumps(data, indent=True))
+        os.replace(tmp_path, path)
+
+    def _add_pending(self, record: dict):
+        """分析待ちのレコードを登録（ヒープへの追加は呼び出し側で行う）"""
+        self.pending[record["id"]] = record
+        self._pending_by_account.setdefault(record["account_id"], {})[record["id"]] = record
+
+    def _pending_file(self, account_id: str) -> Path:
+        """アカウントの分析待ちファイル"""
+        return self.pending_dir / f"{account_id.replace('/', '_')}.json"
+
+    def _save_pending(self, account_id: str):
+        """アカウントの分析待ちを保存（空になったらファイルを削除）"""
+        records = self._pending_by_account.get(account_id)
+        pending_file = self._pending_file(account_id)
+        if records:
+            self._save_json(pending_file, list(records.values()))
+        else:
+            self._pending_by_account.pop(account_id, None)
+            pending_file.unlink(missing_ok=True)
+
+    def _migrate_legacy_pending(self, legacy_file: Path):
+        """旧形式（全アカウント共通）の分析待ちをアカウントごとのファイルへ移行"""
+        if not legacy_file.exists():
+            return
+        
+        try:
+            records = self._load_json(legacy_file, [])
+            by_account: dict[str, list[dict]] = {}
+            for record in records:
+                by_account.setdefault(record["account_id"], []).append(record)
+            for account_id, account_records in by_account.items():
+                # 移行先に既にあるものは残し、同じIDは旧形式の内容で上書き
+                pending_file = self._pending_file(account_id)
+                merged = {r["id"]: r for r in self._load_json(pending_file, [])}
+                merged.update((r["id"], r) for r in account_records)
+                self._save_json(pending_file, list(merged.values()))
+            legacy_file.rename(legacy_file.with_name(legacy_file.name + ".migrated"))
+            logger.info(f"分析待ちをアカウントごとのファイルに移行しました（{len(records)}件）")
+        except (IOError, KeyError, json.JSONDecodeError) as e:
+            logger.warning(f"分析待ちの移行に失敗しました: {e}")
+
+    @staticmethod
+    def _analyze_after_ts(record: dict) -> float:
+        """分析予定時刻（epoch秒）。数値を持たない旧形式のレコードのみ文字列から変換"""
+        analyze_after_ts = record.get("analyze_after_ts")
+        if analyze_after_ts is None:
+            analyze_after_ts = datetime.fromisoformat(record["analyze_after"]).timestamp()
+        return analyze_after_ts
+
+    def _load_learnings(self):
+        """学習結果を JSON Lines から1行ずつ読み込んで索引に反映（書き込み途中で壊れた行は読み飛ばす）"""
+        if not self.learnings_file.exists():
+            return
+        
+        with open(self.learnings_file, "rb") as f:
+            for line_no, line in enumerate(f, 1):
+                self._learnings_needs_newline = not line.endswith(b"\n")
+                if not line.strip():
+                    continue
+                try:
+                    learning = _loads(line)
+                except json.JSONDecodeError:
+                    logger.warning(f"学習データの{line_no}行目を読み込めないためスキップします")
+                    continue
+                self._index_learning(learning)
+
+    def _append_learnings(self, records: list[dict]):
+        """学習結果を末尾に追記（既存の行は書き換えない）"""
+        if not records:
+            return
+        lines = b"".join(_dumps(r) + b"\n" for r in records)
+        if self._learnings_needs_newline:
+            # 壊れた最終行に続けて書かないよう、新しい行から書き始める
+            lines = b"\n" + lines
+            self._learnings_needs_newline = False
+        with open(self.learnings_file, "ab") as f:
+            f.write(lines)
+
+    def _index_learning(self, learning: dict):
+        """学習結果1件分をアクションタイプ別の一覧・件数と直近の学習結果に反映"""
+        action_type = learning.get("action", {}).get("type")
+        learnings = self._by_action_type.get(action_type)
+        if learnings is None:
+            learnings = self._by_action_type[action_type] = deque(maxlen=_MAX_LEARNINGS_PER_TYPE)
+        learnings.append(learning)
+        self._learning_count += 1
+        stats = self._stats.get(action_type)
+        if stats is None:
+            stats = self._stats[action_type] = {"total": 0, "improved": 0, "worsened": 0}
+        stats["total"] += 1
+        effect = learning.get("effect", "neutral")
+        if effect in ("improved", "worsened"):
+            stats[effect] += 1
+        self._recent.append(learning)
+
+    def _migrate_legacy_learnings(self, legacy_file: Path):
+        """旧形式（JSON配列）の学習データを JSON Lines へ移行"""
+        if not legacy_file.exists():
+            return
+        
+        # 途中で失敗した場合に追記した分を取り消すため、移行前のサイズを控える
+        start_size = self.learnings_file.stat().st_size if self.learnings_file.exists() else 0
+        needs_newline = self._learnings_needs_newline
+        try:
+            # 配列全体をオブジェクトにせず、一定件数ずつデコードして追記する
+            items = _iter_json_array(legacy_file.read_text(encoding="utf-8"))
+            migrated = 0
+            while chunk := list(islice(items, _MIGRATE_CHUNK_SIZE)):
+                self._append_learnings(chunk)
+                migrated += len(chunk)
+            legacy_file.rename(legacy_file.with_name(legacy_file.name + ".migrated"))
+            logger.info(f"学習データを JSON Lines に移行しました（{migrated}件）")
+        except (IOError, json.JSONDecodeError) as e:
+            logger.warning(f"学習データの移行に失敗しました: {e}")
+            if self.learnings_file.exists():
+                os.truncate(self.learnings_file, start_size)
+            self._learnings_needs_newline = needs_newline
 
     def record_action_with_baseline(
         self,
@@ -68,22 +331,28 @@ class ActionLearner:
         Returns:
             str: 学習レコードID
         """
-        import uuid
         record_id = str(uuid.uuid4())[:8]
         
+        executed_at = datetime.now()
+        analyze_after = executed_at + _ANALYZE_DELAY
+        
         record = {
             "id": record_id,
             "action": action,
             "campaign_id": campaign_id,
             "account_id": account_id,
-            "executed_at": datetime.now().isoformat(),
-            "analyze_after": (datetime.now() + timedelta(hours=24)).isoformat(),
+            "executed_at": executed_at.isoformat(),
+            "analyze_after": analyze_after.isoformat(),
+            # 比較用の epoch 秒（ISO形式は表示用）
+            "executed_at_ts": executed_at.timestamp(),
+            "analyze_after_ts": analyze_after.timestamp(),
             "baseline": baseline_metrics,
             "status": "pending_analysis",
         }
         
-        self.pending.append(record)
-        self._save_json(self.pending_file, self.pending)
+        self._add_pending(record)
+        heapq.heappush(self._pending_heap, (record["analyze_after_ts"], record_id))
+        self._save_pending(account_id)
         
         logger.info(f"学習レコード作成: {record_id} (24時間後に効果分析)")
         return record_id
@@ -95,35 +364,91 @@ class ActionLearner:
         Returns:
             list: 分析結果のリスト
         """
+        # 分析予定時刻を過ぎたものが無ければ何もしない（ヒープの先頭が最も早い予定）
+        now_ts = datetime.now().timestamp()
+        if not self._pending_heap or self._pending_heap[0][0] > now_ts:
+            return []
+        
         if not self.agent or not self.agent.meta_initialized:
             logger.warning("Meta API未接続のため分析スキップ")
             return []
         
-        now = datetime.now()
+        # 分析予定時刻を過ぎたものだけをヒープから取り出す（残りは走査しない）
+        due = []
+        while self._pending_heap and self._pending_heap[0][0] <= now_ts:
+            _, record_id = heapq.heappop(self._pending_heap)
+            record = self.pending.pop(record_id, None)
+            if record is not None:
+                self._pending_by_account[record["account_id"]].pop(record_id, None)
+                due.append(record)
+        
+        # 現在のパフォーマンスはアカウントごとに1回でまとめて取得
+        due_by_account: dict[str, list[dict]] = {}
+        for record in due:
+            due_by_account.setdefault(record["account_id"], []).append(record)
+        
+        targets = []
+        for account_id, records in due_by_account.items():
+            current_by_campaign = self._gather_current_metrics(
+                account_id, [record["campaign_id"] for record in records]
+            )
+            for record in records:
+                current = current_by_campaign.get(record["campaign_id"])
+                if current:
+                    targets.append((record, current))
+        
+        # 効果判定は対象の全レコードをまとめて計算
+        effects = self._determine_effects(
+            [record["action"].get("type", "") for record, _ in targets],
+            [record["baseline"] for record, _ in targets],
+            [current for _, current in targets],
+        )
+        
         analyzed = []
-        still_pending = []
+        for (record, current), effect in zip(targets, effects):
+            # 分析実行
+            result = self._analyze_action_effect(record, current, effect)
+            if result:
+                self._index_learning(result)
+                analyzed.append(result)
+                logger.info(f"学習完了: {record['id']} -> {result.get('effect')}")
+        
+        # 保存（学習結果は追記のみ、分析待ちは変化があったときだけ書き直す）
+        self._append_learnings(analyzed)
+        for account_id in due_by_account:
+            self._save_pending(account_id)
         
-        for record in self.pending:
-            analyze_after = datetime.fromisoformat(record["analyze_after"])
+        return analyzed
+
+    def _gather_current_metrics(self, account_id: str, campaign_ids: list[str]) -> dict[str, dict]:
+        """
+        現在のパフォーマンス（過去7日の合計）をアカウント単位でまとめて取得
+        
+        Returns:
+            dict: campaign_id → 指標（取得できなかったキャンペーンは含まない）
+        """
+        try:
+            managers = self.agent._get_managers(account_id)
+            if not managers:
+                return {}
             
-            if now >= analyze_after:
-                # 分析実行
-                result = self._analyze_action_effect(record)
-                if result:
-                    self.learnings.append(result)
-                    analyzed.append(result)
-                    logger.info(f"学習完了: {record['id']} -> {result.get('effect')}")
-            else:
-                still_pending.append(record)
-        
-        # 保存
-        self.pending = still_pending
-        self._save_json(self.pending_file, self.pending)
-        self._save_json(self.learnings_file, self.learnings)
+            insights = managers.insights.get_campaign_insights(
+                date_preset="last_7d",
+                time_increment=0,  # 合計値
+                campaign_ids=list(dict.fromkeys(campaign_ids)),
+            )
+        except Exception as e:
+            logger.error(f"効果分析用のパフォーマンス取得エラー: {e}")
+            return {}
         
-        return analyzed
+        return {row["campaign_id"]: row for row in insights if row.get("campaign_id")}
 
-    def _analyze_action_effect(self, record: dict) -> Optional[dict]:
+    def _analyze_action_effect(
+        self,
+        record: dict,
+        current: dict,
+        effect: dict = None,
+    ) -> Optional[dict]:
         """
         アクションの効果を分析
         
@@ -131,48 +456,37 @@ class ActionLearner:
         - 予算増: 消化が増えてCPA/CPFが維持or改善 → 成功
         - 予算減: 消化が減ってCPA/CPFが悪化しない → 成功
         - 停止: 無駄な消化を止めた → 成功
+        
+        Args:
+            record: 分析待ちの学習レコード
+            current: 現在のパフォーマンス（過去7日）
+            effect: 判定済みの効果（省略時はここで判定）
         """
         try:
-            campaign_id = record["campaign_id"]
-            account_id = record["account_id"]
             baseline = record["baseline"]
             action = record["action"]
-            action_type = action.get("type", "")
-            
-            # 現在のパフォーマンスを取得（過去7日）
-            managers = self.agent._get_managers(account_id)
-            if not managers:
-                return None
-            
-            current = managers["insights"].get_campaign_insights(
-                campaign_id, date_preset="last_7d"
-            )
-            
-            if not current:
-                return None
             
             # 効果判定
-            effect = self._determine_effect(action_type, baseline, current)
+            if effect is None:
+                effect = self._determine_effect(action.get("type", ""), baseline, current)
             
-            return {
+            learning = {
                 "id": record["id"],
                 "action": action,
-                "campaign_id": campaign_id,
-                "account_id": account_id,
+                "campaign_id": record["campaign_id"],
+                "account_id": record["account_id"],
                 "executed_at": record["executed_at"],
+                "executed_on": record["executed_at"][:10],  # プロンプト表示用の日付
                 "analyzed_at": datetime.now().isoformat(),
                 "baseline": baseline,
-                "after": {
-                    "spend": current.get("spend", 0),
-                    "cpa": current.get("cpa", 0),
-                    "roas": current.get("roas", 0),
-                    "ctr": current.get("ctr", 0),
-                    "cpf": current.get("cpf", 0),
-                },
+                "after": {m: current.get(m, 0) for m in _SNAPSHOT_METRICS},
                 "effect": effect["verdict"],
                 "effect_detail": effect["detail"],
                 "confidence": effect["confidence"],
             }
+            # 学習結果は分析後に変わらないため、プロンプト用の本文もここで作っておく
+            learning["prompt_block"] = self._format_prompt_block(learning)
+            return learning
             
         except Exception as e:
             logger.error(f"効果分析エラー: {e}")
@@ -190,98 +504,66 @@ class ActionLearner:
         Returns:
             dict: {verdict: "improved/worsened/neutral", detail: str, confidence: float}
         """
-        baseline_cpa = baseline.get("cpa", 0)
-        baseline_roas = baseline.get("roas", 0)
-        baseline_spend = baseline.get("spend", 0)
-        baseline_cpf = baseline.get("cpf", 0)
-        
-        current_cpa = current.get("cpa", 0)
-        current_roas = current.get("roas", 0)
-        current_spend = current.get("spend", 0)
-        current_cpf = current.get("cpf", 0)
-        
-        # 変化率計算
-        def calc_change(before, after):
-            if before and before > 0:
-                return ((after - before) / before) * 100
-            return 0
-        
-        cpa_change = calc_change(baseline_cpa, current_cpa)
-        roas_change = calc_change(baseline_roas, current_roas)
-        spend_change = calc_change(baseline_spend, current_spend)
-        cpf_change = calc_change(baseline_cpf, current_cpf)
-        
-        # 判定ロジック
-        if action_type in ["budget_increase", "budget_change"]:
-            # 予算増加の場合
-            if current_cpa > 0 and baseline_cpa > 0:
-                # CPA基準
-                if cpa_change < -10:
-                    return {
-                        "verdict": "improved",
-                        "detail": f"CPA改善: ¥{baseline_cpa:,.0f}→¥{current_cpa:,.0f} ({cpa_change:+.0f}%)",
-                        "confidence": 0.8,
-                    }
-                elif cpa_change > 20:
-                    return {
-                        "verdict": "worsened",
-                        "detail": f"CPA悪化: ¥{baseline_cpa:,.0f}→¥{current_cpa:,.0f} ({cpa_change:+.0f}%)",
-                        "confidence": 0.8,
-                    }
-            
-            if current_roas > 0 and baseline_roas > 0:
-                # ROAS基準
-                if roas_change > 10:
-                    return {
-                        "verdict": "improved",
-                        "detail": f"ROAS改善: {baseline_roas:.2f}→{current_roas:.2f} ({roas_change:+.0f}%)",
-                        "confidence": 0.8,
-                    }
-                elif roas_change < -20:
-                    return {
-                        "verdict": "worsened",
-                        "detail": f"ROAS悪化: {baseline_roas:.2f}→{current_roas:.2f} ({roas_change:+.0f}%)",
-                        "confidence": 0.8,
-                    }
-            
-            if current_cpf > 0 and baseline_cpf > 0:
-                # CPF基準（フォロワー獲得）
-                if cpf_change < -10:
-                    return {
-                        "verdict": "improved",
-                        "detail": f"CPF改善: ¥{baseline_cpf:,.0f}→¥{current_cpf:,.0f} ({cpf_change:+.0f}%)",
-                        "confidence": 0.8,
-                    }
-                elif cpf_change > 20:
-                    return {
-                        "verdict": "worsened",
-                        "detail": f"CPF悪化: ¥{baseline_cpf:,.0f}→¥{current_cpf:,.0f} ({cpf_change:+.0f}%)",
-                        "confidence": 0.8,
-                    }
-        
-        elif action_type == "budget_decrease":
-            # 予算減少の場合 → 効率が維持されていれば成功
-            if current_cpa > 0 and baseline_cpa > 0 and cpa_change < 10:
-                return {
-                    "verdict": "improved",
-                    "detail": f"予算削減しつつCPA維持: ¥{baseline_cpa:,.0f}→¥{current_cpa:,.0f}",
-                    "confidence": 0.7,
-                }
-        
-        elif action_type == "pause":
-            # 停止の場合 → 無駄な消化を止めた
-            return {
-                "verdict": "improved",
-                "detail": f"消化停止: ¥{baseline_spend:,.0f}/日の消化を停止",
-                "confidence": 0.9,
-            }
+        return self._determine_effects([action_type], [baseline], [current])[0]
+
+    def _determine_effects(
+        self,
+        action_types: list[str],
+        baselines: list[dict],
+        currents: list[dict],
+    ) -> list[dict]:
+        """
+        複数レコードの効果をまとめて判定
         
-        # デフォルト: 中立
-        return {
-            "verdict": "neutral",
-            "detail": "明確な効果は確認できず",
-            "confidence": 0.5,
-        }
+        変化率と判定条件は NumPy で全レコード分を一度に計算し、
+        detail の文字列は判定結果が決まってから作る。
+        
+        判定ルールは _EFFECT_RULES を参照。
+        
+        Returns:
+            list[dict]: レコードごとの {verdict, detail, confidence}
+        """
+        if not action_types:
+            return []
+        
+        before = {m: _metric_column(baselines, m) for m in _EFFECT_METRICS}
+        after = {m: _metric_column(currents, m) for m in _EFFECT_METRICS}
+        change = {m: _pct_change(before[m], after[m]) for m in _EFFECT_METRICS}
+        
+        # 実行前・実行後の両方に値がある指標
+        has = {m: (before[m] > 0) & (after[m] > 0) for m in _EFFECT_METRICS}
+        
+        types = np.array(action_types, dtype=object)
+        conditions = []
+        for rule_types, metric, op, threshold, *_ in _EFFECT_RULES:
+            condition = np.isin(types, rule_types)
+            if metric is not None:
+                compared = change[metric] < threshold if op == "<" else change[metric] > threshold
+                condition = condition & has[metric] & compared
+            conditions.append(condition)
+        
+        # 最初に当てはまったルールの番号（どれにも当てはまらなければ -1）
+        matched = np.select(conditions, range(len(_EFFECT_RULES)), default=-1)
+        
+        effects = []
+        for i, rule_index in enumerate(matched.tolist()):
+            if rule_index < 0:
+                effects.append(dict(_NEUTRAL_EFFECT))
+                continue
+            
+            *_, verdict, template, confidence = _EFFECT_RULES[rule_index]
+            values = {}
+            for m in _EFFECT_METRICS:
+                values[f"b_{m}"] = before[m][i]
+                values[f"c_{m}"] = after[m][i]
+                values[m] = change[m][i]
+            effects.append({
+                "verdict": verdict,
+                "detail": template.format(**values),
+                "confidence": confidence,
+            })
+        
+        return effects
 
     def get_similar_learnings(
         self,
@@ -300,15 +582,8 @@ class ActionLearner:
         Returns:
             list: 類似の学習結果
         """
-        similar = []
-        
-        for learning in reversed(self.learnings):  # 新しい順
-            if learning.get("action", {}).get("type") == action_type:
-                similar.append(learning)
-                if len(similar) >= limit:
-                    break
-        
-        return similar
+        # 新しい順
+        return list(islice(reversed(self._by_action_type.get(action_type, ())), limit))
 
     def get_success_rate(self, action_type: str) -> dict:
         """
@@ -317,18 +592,10 @@ class ActionLearner:
         Returns:
             dict: {total: int, improved: int, worsened: int, success_rate: float}
         """
-        total = 0
-        improved = 0
-        worsened = 0
-        
-        for learning in self.learnings:
-            if learning.get("action", {}).get("type") == action_type:
-                total += 1
-                effect = learning.get("effect", "neutral")
-                if effect == "improved":
-                    improved += 1
-                elif effect == "worsened":
-                    worsened += 1
+        stats = self._stats.get(action_type)
+        total = stats["total"] if stats else 0
+        improved = stats["improved"] if stats else 0
+        worsened = stats["worsened"] if stats else 0
         
         success_rate = (improved / total * 100) if total > 0 else 0
         
@@ -345,7 +612,7 @@ class ActionLearner:
         学習のサマリーを取得
         """
         return {
-            "total_learnings": len(self.learnings),
+            "total_learnings": self._learning_count,
             "pending_analysis": len(self.pending),
             "by_action_type": {
                 "budget_increase": self.get_success_rate("budget_increase"),
@@ -353,9 +620,29 @@ class ActionLearner:
                 "pause": self.get_success_rate("pause"),
                 "resume": self.get_success_rate("resume"),
             },
-            "recent_learnings": self.learnings[-5:] if self.learnings else [],
+            "recent_learnings": list(self._recent),
         }
 
+    @staticmethod
+    def _format_prompt_block(learning: dict) -> str:
+        """AIプロンプト用の学習結果1件分の本文（見出しの番号以降）"""
+        effect_icon = _EFFECT_ICONS.get(learning.get("effect", "neutral"), "❓")
+        lines = [
+            f"{effect_icon} {learning.get('effect_detail', '')}",
+            f"- 実行日: {learning.get('executed_on') or learning.get('executed_at', '')[:10]}",
+            f"- アクション: {learning.get('action', {}).get('type', '')}",
+        ]
+        
+        baseline = learning.get("baseline", {})
+        after = learning.get("after", {})
+        
+        if baseline.get("cpa") and after.get("cpa"):
+            lines.append(f"- CPA: ¥{baseline['cpa']:,.0f} → ¥{after['cpa']:,.0f}")
+        if baseline.get("roas") and after.get("roas"):
+            lines.append(f"- ROAS: {baseline['roas']:.2f} → {after['roas']:.2f}")
+        
+        return "\n".join(lines)
+
     def format_learning_for_prompt(self, learnings: list[dict]) -> str:
         """
         学習結果をAIプロンプト用にフォーマット
@@ -363,23 +650,9 @@ class ActionLearner:
         if not learnings:
             return "過去の類似アクションの学習データはありません。"
         
-        lines = ["## 過去の類似アクションの結果"]
-        
-        for i, l in enumerate(learnings, 1):
-            effect = l.get("effect", "neutral")
-            effect_icon = {"improved": "✅", "worsened": "❌", "neutral": "➖"}.get(effect, "❓")
-            
-            lines.append(f"\n### {i}. {effect_icon} {l.get('effect_detail', '')}")
-            lines.append(f"- 実行日: {l.get('executed_at', '')[:10]}")
-            lines.append(f"- アクション: {l.get('action', {}).get('type', '')}")
-            
-            baseline = l.get("baseline", {})
-            after = l.get("after", {})
-            
-            if baseline.get("cpa") and after.get("cpa"):
-                lines.append(f"- CPA: ¥{baseline['cpa']:,.0f} → ¥{after['cpa']:,.0f}")
-            if baseline.get("roas") and after.get("roas"):
-                lines.append(f"- ROAS: {baseline['roas']:.2f} → {after['roas']:.2f}")
-        
-        return "\n".join(lines)
+        # 分析時に作成済みの本文を使う（旧形式の学習結果のみここで作る）
+        return "## 過去の類似アクションの結果\n" + "\n".join(
+            f"\n### {i}. {l.get('prompt_block') or self._format_prompt_block(l)}"
+            for i, l in enumerate(learnings, 1)
+        )
 
@@ -3,11 +3,14 @@
 キャンペーン目的別・複合期間比較・統合判定
 """
 import logging
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timedelta, timezone
 from typing import Any
 
 from anthropic import Anthropic
 
+import config
+
 logger = logging.getLogger(__name__)
 
 # 日本時間（JST）
@@ -158,6 +161,33 @@ CAMPAIGN_TYPE_CONFIG = {
     },
 }
 
+# 目的の設定に無い閾値の既定値
+_DEFAULT_THRESHOLDS = {
+    "cpf_good": 50,
+    "cpf_warning": 100,
+    "cpf_critical": 200,
+    "roas_good": 3.0,
+    "roas_warning": 2.0,
+    "roas_critical": 1.0,
+    "cpa_good_ratio": 0.7,
+    "cpa_warning_ratio": 1.0,
+    "cpa_critical_ratio": 1.3,
+}
+
+# 目的ごとの閾値（既定値を埋めた平坦な表。判定のたびに既定値を解決しない）
+_RESOLVED_THRESHOLDS = {
+    objective: {**_DEFAULT_THRESHOLDS, **type_config["thresholds"]}
+    for objective, type_config in CAMPAIGN_TYPE_CONFIG.items()
+}
+
+# 監視で比較する期間（期間名, date_preset, 日平均にする日数）
+_PERIOD_CONFIGS = (
+    ("today", "today", None),
+    ("yesterday", "yesterday", None),
+    ("last_7d", "last_7d", 7),
+    ("last_30d", "last_30d", 30),
+)
+
 
 class PerformanceMonitor:
     """
@@ -177,7 +207,6 @@ class PerformanceMonitor:
         if anthropic_api_key:
             self.claude = Anthropic(api_key=anthropic_api_key)
         else:
-            import config
             self.claude = Anthropic(api_key=config.ANTHROPIC_API_KEY)
         
         # 目標値マネージャーを初期化
@@ -223,15 +252,30 @@ class PerformanceMonitor:
             "summary": None,
         }
         
+        # 各アカウントのチェックはAPI待ちが支配的なためスレッドで並列実行
+        # （同時実行数は META_MAX_CONCURRENT_ACCOUNTS で制限）
+        account_results = {}
+        if account_ids:
+            max_workers = min(config.META_MAX_CONCURRENT_ACCOUNTS, len(account_ids))
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                futures = {
+                    executor.submit(self.check_account, account_id): account_id
+                    for account_id in account_ids
+                }
+                for future in as_completed(futures):
+                    account_id = futures[future]
+                    try:
+                        account_results[account_id] = future.result()
+                    except Exception as e:
+                        logger.error(f"アカウント {account_id} のチェックエラー: {e}")
+                        account_results[account_id] = {"error": str(e)}
+        
+        # 結果は指定されたアカウントの順に並べる
         for account_id in account_ids:
-            try:
-                account_result = self.check_account(account_id)
-                results["accounts"][account_id] = account_result
-                results["alerts"].extend(account_result.get("alerts", []))
-                results["opportunities"].extend(account_result.get("opportunities", []))
-            except Exception as e:
-                logger.error(f"アカウント {account_id} のチェックエラー: {e}")
-                results["accounts"][account_id] = {"error": str(e)}
+            account_result = account_results[account_id]
+            results["accounts"][account_id] = account_result
+            results["alerts"].extend(account_result.get("alerts", []))
+            results["opportunities"].extend(account_result.get("opportunities", []))
         
         results["summary"] = self._generate_summary(results)
         return results
@@ -256,10 +300,17 @@ class PerformanceMonitor:
                 return {"error": "マネージャーの初期化に失敗しました"}
             
             # アクティブキャンペーンを取得
-            campaigns = managers["campaign"].get_campaigns(status_filter=["ACTIVE"])
+            campaigns = managers.campaign.get_campaigns(status_filter=["ACTIVE"])
+            
+            # 複数期間のパフォーマンスは全キャンペーン分を期間ごとに1回で取得
+            periods_by_campaign = self._get_multi_period_performance(
+                [campaign.get("id") for campaign in campaigns], managers
+            )
             
             for campaign in campaigns:
-                campaign_result = self._analyze_campaign(campaign, managers)
+                campaign_result = self._analyze_campaign(
+                    campaign, periods_by_campaign.get(campaign.get("id"), {})
+                )
                 
                 # 消化不足でスキップされたキャンペーンは含めない
                 judgment = campaign_result.get("judgment", {})
@@ -290,10 +341,10 @@ class PerformanceMonitor:
         
         return result
 
-    def _analyze_campaign(self, campaign: dict, managers: dict) -> dict:
+    def _analyze_campaign(self, campaign: dict, periods: dict) -> dict:
         """
         キャンペーンを詳細分析
-        複数期間のデータを取得し、総合判定を行う
+        取得済みの複数期間のデータから総合判定を行う
         """
         campaign_id = campaign.get("id")
         campaign_name = campaign.get("name", "Unknown")
@@ -311,9 +362,6 @@ class PerformanceMonitor:
         else:
             type_config = CAMPAIGN_TYPE_CONFIG.get(objective, CAMPAIGN_TYPE_CONFIG["DEFAULT"])
         
-        # 複数期間のパフォーマンスを取得
-        periods = self._get_multi_period_performance(campaign_id, managers)
-        
         # 予算消化状況を計算
         budget_status = self._calculate_budget_status(periods.get("today", {}), daily_budget)
         
@@ -353,40 +401,56 @@ class PerformanceMonitor:
         
         return result
 
-    def _get_multi_period_performance(self, campaign_id: str, managers: dict) -> dict:
-        """複数期間のパフォーマンスを取得"""
-        periods = {}
-        
-        period_configs = [
-            ("today", "today"),
-            ("yesterday", "yesterday"),
-            ("last_7d", "last_7d"),
-            ("last_30d", "last_30d"),
-        ]
-        
-        for period_name, date_preset in period_configs:
-            try:
-                insights = managers["insights"].get_campaign_insights(
-                    date_preset=date_preset,
-                    campaign_ids=[campaign_id],
-                )
-                if insights:
-                    perf = self.agent._aggregate_insights(insights)
-                    
-                    # 日数で割って日平均を計算（7日/30日の場合）
-                    if period_name == "last_7d":
-                        perf = self._calculate_daily_average(perf, 7)
-                    elif period_name == "last_30d":
-                        perf = self._calculate_daily_average(perf, 30)
-                    
-                    periods[period_name] = perf
-                else:
-                    periods[period_name] = {}
-            except Exception as e:
-                logger.warning(f"期間 {period_name} のデータ取得失敗: {e}")
-                periods[period_name] = {}
-        
-        return periods
+    def _get_multi_period_performance(self, campaign_ids: list[str], managers) -> dict[str, dict]:
+        """
+        複数期間のパフォーマンスをキャンペーンごとに取得
+        
+        各期間は全キャンペーン分を1回で取得し、期間同士は独立しているため並列実行する。
+        
+        Args:
+            campaign_ids: 対象のキャンペーンID
+            managers: アカウントのマネージャー一式（IntegratedAgent._get_managers の戻り値）
+        
+        Returns:
+            dict: campaign_id → {期間名: パフォーマンス}
+        """
+        rows_by_period = {}
+        if campaign_ids:
+            with ThreadPoolExecutor(max_workers=len(_PERIOD_CONFIGS)) as executor:
+                futures = {
+                    executor.submit(
+                        managers.insights.get_campaign_insights,
+                        date_preset=date_preset,
+                        campaign_ids=campaign_ids,
+                    ): period_name
+                    for period_name, date_preset, _ in _PERIOD_CONFIGS
+                }
+                for future in as_completed(futures):
+                    period_name = futures[future]
+                    try:
+                        rows_by_period[period_name] = future.result()
+                    except Exception as e:
+                        logger.warning(f"期間 {period_name} のデータ取得失敗: {e}")
+        
+        # 期間ごとの行をキャンペーン単位にまとめる
+        periods_by_campaign = {campaign_id: {} for campaign_id in campaign_ids}
+        for period_name, _, days in _PERIOD_CONFIGS:
+            rows_by_campaign: dict[str, list[dict]] = {}
+            for row in rows_by_period.get(period_name) or ():
+                rows_by_campaign.setdefault(row.get("campaign_id"), []).append(row)
+            for campaign_id, periods in periods_by_campaign.items():
+                periods[period_name] = self._summarize_period(rows_by_campaign.get(campaign_id), days)
+        
+        return periods_by_campaign
+
+    def _summarize_period(self, insights: list[dict], days: int | None) -> dict:
+        """1期間のInsightsを合計（7日/30日は日数で割って日平均にする）"""
+        if not insights:
+            return {}
+        perf = self.agent._aggregate_insights(insights)
+        if days:
+            perf = self._calculate_daily_average(perf, days)
+        return perf
 
     def _calculate_daily_average(self, perf: dict, days: int) -> dict:
         """日平均を計算"""
@@ -492,7 +556,8 @@ class PerformanceMonitor:
         comparisons = [] # 比較情報
         
         primary_kpi = type_config["primary_kpi"]
-        thresholds = type_config["thresholds"]
+        # 未知の目的は DEFAULT の設定で判定している（_analyze_campaign）
+        thresholds = _RESOLVED_THRESHOLDS.get(objective, _RESOLVED_THRESHOLDS["DEFAULT"])
         
         # =================================================================
         # 目的別のKPI判定
@@ -510,7 +575,7 @@ class PerformanceMonitor:
             follows_today = today.get("follows", 0)
             follows_7d = avg_7d.get("follows", 0)
             
-            target_cpf = targets.get("target_cpf", thresholds.get("cpf_good", 50))
+            target_cpf = targets.get("target_cpf", thresholds["cpf_good"])
             
             # フォロー数を表示
             if follows_today > 0:
@@ -519,12 +584,12 @@ class PerformanceMonitor:
             if cpf_today and cpf_today > 0:
                 if cpf_today <= target_cpf:
                     positives.append(f"CPF良好: ¥{cpf_today:.0f} (目標: ¥{target_cpf})")
-                elif cpf_today > thresholds.get("cpf_critical", 200):
+                elif cpf_today > thresholds["cpf_critical"]:
                     issues.append({
                         "severity": "critical",
                         "message": f"CPF高騰: ¥{cpf_today:.0f} (目標: ¥{target_cpf})",
                     })
-                elif cpf_today > thresholds.get("cpf_warning", 100):
+                elif cpf_today > thresholds["cpf_warning"]:
                     issues.append({
                         "severity": "warning",
                         "message": f"CPF注意: ¥{cpf_today:.0f} (目標: ¥{target_cpf})",
@@ -551,17 +616,17 @@ class PerformanceMonitor:
             # ROAS重視キャンペーン（ASC等）
             roas_today = today.get("roas", 0)
             roas_7d = avg_7d.get("roas", 0)
-            target_roas = targets.get("target_roas", thresholds.get("roas_good", 3.0))
+            target_roas = targets.get("target_roas", thresholds["roas_good"])
             
             if roas_today > 0:
                 if roas_today >= target_roas:
                     positives.append(f"ROAS達成: {roas_today:.2f}x (目標: {target_roas}x)")
-                elif roas_today < thresholds.get("roas_critical", 1.0):
+                elif roas_today < thresholds["roas_critical"]:
                     issues.append({
                         "severity": "critical",
                         "message": f"ROAS赤字: {roas_today:.2f}x (目標: {target_roas}x)",
                     })
-                elif roas_today < thresholds.get("roas_warning", 2.0):
+                elif roas_today < thresholds["roas_warning"]:
                     issues.append({
                         "severity": "warning",
                         "message": f"ROAS低下: {roas_today:.2f}x (目標: {target_roas}x)",
@@ -587,14 +652,14 @@ class PerformanceMonitor:
             
             if target_cpa and cpa_today > 0:
                 cpa_ratio = cpa_today / target_cpa
-                if cpa_ratio <= thresholds.get("cpa_good_ratio", 0.7):
+                if cpa_ratio <= thresholds["cpa_good_ratio"]:
                     positives.append(f"CPA好調: ¥{cpa_today:,.0f} (目標: ¥{target_cpa:,})")
-                elif cpa_ratio >= thresholds.get("cpa_critical_ratio", 1.3):
+                elif cpa_ratio >= thresholds["cpa_critical_ratio"]:
                     issues.append({
                         "severity": "critical",
                         "message": f"CPA超過: ¥{cpa_today:,.0f} (目標: ¥{target_cpa:,}の{cpa_ratio:.0%})",
                     })
-                elif cpa_ratio >= thresholds.get("cpa_warning_ratio", 1.0):
+                elif cpa_ratio >= thresholds["cpa_warning_ratio"]:
                     issues.append({
                         "severity": "warning",
                         "message": f"CPA注意: ¥{cpa_today:,.0f} (目標: ¥{target_cpa:,})",
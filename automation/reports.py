@@ -71,7 +71,7 @@ class ReportGenerator:
                 return {"error": "マネージャー取得失敗"}
 
             # キャンペーン一覧を取得
-            campaigns = managers["campaign"].get_campaigns(status_filter=["ACTIVE", "PAUSED"])
+            campaigns = managers.campaign.get_campaigns(status_filter=["ACTIVE", "PAUSED"])
             
             # パフォーマンスデータを取得
             campaign_data = []
@@ -82,7 +82,7 @@ class ReportGenerator:
             total_impressions = 0
 
             for campaign in campaigns:
-                insights = managers["insight"].get_campaign_insights(
+                insights = managers.insights.get_campaign_insights(
                     campaign_id=campaign["id"],
                     date_preset=date_preset,
                 )
@@ -29,11 +29,58 @@ META_AD_ACCOUNT_IDS = [
 # API バージョン
 META_API_VERSION = os.getenv("META_API_VERSION", "v21.0")
 
+# 非同期Insightsジョブ設定
+META_ASYNC_INSIGHTS = {
+    # 同時に実行するジョブの最大数
+    "max_in_flight": int(os.getenv("META_ASYNC_INSIGHTS_MAX_IN_FLIGHT", "10")),
+    # x-fb-ads-insights-throttle の使用率がこの値を超えたら新規投入を待つ
+    "throttle_limit": 0.7,
+    # ステータス確認の間隔（秒）- 指数バックオフで最大値まで延長
+    "poll_interval_seconds": 2,
+    "max_poll_interval_seconds": 30,
+    # ジョブ全体のタイムアウト（秒）
+    "timeout_seconds": 600,
+    # キャンペーン数がこれ未満なら非同期ジョブを使わず同期で1回取得する
+    "min_campaigns": int(os.getenv("META_ASYNC_INSIGHTS_MIN_CAMPAIGNS", "50")),
+}
+
+# 複数アカウントを並行処理する際の最大同時実行数
+META_MAX_CONCURRENT_ACCOUNTS = int(os.getenv("META_MAX_CONCURRENT_ACCOUNTS", "4"))
+
+# バッチが使えない場合に広告を並列作成する最大スレッド数
+META_MAX_PARALLEL_AD_CREATIONS = int(os.getenv("META_MAX_PARALLEL_AD_CREATIONS", "5"))
+
+# レート制限エラー時のリトライ設定（待機時間は指数バックオフで延長）
+META_RATE_LIMIT_RETRY = {
+    "max_retries": 3,
+    "base_delay_seconds": 2,
+}
+
+# Graph API 取得結果のキャッシュ有効期間（秒）
+META_CACHE_TTL = {
+    # キャンペーン・広告セット一覧
+    "lists": int(os.getenv("META_CACHE_TTL_LISTS", "60")),
+    # 当日を含む期間（today, last_Nd 等）のInsights
+    "insights": int(os.getenv("META_CACHE_TTL_INSIGHTS", "60")),
+    # 確定済みの期間（yesterday 等）のInsights
+    "closed_insights": 24 * 60 * 60,
+}
+
 # =============================================================================
 # Claude API 設定
 # =============================================================================
 ANTHROPIC_API_KEY = os.getenv("ANTHROPIC_API_KEY", "")
 CLAUDE_MODEL = os.getenv("CLAUDE_MODEL", "claude-sonnet-4-20250514")
+# タスクごとのモデル（入札調整は出力が小さいJSON判定のみのため高速・低コストなHaikuを使用）
+CLAUDE_MODELS = {
+    "analysis": os.getenv("CLAUDE_MODEL_ANALYSIS", CLAUDE_MODEL),
+    "bid": os.getenv("CLAUDE_MODEL_BID", "claude-haiku-4-5-20251001"),
+    "creative": os.getenv("CLAUDE_MODEL_CREATIVE", CLAUDE_MODEL),
+}
+# Claude API のリクエスト上限（RPM）
+CLAUDE_REQUESTS_PER_MINUTE = int(os.getenv("CLAUDE_REQUESTS_PER_MINUTE", "50"))
+# 広告セット単位の最適化を並列実行する最大スレッド数
+MAX_PARALLEL_OPTIMIZATIONS = int(os.getenv("MAX_PARALLEL_OPTIMIZATIONS", "4"))
 
 # =============================================================================
 # Slack 設定
@@ -56,6 +103,14 @@ BID_OPTIMIZATION = {
     "min_data_days": 3,
     # 最小コンバージョン数
     "min_conversions": 5,
+    # ルールベースの変更率（%）がこれ未満ならClaudeに問い合わせず現状維持
+    "llm_escalation_threshold": 3,
+    # ルールベース判定を信頼できる最小コンバージョン数（未満はClaudeに問い合わせ）
+    "rule_confidence_conversions": 20,
+    # Message Batches API のポーリング間隔（秒）
+    "batch_poll_interval_seconds": 30,
+    # Message Batches API の待機上限（秒）
+    "batch_timeout_seconds": 3600,
 }
 
 # クリエイティブ自動OFF設定
@@ -70,6 +125,10 @@ CREATIVE_AUTO_OFF = {
     "min_impressions": 1000,
     # 最小クリック数（CVR判定に必要）
     "min_clicks": 50,
+    # 日別判定に必要な最小インプレッション数（CTR）
+    "daily_min_impressions": 100,
+    # 日別判定に必要な最小クリック数（CVR）
+    "daily_min_clicks": 10,
 }
 
 # =============================================================================
@@ -77,7 +136,15 @@ CREATIVE_AUTO_OFF = {
 # =============================================================================
 STORAGE_DIR = BASE_DIR / "storage"
 PERFORMANCE_LOG_FILE = STORAGE_DIR / "performance_log.json"
-OPERATION_LOG_FILE = STORAGE_DIR / "operation_log.json"
+OPERATION_LOG_FILE = STORAGE_DIR / "operation_log.jsonl"
+# 操作ログの保持件数と、整理を行うファイルサイズの閾値（バイト）
+OPERATION_LOG_MAX_ENTRIES = 1000
+OPERATION_LOG_COMPACT_BYTES = 2 * 1024 * 1024
+# Claude分析結果のキャッシュ
+ANALYSIS_CACHE_DIR = STORAGE_DIR / "analysis_cache"
+ANALYSIS_CACHE_TTL_SECONDS = int(os.getenv("ANALYSIS_CACHE_TTL_SECONDS", "3600"))
+# 分析結果キャッシュとして残すファイル数の上限（超えた分は古いものから削除）
+ANALYSIS_CACHE_MAX_ENTRIES = int(os.getenv("ANALYSIS_CACHE_MAX_ENTRIES", "500"))
 
 # =============================================================================
 # ログ設定
@@ -702,7 +702,7 @@ def show_creative_management(agent):
         # キャンペーン作成
         st.markdown("#### 🎯 キャンペーン作成・複製")
         
-        campaigns = managers["campaign"].get_campaigns(status_filter=["ACTIVE", "PAUSED"])
+        campaigns = managers.campaign.get_campaigns(status_filter=["ACTIVE", "PAUSED"])
         
         col1, col2 = st.columns(2)
         
@@ -722,7 +722,7 @@ def show_creative_management(agent):
                 
                 if st.form_submit_button("🚀 作成"):
                     if camp_name:
-                        result = managers["campaign"].create_campaign(
+                        result = managers.campaign.create_campaign(
                             name=camp_name,
                             objective=camp_objective[0],
                             daily_budget=camp_budget,
@@ -741,7 +741,7 @@ def show_creative_management(agent):
                     
                     if st.form_submit_button("📋 複製"):
                         orig = campaign_options[selected_camp]
-                        result = managers["campaign"].duplicate_campaign(
+                        result = managers.campaign.duplicate_campaign(
                             campaign_id=orig["id"],
                             new_name=new_name or None,
                         )
@@ -763,7 +763,7 @@ def show_creative_management(agent):
                 if st.form_submit_button("🚀 作成"):
                     if adset_name:
                         camp = campaign_options[selected_camp]
-                        result = managers["adset"].create_adset(
+                        result = managers.adset.create_adset(
                             campaign_id=camp["id"],
                             name=adset_name,
                             daily_budget=adset_budget,
@@ -1041,7 +1041,7 @@ def show_campaign_analysis(agent):
     if agent.meta_initialized and selected_account:
         managers = agent._get_managers(selected_account)
         if managers:
-            campaigns = managers["campaign"].get_campaigns(status_filter=["ACTIVE", "PAUSED"])
+            campaigns = managers.campaign.get_campaigns(status_filter=["ACTIVE", "PAUSED"])
     
     # キャンペーン選択
     st.subheader("📌 キャンペーン選択")
@@ -1074,7 +1074,7 @@ def show_campaign_analysis(agent):
         
         # パフォーマンスデータを取得
         with st.spinner("パフォーマンスデータを取得中..."):
-            insights = managers["insights"].get_campaign_insights(
+            insights = managers.insights.get_campaign_insights(
                 date_preset=date_preset,
                 campaign_ids=[campaign_id],
             )
@@ -1364,7 +1364,7 @@ def show_simulation(agent):
     if agent.meta_initialized and selected_account:
         managers = agent._get_managers(selected_account)
         if managers:
-            campaigns = managers["campaign"].get_campaigns(status_filter=["ACTIVE"])
+            campaigns = managers.campaign.get_campaigns(status_filter=["ACTIVE"])
     
     tab1, tab2 = st.tabs(["💰 予算変更シミュレーション", "🤔 What-If 分析"])
     
@@ -1386,7 +1386,7 @@ def show_simulation(agent):
             
             # 現在のパフォーマンスを取得
             with st.spinner("現在のパフォーマンスを取得中..."):
-                insights = managers["insights"].get_campaign_insights(
+                insights = managers.insights.get_campaign_insights(
                     date_preset="last_7d",
                     campaign_ids=[selected_campaign.get("id")],
                 )
@@ -1604,7 +1604,7 @@ def show_pattern_learning(agent):
     if agent.meta_initialized and selected_account:
         managers = agent._get_managers(selected_account)
         if managers:
-            campaigns = managers["campaign"].get_campaigns(status_filter=["ACTIVE", "PAUSED"])
+            campaigns = managers.campaign.get_campaigns(status_filter=["ACTIVE", "PAUSED"])
             
             if campaigns:
                 st.write(f"**対象キャンペーン: {len(campaigns)}件**")
@@ -1628,7 +1628,7 @@ def show_pattern_learning(agent):
                         for idx, campaign in enumerate(campaigns):
                             try:
                                 # 日別データを取得
-                                insights = managers["insights"].get_campaign_insights(
+                                insights = managers.insights.get_campaign_insights(
                                     date_preset=f"last_{days}d",
                                     campaign_ids=[campaign.get("id")],
                                 )
@@ -2373,7 +2373,7 @@ def show_automation(agent):
             if agent.meta_initialized and selected_account:
                 managers = agent._get_managers(selected_account)
                 if managers:
-                    campaigns = managers["campaign"].get_campaigns(status_filter=["ACTIVE", "PAUSED"])
+                    campaigns = managers.campaign.get_campaigns(status_filter=["ACTIVE", "PAUSED"])
                     
                     if campaigns:
                         with st.form("manual_action"):
@@ -2887,7 +2887,7 @@ def show_automation(agent):
             if agent.meta_initialized and selected_account:
                 managers = agent._get_managers(selected_account)
                 if managers:
-                    campaigns = managers["campaign"].get_campaigns(status_filter=["ACTIVE", "PAUSED"])
+                    campaigns = managers.campaign.get_campaigns(status_filter=["ACTIVE", "PAUSED"])
                     
                     if campaigns:
                         st.markdown("##### ➕ キャンペーン個別目標を追加")
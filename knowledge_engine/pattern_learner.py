@@ -87,21 +87,45 @@ class PatternLearner:
         Returns:
             bool: 成功したかどうか
         """
-        record = {
+        self.record_performance_batch([{
             "project_id": project_id,
             "project_name": project_name,
             "date": date,
-            "recorded_at": datetime.now().isoformat(),
             "metrics": metrics,
-            "context": context or {},
-            "actions_taken": actions_taken or [],
-        }
+            "context": context,
+            "actions_taken": actions_taken,
+        }])
+        return True
+
+    def record_performance_batch(self, records: list[dict[str, Any]]) -> int:
+        """
+        複数のパフォーマンスをまとめて記録（履歴ファイルの書き込みは1回）
         
-        self.history.append(record)
-        self._save_json(self.history_file, self.history)
+        Args:
+            records: record_performance と同じキー
+                (project_id, project_name, date, metrics, context, actions_taken) を持つ辞書のリスト
         
-        logger.info(f"パフォーマンス記録: {project_name} ({date})")
-        return True
+        Returns:
+            int: 記録件数
+        """
+        if not records:
+            return 0
+        
+        recorded_at = datetime.now().isoformat()
+        for r in records:
+            self.history.append({
+                "project_id": r["project_id"],
+                "project_name": r["project_name"],
+                "date": r["date"],
+                "recorded_at": recorded_at,
+                "metrics": r["metrics"],
+                "context": r.get("context") or {},
+                "actions_taken": r.get("actions_taken") or [],
+            })
+            logger.info(f"パフォーマンス記録: {r['project_name']} ({r['date']})")
+        
+        self._save_json(self.history_file, self.history)
+        return len(records)
 
     def get_project_history(
         self,
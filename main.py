@@ -208,7 +208,8 @@ def cmd_optimize_bids(args):
     print("📈 入札最適化" + (" [ドライラン]" if args.dry_run else ""))
     print("=" * 60)
 
-    results = optimizer.optimize_all_adsets(
+    optimize = optimizer.optimize_all_adsets_batched if args.batch else optimizer.optimize_all_adsets
+    results = optimize(
         target_cpa=args.target_cpa,
         target_roas=args.target_roas,
         dry_run=args.dry_run,
@@ -355,6 +356,7 @@ def main():
     p_bids.add_argument("--target-cpa", type=float, help="目標CPA")
     p_bids.add_argument("--target-roas", type=float, help="目標ROAS")
     p_bids.add_argument("--dry-run", action="store_true", help="ドライラン")
+    p_bids.add_argument("--batch", action="store_true", help="Message Batches APIで一括実行（定期実行向け）")
     p_bids.add_argument("--notify", "-n", action="store_true", help="Slackに通知")
 
     # check-creatives
@@ -6,6 +6,8 @@ from .campaigns import CampaignManager
 from .adsets import AdSetManager
 from .ads import AdManager
 from .insights import InsightsManager
+from .batch import GraphBatch, execute_dependent_batch
+from .async_insights import AsyncInsightsScheduler
 
 __all__ = [
     "MetaAuth",
@@ -13,6 +15,9 @@ __all__ = [
     "AdSetManager",
     "AdManager",
     "InsightsManager",
+    "GraphBatch",
+    "execute_dependent_batch",
+    "AsyncInsightsScheduler",
 ]
 
 
@@ -282,6 +282,65 @@ class AdManager:
             logger.error(f"広告複製エラー: {e}")
             return None
 
+    @staticmethod
+    def create_ad_with_creative_params(
+        adset_id: str,
+        name: str,
+        page_id: str,
+        image_hash: str = None,
+        video_id: str = None,
+        message: str = None,
+        link_url: str = None,
+        headline: str = None,
+        description: str = None,
+        call_to_action: str = "LEARN_MORE",
+        status: str = "PAUSED",
+    ) -> dict[str, Any] | None:
+        """クリエイティブ込みの広告作成パラメータを組み立て（素材が無ければ None）"""
+        # クリエイティブパラメータを構築
+        if image_hash:
+            object_story_spec = {
+                "page_id": page_id,
+                "link_data": {
+                    "image_hash": image_hash,
+                    "link": link_url or "https://example.com",
+                    "message": message or "",
+                    "name": headline or "",
+                    "description": description or "",
+                    "call_to_action": {"type": call_to_action},
+                },
+            }
+        elif video_id:
+            object_story_spec = {
+                "page_id": page_id,
+                "video_data": {
+                    "video_id": video_id,
+                    "message": message or "",
+                    "name": headline or "",
+                    "description": description or "",
+                    "call_to_action": {
+                        "type": call_to_action,
+                        "value": {"link": link_url or "https://example.com"},
+                    },
+                },
+            }
+        else:
+            logger.error("image_hash または video_id が必要です")
+            return None
+        
+        # 広告作成パラメータ
+        params = {
+            "name": name,
+            "adset_id": adset_id,
+            "creative": {
+                "name": f"{name}_creative",
+                "object_story_spec": object_story_spec,
+            },
+            "status": status,
+        }
+        
+        return params
+
     def create_ad_with_creative(
         self,
         adset_id: str,
@@ -316,48 +375,13 @@ class AdManager:
             dict: 作成した広告の情報
         """
         try:
-            # クリエイティブパラメータを構築
-            if image_hash:
-                object_story_spec = {
-                    "page_id": page_id,
-                    "link_data": {
-                        "image_hash": image_hash,
-                        "link": link_url or "https://example.com",
-                        "message": message or "",
-                        "name": headline or "",
-                        "description": description or "",
-                        "call_to_action": {"type": call_to_action},
-                    },
-                }
-            elif video_id:
-                object_story_spec = {
-                    "page_id": page_id,
-                    "video_data": {
-                        "video_id": video_id,
-                        "message": message or "",
-                        "name": headline or "",
-                        "description": description or "",
-                        "call_to_action": {
-                            "type": call_to_action,
-                            "value": {"link": link_url or "https://example.com"},
-                        },
-                    },
-                }
-            else:
-                logger.error("image_hash または video_id が必要です")
+            params = self.create_ad_with_creative_params(
+                adset_id, name, page_id, image_hash, video_id, message,
+                link_url, headline, description, call_to_action, status,
+            )
+            if params is None:
                 return None
             
-            # 広告作成パラメータ
-            params = {
-                "name": name,
-                "adset_id": adset_id,
-                "creative": {
-                    "name": f"{name}_creative",
-                    "object_story_spec": object_story_spec,
-                },
-                "status": status,
-            }
-            
             ad = self.ad_account.create_ad(params=params)
             
             result = {
@@ -7,6 +7,8 @@ from typing import Any
 from facebook_business.adobjects.adaccount import AdAccount
 from facebook_business.adobjects.adset import AdSet
 
+from .batch import GraphBatch
+
 logger = logging.getLogger(__name__)
 
 
@@ -34,68 +36,10 @@ class AdSetManager:
             list[dict]: 広告セット情報のリスト
         """
         try:
-            params = {"limit": limit}
-            filtering = []
-
-            if status_filter:
-                filtering.append({
-                    "field": "effective_status",
-                    "operator": "IN",
-                    "value": status_filter,
-                })
-
-            if campaign_id:
-                filtering.append({
-                    "field": "campaign_id",
-                    "operator": "EQUAL",
-                    "value": campaign_id,
-                })
-
-            if filtering:
-                params["filtering"] = filtering
-
-            adsets = self.ad_account.get_ad_sets(
-                fields=[
-                    "id",
-                    "name",
-                    "campaign_id",
-                    "status",
-                    "effective_status",
-                    "daily_budget",
-                    "lifetime_budget",
-                    "bid_amount",
-                    "bid_strategy",
-                    "billing_event",
-                    "optimization_goal",
-                    "targeting",
-                    "created_time",
-                    "updated_time",
-                    "start_time",
-                    "end_time",
-                ],
-                params=params,
-            )
+            fields, params = self._list_request(campaign_id, status_filter, limit)
+            adsets = self.ad_account.get_ad_sets(fields=fields, params=params)
 
-            result = []
-            for adset in adsets:
-                result.append({
-                    "id": adset.get("id"),
-                    "name": adset.get("name"),
-                    "campaign_id": adset.get("campaign_id"),
-                    "status": adset.get("status"),
-                    "effective_status": adset.get("effective_status"),
-                    "daily_budget": self._format_budget(adset.get("daily_budget")),
-                    "lifetime_budget": self._format_budget(adset.get("lifetime_budget")),
-                    "bid_amount": self._format_budget(adset.get("bid_amount")),
-                    "bid_strategy": adset.get("bid_strategy"),
-                    "billing_event": adset.get("billing_event"),
-                    "optimization_goal": adset.get("optimization_goal"),
-                    "targeting": adset.get("targeting"),
-                    "created_time": adset.get("created_time"),
-                    "updated_time": adset.get("updated_time"),
-                    "start_time": adset.get("start_time"),
-                    "end_time": adset.get("end_time"),
-                })
+            result = [self._format_adset(adset) for adset in adsets]
 
             logger.info(f"{len(result)} 件の広告セットを取得しました")
             return result
@@ -104,6 +48,104 @@ class AdSetManager:
             logger.error(f"広告セットの取得に失敗しました: {e}")
             return []
 
+    def add_adsets_to_batch(
+        self,
+        graph_batch: GraphBatch,
+        key: str,
+        campaign_id: str = None,
+        status_filter: list[str] = None,
+        limit: int = 100,
+    ) -> None:
+        """
+        広告セット一覧の取得をバッチに登録
+
+        Args:
+            graph_batch: 登録先のバッチ
+            key: 結果を格納するキー
+            campaign_id: キャンペーンIDでフィルタ（オプション）
+            status_filter: ステータスでフィルタ
+            limit: 取得件数上限
+        """
+        fields, params = self._list_request(campaign_id, status_filter, limit)
+        graph_batch.add(
+            key,
+            lambda batch, success, failure: self.ad_account.get_ad_sets(
+                fields=fields, params=params, batch=batch, success=success, failure=failure,
+            ),
+            parse=lambda body: [self._format_adset(a) for a in body.get("data", [])],
+            fallback=lambda: self.get_adsets(
+                campaign_id=campaign_id, status_filter=status_filter, limit=limit,
+            ),
+        )
+
+    @staticmethod
+    def _list_request(
+        campaign_id: str = None,
+        status_filter: list[str] = None,
+        limit: int = 100,
+    ) -> tuple[list[str], dict[str, Any]]:
+        """広告セット一覧取得のフィールドとパラメータを組み立て"""
+        params = {"limit": limit}
+        filtering = []
+
+        if status_filter:
+            filtering.append({
+                "field": "effective_status",
+                "operator": "IN",
+                "value": status_filter,
+            })
+
+        if campaign_id:
+            filtering.append({
+                "field": "campaign_id",
+                "operator": "EQUAL",
+                "value": campaign_id,
+            })
+
+        if filtering:
+            params["filtering"] = filtering
+
+        fields = [
+            "id",
+            "name",
+            "campaign_id",
+            "status",
+            "effective_status",
+            "daily_budget",
+            "lifetime_budget",
+            "bid_amount",
+            "bid_strategy",
+            "billing_event",
+            "optimization_goal",
+            "targeting",
+            "created_time",
+            "updated_time",
+            "start_time",
+            "end_time",
+        ]
+        return fields, params
+
+    def _format_adset(self, adset) -> dict[str, Any]:
+        """広告セット一覧の1件を整形"""
+        return {
+            "id": adset.get("id"),
+            "name": adset.get("name"),
+            "campaign_id": adset.get("campaign_id"),
+            "status": adset.get("status"),
+            "effective_status": adset.get("effective_status"),
+            "daily_budget": self._format_budget(adset.get("daily_budget")),
+            "lifetime_budget": self._format_budget(adset.get("lifetime_budget")),
+            "bid_amount": self._format_budget(adset.get("bid_amount")),
+            "bid_strategy": adset.get("bid_strategy"),
+            "billing_event": adset.get("billing_event"),
+            "optimization_goal": adset.get("optimization_goal"),
+            "targeting": adset.get("targeting"),
+            "created_time": adset.get("created_time"),
+            "updated_time": adset.get("updated_time"),
+            "start_time": adset.get("start_time"),
+            "end_time": adset.get("end_time"),
+        }
+
     def get_adset(self, adset_id: str) -> dict[str, Any] | None:
         """
         特定の広告セットを取得
@@ -242,6 +284,60 @@ class AdSetManager:
     # 広告セットの作成
     # =========================================================================
 
+    @staticmethod
+    def create_adset_params(
+        campaign_id: str,
+        name: str,
+        daily_budget: int = None,
+        lifetime_budget: int = None,
+        optimization_goal: str = "LINK_CLICKS",
+        billing_event: str = "IMPRESSIONS",
+        bid_strategy: str = "LOWEST_COST_WITHOUT_CAP",
+        targeting: dict = None,
+        status: str = "PAUSED",
+        start_time: str = None,
+        end_time: str = None,
+    ) -> dict[str, Any]:
+        """広告セット作成のパラメータを組み立て"""
+        params = {
+            "campaign_id": campaign_id,
+            "name": name,
+            "optimization_goal": optimization_goal,
+            "billing_event": billing_event,
+            "bid_strategy": bid_strategy,
+            "status": status,
+        }
+        
+        # 予算設定
+        if daily_budget:
+            params["daily_budget"] = daily_budget * 100  # 円→セント変換
+        elif lifetime_budget:
+            params["lifetime_budget"] = lifetime_budget * 100
+        else:
+            # デフォルトで日予算1000円
+            params["daily_budget"] = 100000
+        
+        # ターゲティング設定
+        if targeting:
+            params["targeting"] = targeting
+        else:
+            # デフォルトターゲティング（日本、18-65歳）
+            params["targeting"] = {
+                "geo_locations": {
+                    "countries": ["JP"],
+                },
+                "age_min": 18,
+                "age_max": 65,
+            }
+        
+        # 日時設定
+        if start_time:
+            params["start_time"] = start_time
+        if end_time:
+            params["end_time"] = end_time
+        
+        return params
+
     def create_adset(
         self,
         campaign_id: str,
@@ -284,43 +380,10 @@ class AdSetManager:
             dict: 作成した広告セットの情報
         """
         try:
-            params = {
-                "campaign_id": campaign_id,
-                "name": name,
-                "optimization_goal": optimization_goal,
-                "billing_event": billing_event,
-                "bid_strategy": bid_strategy,
-                "status": status,
-            }
-            
-            # 予算設定
-            if daily_budget:
-                params["daily_budget"] = daily_budget * 100  # 円→セント変換
-            elif lifetime_budget:
-                params["lifetime_budget"] = lifetime_budget * 100
-            else:
-                # デフォルトで日予算1000円
-                params["daily_budget"] = 100000
-            
-            # ターゲティング設定
-            if targeting:
-                params["targeting"] = targeting
-            else:
-                # デフォルトターゲティング（日本、18-65歳）
-                params["targeting"] = {
-                    "geo_locations": {
-                        "countries": ["JP"],
-                    },
-                    "age_min": 18,
-                    "age_max": 65,
-                }
-            
-            # 日時設定
-            if start_time:
-                params["start_time"] = start_time
-            if end_time:
-                params["end_time"] = end_time
-            
+            params = self.create_adset_params(
+                campaign_id, name, daily_budget, lifetime_budget, optimization_goal,
+                billing_event, bid_strategy, targeting, status, start_time, end_time,
+            )
             adset = self.ad_account.create_ad_set(params=params)
             
             result = {
@@ -0,0 +1,148 @@
+"""
+非同期Insightsジョブ管理モジュール
+"""
+import json
+import logging
+import time
+from collections import deque
+from typing import Any, Callable
+
+from facebook_business.adobjects.adreportrun import AdReportRun
+from facebook_business.api import FacebookAdsApi
+
+import config
+
+logger = logging.getLogger(__name__)
+
+THROTTLE_HEADER = "x-fb-ads-insights-throttle"
+
+
+class AsyncInsightsScheduler:
+    """
+    非同期Insightsジョブ（AdReportRun）をまとめて実行するクラス
+
+    InsightsManager.add_insights_to_scheduler でジョブを登録し、run() で
+    x-fb-ads-insights-throttle の使用率を見ながら同時実行数を制御して投入・完了待ちを行う。
+    投入や実行に失敗したジョブ、タイムアウトしたジョブは通常の（同期）取得で取り直す。
+    """
+
+    def __init__(self, api: FacebookAdsApi = None):
+        self.api = api or FacebookAdsApi.get_default_api()
+        self.config = config.META_ASYNC_INSIGHTS
+        self.results: dict[str, list[dict[str, Any]]] = {}
+        self._pending: deque = deque()
+        self._throttle = 0.0
+
+    def add(
+        self,
+        key: str,
+        submit: Callable[[], AdReportRun],
+        parse: Callable[[Any], dict[str, Any]],
+        fallback: Callable[[], list[dict[str, Any]]],
+    ) -> None:
+        """
+        ジョブを登録
+
+        Args:
+            key: 結果を格納するキー
+            submit: 非同期ジョブを投入して AdReportRun を返す関数
+            parse: Insightsの1行を整形する関数
+            fallback: 通常の取得メソッドで結果を取得する関数
+        """
+        self._pending.append({"key": key, "submit": submit, "parse": parse, "fallback": fallback})
+
+    def run(self) -> dict[str, list[dict[str, Any]]]:
+        """
+        登録したジョブを実行して結果を取得
+
+        Returns:
+            dict: キーごとの整形済みInsightsデータ
+        """
+        in_flight: deque = deque()
+        interval = self.config["poll_interval_seconds"]
+        deadline = time.monotonic() + self.config["timeout_seconds"]
+
+        while self._pending or in_flight:
+            # 使用率が閾値未満の間だけ新しいジョブを投入
+            while (
+                self._pending
+                and len(in_flight) < self.config["max_in_flight"]
+                and self._throttle < self.config["throttle_limit"]
+            ):
+                job = self._pending.popleft()
+                try:
+                    report_run = job["submit"]()
+                    job["report_run_id"] = report_run[AdReportRun.Field.id]
+                    in_flight.append(job)
+                except Exception as e:
+                    logger.warning(f"非同期Insightsジョブの投入に失敗しました（{job['key']}）: {e}")
+                    self.results[job["key"]] = job["fallback"]()
+
+            if time.monotonic() >= deadline:
+                logger.error("非同期Insightsジョブがタイムアウトしました")
+                for job in [*in_flight, *self._pending]:
+                    self.results[job["key"]] = job["fallback"]()
+                in_flight.clear()
+                self._pending.clear()
+                break
+
+            time.sleep(interval)
+            interval = min(interval * 2, self.config["max_poll_interval_seconds"])
+
+            if not in_flight:
+                # 実行中のジョブがなければ使用率を確認できないため、待機後に投入を再開する
+                self._throttle = 0.0
+                continue
+
+            for _ in range(len(in_flight)):
+                job = in_flight.popleft()
+                status = self._poll(job)
+                if status == "Job Completed":
+                    self.results[job["key"]] = self._collect(job)
+                elif status in ("Job Failed", "Job Skipped"):
+                    logger.warning(f"非同期Insightsジョブが終了しました（{job['key']}）: {status}")
+                    self.results[job["key"]] = job["fallback"]()
+                else:
+                    in_flight.append(job)
+
+        return self.results
+
+    def _poll(self, job: dict[str, Any]) -> str | None:
+        """ジョブのステータスを取得し、スロットル使用率を更新"""
+        try:
+            response = self.api.call(
+                "GET",
+                (job["report_run_id"],),
+                params={"fields": ",".join([
+                    AdReportRun.Field.async_status,
+                    AdReportRun.Field.async_percent_completion,
+                ])},
+            )
+            self._update_throttle(response.headers())
+            return response.json().get(AdReportRun.Field.async_status)
+        except Exception as e:
+            logger.warning(f"非同期Insightsジョブの確認に失敗しました（{job['key']}）: {e}")
+            return "Job Failed"
+
+    def _collect(self, job: dict[str, Any]) -> list[dict[str, Any]]:
+        """完了したジョブの結果をページングしながら取得"""
+        try:
+            report_run = AdReportRun(job["report_run_id"], api=self.api)
+            return [job["parse"](row) for row in report_run.get_insights()]
+        except Exception as e:
+            logger.warning(f"非同期Insightsジョブの結果取得に失敗しました（{job['key']}）: {e}")
+            return job["fallback"]()
+
+    def _update_throttle(self, headers) -> None:
+        """x-fb-ads-insights-throttle ヘッダーからアプリ/アカウントの使用率を更新"""
+        raw = headers.get(THROTTLE_HEADER) if headers else None
+        if not raw:
+            return
+        try:
+            usage = json.loads(raw)
+            self._throttle = max(
+                float(usage.get("app_id_util_pct", 0)),
+                float(usage.get("acc_id_util_pct", 0)),
+            ) / 100
+        except (ValueError, TypeError, AttributeError):
+            logger.debug(f"スロットルヘッダーを解析できませんでした: {raw}")
@@ -0,0 +1,131 @@
+"""
+Graph API バッチリクエストモジュール
+"""
+import json
+import logging
+from typing import Any, Callable
+from urllib.parse import urlencode
+
+from facebook_business.api import FacebookAdsApi, FacebookAdsApiBatch
+
+logger = logging.getLogger(__name__)
+
+
+class GraphBatch:
+    """
+    複数のGraph API呼び出しを1回のHTTPSリクエストにまとめて実行するクラス
+
+    各マネージャーの add_*_to_batch で呼び出しを登録し、execute() 後に
+    results からキーごとの整形済み結果を取り出す。
+    続きのページがあるレスポンスや失敗した呼び出しは、通常の（非バッチ）
+    取得メソッドで取り直す。
+    """
+
+    def __init__(self, api: FacebookAdsApi = None, max_retries: int = 2):
+        self.api = api or FacebookAdsApi.get_default_api()
+        self.max_retries = max_retries
+        self.results: dict[str, Any] = {}
+        self._batch: FacebookAdsApiBatch = self.api.new_batch()
+        self._fallbacks: dict[str, Callable[[], Any]] = {}
+
+    def add(
+        self,
+        key: str,
+        add_request: Callable[[FacebookAdsApiBatch, Callable, Callable], Any],
+        parse: Callable[[dict[str, Any]], Any],
+        fallback: Callable[[], Any],
+    ) -> None:
+        """
+        バッチに呼び出しを登録
+
+        Args:
+            key: 結果を格納するキー
+            add_request: (batch, success, failure) を受け取り、SDKの取得メソッドを
+                batch 付きで呼び出す関数
+            parse: レスポンスJSONを整形済み結果に変換する関数
+            fallback: 通常の取得メソッドで結果を取得する関数
+        """
+        def on_success(response):
+            body = response.json()
+            if body.get("paging", {}).get("next"):
+                # 1ページに収まらない場合は通常の取得でページングする
+                self.results[key] = fallback()
+            else:
+                self.results[key] = parse(body)
+
+        def on_failure(response):
+            logger.warning(f"バッチ内の呼び出しに失敗しました（{key}）: {response.error()}")
+            self.results[key] = fallback()
+
+        self._fallbacks[key] = fallback
+        add_request(self._batch, on_success, on_failure)
+
+    def execute(self) -> dict[str, Any]:
+        """
+        登録した呼び出しを実行
+
+        Returns:
+            dict: キーごとの整形済み結果
+        """
+        batch = self._batch
+        for _ in range(self.max_retries + 1):
+            if batch is None or len(batch) == 0:
+                break
+            try:
+                # 応答のなかった呼び出しのみを含むバッチが返る（すべて完了なら None）
+                batch = batch.execute()
+            except Exception as e:
+                logger.error(f"バッチリクエストに失敗しました: {e}")
+                break
+
+        for key, fallback in self._fallbacks.items():
+            if key not in self.results:
+                self.results[key] = fallback()
+
+        return self.results
+
+
+def execute_dependent_batch(
+    requests: list[dict[str, Any]],
+    api: FacebookAdsApi = None,
+) -> list[dict[str, Any] | None]:
+    """
+    依存関係のある作成リクエストを1回のバッチで実行
+
+    後続のリクエストは "{result=<name>:$.id}" で先に実行したリクエストの結果を参照できる。
+    Graph APIのバッチはトランザクションではないため、途中で失敗してもそれまでの作成結果は残る。
+
+    Args:
+        requests: [{"name": "campaign", "relative_url": "act_xxx/campaigns", "params": {...}}, ...]
+        api: 使用するAPIインスタンス（省略時はデフォルト）
+
+    Returns:
+        list: リクエストごとのレスポンスJSON（失敗したものは None）
+    """
+    api = api or FacebookAdsApi.get_default_api()
+    batch = [
+        {
+            "method": "POST",
+            "name": request["name"],
+            "relative_url": request["relative_url"],
+            # "{result=...}" の参照はエンコードせずにそのまま渡す
+            "body": urlencode({
+                key: value if isinstance(value, str) else json.dumps(value, ensure_ascii=False)
+                for key, value in request["params"].items()
+            }, safe="{}=:$"),
+            # 参照されるリクエストのレスポンスも受け取る（作成したIDを返すため）
+            "omit_response_on_success": False,
+        }
+        for request in requests
+    ]
+
+    response = api.call("POST", (), params={"batch": json.dumps(batch, ensure_ascii=False)})
+
+    results = []
+    for request, item in zip(requests, response.json()):
+        if item and item.get("code") == 200:
+            results.append(json.loads(item["body"]))
+        else:
+            logger.warning(f"バッチ内の作成に失敗しました（{request['name']}）: {item and item.get('body')}")
+            results.append(None)
+    return results
@@ -7,6 +7,8 @@ from typing import Any
 from facebook_business.adobjects.adaccount import AdAccount
 from facebook_business.adobjects.campaign import Campaign
 
+from .batch import GraphBatch
+
 logger = logging.getLogger(__name__)
 
 
@@ -32,51 +34,10 @@ class CampaignManager:
             list[dict]: キャンペーン情報のリスト
         """
         try:
-            params = {"limit": limit}
-            
-            if status_filter:
-                params["filtering"] = [
-                    {"field": "effective_status", "operator": "IN", "value": status_filter}
-                ]
-
-            campaigns = self.ad_account.get_campaigns(
-                fields=[
-                    "id",
-                    "name",
-                    "status",
-                    "effective_status",
-                    "objective",
-                    "daily_budget",
-                    "lifetime_budget",
-                    "budget_remaining",
-                    "created_time",
-                    "updated_time",
-                    "start_time",
-                    "stop_time",
-                    "smart_promotion_type",  # ASC判定用
-                    "special_ad_categories",
-                ],
-                params=params,
-            )
+            fields, params = self._list_request(status_filter, limit)
+            campaigns = self.ad_account.get_campaigns(fields=fields, params=params)
 
-            result = []
-            for campaign in campaigns:
-                result.append({
-                    "id": campaign.get("id"),
-                    "name": campaign.get("name"),
-                    "status": campaign.get("status"),
-                    "effective_status": campaign.get("effective_status"),
-                    "objective": campaign.get("objective"),
-                    "daily_budget": self._format_budget(campaign.get("daily_budget")),
-                    "lifetime_budget": self._format_budget(campaign.get("lifetime_budget")),
-                    "budget_remaining": self._format_budget(campaign.get("budget_remaining")),
-                    "created_time": campaign.get("created_time"),
-                    "updated_time": campaign.get("updated_time"),
-                    "start_time": campaign.get("start_time"),
-                    "stop_time": campaign.get("stop_time"),
-                    "smart_promotion_type": campaign.get("smart_promotion_type"),  # ASC判定
-                    "is_asc": campaign.get("smart_promotion_type") == "ADVANTAGE_PLUS_SHOPPING",
-                })
+            result = [self._format_campaign(campaign) for campaign in campaigns]
 
             logger.info(f"{len(result)} 件のキャンペーンを取得しました")
             return result
@@ -85,6 +46,82 @@ class CampaignManager:
             logger.error(f"キャンペーンの取得に失敗しました: {e}")
             return []
 
+    def add_campaigns_to_batch(
+        self,
+        graph_batch: GraphBatch,
+        key: str,
+        status_filter: list[str] = None,
+        limit: int = 100,
+    ) -> None:
+        """
+        キャンペーン一覧の取得をバッチに登録
+
+        Args:
+            graph_batch: 登録先のバッチ
+            key: 結果を格納するキー
+            status_filter: ステータスでフィルタ
+            limit: 取得件数上限
+        """
+        fields, params = self._list_request(status_filter, limit)
+        graph_batch.add(
+            key,
+            lambda batch, success, failure: self.ad_account.get_campaigns(
+                fields=fields, params=params, batch=batch, success=success, failure=failure,
+            ),
+            parse=lambda body: [self._format_campaign(c) for c in body.get("data", [])],
+            fallback=lambda: self.get_campaigns(status_filter=status_filter, limit=limit),
+        )
+
+    @staticmethod
+    def _list_request(
+        status_filter: list[str] = None,
+        limit: int = 100,
+    ) -> tuple[list[str], dict[str, Any]]:
+        """キャンペーン一覧取得のフィールドとパラメータを組み立て"""
+        params = {"limit": limit}
+
+        if status_filter:
+            params["filtering"] = [
+                {"field": "effective_status", "operator": "IN", "value": status_filter}
+            ]
+
+        fields = [
+            "id",
+            "name",
+            "status",
+            "effective_status",
+            "objective",
+            "daily_budget",
+            "lifetime_budget",
+            "budget_remaining",
+            "created_time",
+            "updated_time",
+            "start_time",
+            "stop_time",
+            "smart_promotion_type",  # ASC判定用
+            "special_ad_categories",
+        ]
+        return fields, params
+
+    def _format_campaign(self, campaign) -> dict[str, Any]:
+        """キャンペーン一覧の1件を整形"""
+        return {
+            "id": campaign.get("id"),
+            "name": campaign.get("name"),
+            "status": campaign.get("status"),
+            "effective_status": campaign.get("effective_status"),
+            "objective": campaign.get("objective"),
+            "daily_budget": self._format_budget(campaign.get("daily_budget")),
+            "lifetime_budget": self._format_budget(campaign.get("lifetime_budget")),
+            "budget_remaining": self._format_budget(campaign.get("budget_remaining")),
+            "created_time": campaign.get("created_time"),
+            "updated_time": campaign.get("updated_time"),
+            "start_time": campaign.get("start_time"),
+            "stop_time": campaign.get("stop_time"),
+            "smart_promotion_type": campaign.get("smart_promotion_type"),  # ASC判定
+            "is_asc": campaign.get("smart_promotion_type") == "ADVANTAGE_PLUS_SHOPPING",
+        }
+
     def get_campaign(self, campaign_id: str) -> dict[str, Any] | None:
         """
         特定のキャンペーンを取得
@@ -197,6 +234,38 @@ class CampaignManager:
     # キャンペーンの作成・複製
     # =========================================================================
 
+    @staticmethod
+    def create_campaign_params(
+        name: str,
+        objective: str = "OUTCOME_TRAFFIC",
+        status: str = "PAUSED",
+        daily_budget: int = None,
+        lifetime_budget: int = None,
+        special_ad_categories: list = None,
+    ) -> dict[str, Any]:
+        """キャンペーン作成のパラメータを組み立て"""
+        params = {
+            "name": name,
+            "objective": objective,
+            "status": status,
+        }
+        
+        # 特別広告カテゴリ
+        if special_ad_categories:
+            params["special_ad_categories"] = special_ad_categories
+        else:
+            params["special_ad_categories"] = []  # 必須フィールド
+        
+        # CBO（キャンペーン予算最適化）を使用する場合
+        if daily_budget or lifetime_budget:
+            params["campaign_budget_optimization"] = True
+            if daily_budget:
+                params["daily_budget"] = daily_budget * 100
+            elif lifetime_budget:
+                params["lifetime_budget"] = lifetime_budget * 100
+        
+        return params
+
     def create_campaign(
         self,
         name: str,
@@ -227,26 +296,9 @@ class CampaignManager:
             dict: 作成したキャンペーンの情報
         """
         try:
-            params = {
-                "name": name,
-                "objective": objective,
-                "status": status,
-            }
-            
-            # 特別広告カテゴリ
-            if special_ad_categories:
-                params["special_ad_categories"] = special_ad_categories
-            else:
-                params["special_ad_categories"] = []  # 必須フィールド
-            
-            # CBO（キャンペーン予算最適化）を使用する場合
-            if daily_budget or lifetime_budget:
-                params["campaign_budget_optimization"] = True
-                if daily_budget:
-                    params["daily_budget"] = daily_budget * 100
-                elif lifetime_budget:
-                    params["lifetime_budget"] = lifetime_budget * 100
-            
+            params = self.create_campaign_params(
+                name, objective, status, daily_budget, lifetime_budget, special_ad_categories,
+            )
             campaign = self.ad_account.create_campaign(params=params)
             
             result = {
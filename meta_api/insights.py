@@ -3,13 +3,56 @@
 """
 import logging
 from datetime import datetime, timedelta
-from typing import Any
+from typing import Any, Callable, Iterable, Iterator
 
 from facebook_business.adobjects.adaccount import AdAccount
 from facebook_business.adobjects.adsinsights import AdsInsights
 
+from .async_insights import AsyncInsightsScheduler
+from .batch import GraphBatch
+
 logger = logging.getLogger(__name__)
 
+# _parse_insight が使用するフィールド
+INSIGHT_FIELDS = (
+    "date_start",
+    "date_stop",
+    "impressions",
+    "clicks",
+    "spend",
+    "reach",
+    "frequency",
+    "cpm",
+    "cpc",
+    "ctr",
+    "actions",
+    "action_values",
+    "cost_per_action_type",
+)
+
+# 合計値の集計（_aggregate_insights）にのみ使う場合のフィールド
+SUM_INSIGHT_FIELDS = (
+    "date_start",
+    "date_stop",
+    "impressions",
+    "clicks",
+    "spend",
+    "reach",
+    "actions",
+    "action_values",
+)
+
+# レベルに応じて追加するフィールド
+_LEVEL_FIELDS = {
+    "campaign": ("campaign_id", "campaign_name"),
+    "adset": ("campaign_id", "campaign_name", "adset_id", "adset_name"),
+    "ad": (
+        "campaign_id", "campaign_name",
+        "adset_id", "adset_name",
+        "ad_id", "ad_name",
+    ),
+}
+
 
 class InsightsManager:
     """パフォーマンスデータの取得を行うクラス"""
@@ -172,68 +215,9 @@ class InsightsManager:
             list[dict]: パフォーマンスデータ
         """
         try:
-            # 取得するフィールド
-            fields = [
-                "date_start",
-                "date_stop",
-                "impressions",
-                "clicks",
-                "spend",
-                "reach",
-                "frequency",
-                "cpm",
-                "cpc",
-                "ctr",
-                "actions",
-                "action_values",
-                "conversions",
-                "cost_per_action_type",
-                "cost_per_conversion",
-            ]
-
-            # レベルに応じたフィールドを追加
-            if level == "campaign":
-                fields.extend(["campaign_id", "campaign_name"])
-            elif level == "adset":
-                fields.extend(["campaign_id", "campaign_name", "adset_id", "adset_name"])
-            elif level == "ad":
-                fields.extend([
-                    "campaign_id", "campaign_name",
-                    "adset_id", "adset_name",
-                    "ad_id", "ad_name",
-                ])
-
-            # パラメータ設定
-            params = {
-                "level": level,
-                "time_increment": time_increment,
-            }
-
-            if date_preset:
-                params["date_preset"] = date_preset
-            elif start_date and end_date:
-                params["time_range"] = {
-                    "since": start_date,
-                    "until": end_date,
-                }
-            else:
-                # デフォルトは過去7日
-                params["date_preset"] = "last_7d"
-
-            if filtering:
-                params["filtering"] = filtering
-
-            # API呼び出し
-            insights = self.ad_account.get_insights(
-                fields=fields,
-                params=params,
-            )
-
-            # 結果を整形
-            result = []
-            for insight in insights:
-                data = self._parse_insight(insight)
-                result.append(data)
+            result = list(self._iter_insights(
+                level, date_preset, start_date, end_date, time_increment, filtering,
+            ))
 
             logger.info(f"{level}レベルで {len(result)} 件のデータを取得しました")
             return result
@@ -242,6 +226,206 @@ class InsightsManager:
             logger.error(f"Insightsの取得に失敗しました: {e}")
             return []
 
+    def iter_account_insights(
+        self,
+        date_preset: str = "last_7d",
+        time_increment: int = 1,
+    ) -> Iterator[dict[str, Any]]:
+        """
+        アカウントレベルのパフォーマンスデータを1行ずつ取得
+
+        Args:
+            date_preset: 期間プリセット
+            time_increment: 日ごとに分割するか
+
+        Yields:
+            dict: パフォーマンスデータ
+        """
+        return self.iter_insights(
+            level="account",
+            date_preset=date_preset,
+            time_increment=time_increment,
+        )
+
+    def iter_insights(
+        self,
+        level: str,
+        date_preset: str = None,
+        start_date: str = None,
+        end_date: str = None,
+        time_increment: int = 1,
+        filtering: list = None,
+        fields: Iterable[str] = INSIGHT_FIELDS,
+    ) -> Iterator[dict[str, Any]]:
+        """
+        Insightsをページ単位で取得しながら1行ずつ返す（全ページをリストに保持しない）
+
+        Args:
+            level: 集計レベル (account, campaign, adset, ad)
+            date_preset: 期間プリセット
+            start_date: 開始日
+            end_date: 終了日
+            time_increment: 日ごとに分割するか
+            filtering: フィルタ条件
+            fields: 取得するフィールド
+
+        Yields:
+            dict: パフォーマンスデータ
+
+        途中のページで取得に失敗した場合は例外をそのまま送出する
+        （取得できたページだけの不完全な結果を正常な結果として扱わないため）。
+        """
+        yield from self._iter_insights(
+            level, date_preset, start_date, end_date, time_increment, filtering, fields,
+        )
+
+    def _iter_insights(
+        self,
+        level: str,
+        date_preset: str = None,
+        start_date: str = None,
+        end_date: str = None,
+        time_increment: int = 1,
+        filtering: list = None,
+        fields: Iterable[str] = INSIGHT_FIELDS,
+    ) -> Iterator[dict[str, Any]]:
+        """Insights APIのカーソルを辿りながら整形済みの行を返す"""
+        fields, params = self._build_request(
+            level, date_preset, start_date, end_date, time_increment, filtering, fields,
+        )
+
+        # API呼び出し（カーソルが次ページを必要になった時点で取得する）
+        insights = self.ad_account.get_insights(
+            fields=fields,
+            params=params,
+        )
+
+        for insight in insights:
+            yield self._parse_insight(insight)
+
+    def add_insights_to_batch(
+        self,
+        graph_batch: GraphBatch,
+        key: str,
+        level: str,
+        date_preset: str = "last_7d",
+        time_increment: int = 1,
+        filtering: list = None,
+        reduce: Callable[[Iterable[dict[str, Any]]], Any] = None,
+        fields: Iterable[str] = INSIGHT_FIELDS,
+    ) -> None:
+        """
+        Insightsの取得をバッチに登録
+
+        Args:
+            graph_batch: 登録先のバッチ
+            key: 結果を格納するキー
+            level: 集計レベル (account, campaign, adset, ad)
+            date_preset: 期間プリセット
+            time_increment: 日ごとに分割するか
+            filtering: フィルタ条件
+            reduce: 整形済みの行を逐次受け取って結果を作る関数（省略時はリスト）
+                複数ページにまたがる場合もページ単位で取得しながら渡す
+            fields: 取得するフィールド（合計のみなら SUM_INSIGHT_FIELDS）
+        """
+        request_fields, params = self._build_request(
+            level, date_preset, None, None, time_increment, filtering, fields,
+        )
+        reduce = reduce or list
+
+        def fallback():
+            # 取得できたページだけを集計せず、失敗時は空の結果にする（空の結果はキャッシュされない）
+            try:
+                return reduce(self.iter_insights(
+                    level=level,
+                    date_preset=date_preset,
+                    time_increment=time_increment,
+                    filtering=filtering,
+                    fields=fields,
+                ))
+            except Exception as e:
+                logger.error(f"Insightsの取得に失敗しました（{key}）: {e}")
+                return reduce(())
+
+        graph_batch.add(
+            key,
+            lambda batch, success, failure: self.ad_account.get_insights(
+                fields=request_fields, params=params, batch=batch, success=success, failure=failure,
+            ),
+            parse=lambda body: reduce(self._parse_insight(i) for i in body.get("data", [])),
+            fallback=fallback,
+        )
+
+    def add_insights_to_scheduler(
+        self,
+        scheduler: AsyncInsightsScheduler,
+        key: str,
+        level: str,
+        date_preset: str = "last_7d",
+        time_increment: int = 1,
+        filtering: list = None,
+    ) -> None:
+        """
+        Insightsの取得を非同期ジョブとして登録
+
+        Args:
+            scheduler: 登録先のスケジューラー
+            key: 結果を格納するキー
+            level: 集計レベル (account, campaign, adset, ad)
+            date_preset: 期間プリセット
+            time_increment: 日ごとに分割するか
+            filtering: フィルタ条件
+        """
+        fields, params = self._build_request(
+            level, date_preset, None, None, time_increment, filtering,
+        )
+        scheduler.add(
+            key,
+            submit=lambda: self.ad_account.get_insights_async(fields=fields, params=params),
+            parse=self._parse_insight,
+            fallback=lambda: self._get_insights(
+                level=level,
+                date_preset=date_preset,
+                time_increment=time_increment,
+                filtering=filtering,
+            ),
+        )
+
+    @staticmethod
+    def _build_request(
+        level: str,
+        date_preset: str = None,
+        start_date: str = None,
+        end_date: str = None,
+        time_increment: int = 1,
+        filtering: list = None,
+        fields: Iterable[str] = INSIGHT_FIELDS,
+    ) -> tuple[list[str], dict[str, Any]]:
+        """Insights API呼び出しのフィールドとパラメータを組み立て（レベルに応じたID/名前を追加）"""
+        fields = [*fields, *_LEVEL_FIELDS.get(level, ())]
+
+        # パラメータ設定
+        params = {
+            "level": level,
+            "time_increment": time_increment,
+        }
+
+        if date_preset:
+            params["date_preset"] = date_preset
+        elif start_date and end_date:
+            params["time_range"] = {
+                "since": start_date,
+                "until": end_date,
+            }
+        else:
+            # デフォルトは過去7日
+            params["date_preset"] = "last_7d"
+
+        if filtering:
+            params["filtering"] = filtering
+
+        return fields, params
+
     def _parse_insight(self, insight: AdsInsights) -> dict[str, Any]:
         """
         Insightデータを整形
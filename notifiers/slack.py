@@ -12,6 +12,9 @@ import config
 
 logger = logging.getLogger(__name__)
 
+# Webhook送信で接続（TLS）を使い回すための共有セッション
+_session = requests.Session()
+
 
 class SlackNotifier:
     """Slackへの通知を行うクラス"""
@@ -34,7 +37,7 @@ class SlackNotifier:
             return False
 
         try:
-            response = requests.post(
+            response = _session.post(
                 self.webhook_url,
                 json=message,
                 timeout=30,